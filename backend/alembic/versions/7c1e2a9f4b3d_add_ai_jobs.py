@@ -0,0 +1,41 @@
+"""add ai jobs
+
+Revision ID: 7c1e2a9f4b3d
+Revises: 541c253e17eb
+Create Date: 2026-10-16 09:12:31.402187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e2a9f4b3d'
+down_revision = '541c253e17eb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('user_message_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_jobs_id'), 'ai_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_jobs_session_id'), 'ai_jobs', ['session_id'], unique=False)
+    op.create_index(op.f('ix_ai_jobs_status'), 'ai_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_jobs_status'), table_name='ai_jobs')
+    op.drop_index(op.f('ix_ai_jobs_session_id'), table_name='ai_jobs')
+    op.drop_index(op.f('ix_ai_jobs_id'), table_name='ai_jobs')
+    op.drop_table('ai_jobs')
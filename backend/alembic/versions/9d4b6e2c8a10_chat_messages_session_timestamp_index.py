@@ -0,0 +1,27 @@
+"""chat messages session timestamp index
+
+Revision ID: 9d4b6e2c8a10
+Revises: 7c1e2a9f4b3d
+Create Date: 2026-10-16 11:02:47.918364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4b6e2c8a10'
+down_revision = '7c1e2a9f4b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create the composite index first: it also backs the session_id foreign key
+    op.create_index('ix_chat_messages_session_id_timestamp', 'chat_messages', ['session_id', 'timestamp'], unique=False)
+    op.drop_index(op.f('ix_chat_messages_session_id'), table_name='chat_messages')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_chat_messages_session_id'), 'chat_messages', ['session_id'], unique=False)
+    op.drop_index('ix_chat_messages_session_id_timestamp', table_name='chat_messages')
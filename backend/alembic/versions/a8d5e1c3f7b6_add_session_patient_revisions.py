@@ -0,0 +1,26 @@
+"""add session patient revisions
+
+Revision ID: a8d5e1c3f7b6
+Revises: f3c8a6d2b9e4
+Create Date: 2026-10-17 02:11:46.803214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d5e1c3f7b6'
+down_revision = 'f3c8a6d2b9e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('patient_data_revision', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('patient_context_revision', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'patient_context_revision')
+    op.drop_column('chat_sessions', 'patient_data_revision')
@@ -0,0 +1,27 @@
+"""chat sessions user updated index
+
+Revision ID: b3f8a1d5c7e2
+Revises: 9d4b6e2c8a10
+Create Date: 2026-10-16 13:40:05.127731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8a1d5c7e2'
+down_revision = '9d4b6e2c8a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create the composite index first: it also backs the user_id foreign key
+    op.create_index('ix_chat_sessions_user_id_updated_at', 'chat_sessions', ['user_id', 'updated_at'], unique=False)
+    op.drop_index(op.f('ix_chat_sessions_user_id'), table_name='chat_sessions')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_chat_sessions_user_id'), 'chat_sessions', ['user_id'], unique=False)
+    op.drop_index('ix_chat_sessions_user_id_updated_at', table_name='chat_sessions')
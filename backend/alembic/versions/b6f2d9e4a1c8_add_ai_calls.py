@@ -0,0 +1,48 @@
+"""add ai calls
+
+Revision ID: b6f2d9e4a1c8
+Revises: a8d5e1c3f7b6
+Create Date: 2026-10-17 03:02:27.514870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f2d9e4a1c8'
+down_revision = 'a8d5e1c3f7b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_calls',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=True),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('clinic_name', sa.String(length=255), nullable=True),
+    sa.Column('route', sa.String(length=20), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('prompt_version', sa.String(length=50), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=False),
+    sa.Column('cached_tokens', sa.Integer(), nullable=False),
+    sa.Column('output_tokens', sa.Integer(), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('retries', sa.Integer(), nullable=False),
+    sa.Column('outcome', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_calls_created_at'), 'ai_calls', ['created_at'], unique=False)
+    op.create_index(op.f('ix_ai_calls_session_id'), 'ai_calls', ['session_id'], unique=False)
+    op.create_index('ix_ai_calls_user_id_created_at', 'ai_calls', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_ai_calls_clinic_name_created_at', 'ai_calls', ['clinic_name', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_calls_clinic_name_created_at', table_name='ai_calls')
+    op.drop_index('ix_ai_calls_user_id_created_at', table_name='ai_calls')
+    op.drop_index(op.f('ix_ai_calls_session_id'), table_name='ai_calls')
+    op.drop_index(op.f('ix_ai_calls_created_at'), table_name='ai_calls')
+    op.drop_table('ai_calls')
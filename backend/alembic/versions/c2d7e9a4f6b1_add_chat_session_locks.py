@@ -0,0 +1,31 @@
+"""add chat session locks
+
+Revision ID: c2d7e9a4f6b1
+Revises: b6f2d9e4a1c8
+Create Date: 2026-10-17 09:41:27.306514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d7e9a4f6b1'
+down_revision = 'b6f2d9e4a1c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_session_locks',
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('owner', sa.String(length=32), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_index(op.f('ix_chat_session_locks_expires_at'), 'chat_session_locks', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_session_locks_expires_at'), table_name='chat_session_locks')
+    op.drop_table('chat_session_locks')
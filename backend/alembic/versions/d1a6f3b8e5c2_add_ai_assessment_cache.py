@@ -0,0 +1,32 @@
+"""add ai assessment cache
+
+Revision ID: d1a6f3b8e5c2
+Revises: c5e9d2a7b4f1
+Create Date: 2026-10-16 16:48:12.330914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1a6f3b8e5c2'
+down_revision = 'c5e9d2a7b4f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_assessment_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_ai_assessment_cache_expires_at'), 'ai_assessment_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_assessment_cache_expires_at'), table_name='ai_assessment_cache')
+    op.drop_table('ai_assessment_cache')
@@ -0,0 +1,31 @@
+"""add ai request cancellations
+
+Revision ID: e7b2c4d9f1a3
+Revises: d1a6f3b8e5c2
+Create Date: 2026-10-17 00:12:41.518207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2c4d9f1a3'
+down_revision = 'd1a6f3b8e5c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_request_cancellations',
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('request_id', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('session_id', 'request_id')
+    )
+    op.create_index(op.f('ix_ai_request_cancellations_created_at'), 'ai_request_cancellations', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_request_cancellations_created_at'), table_name='ai_request_cancellations')
+    op.drop_table('ai_request_cancellations')
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark the per-call connection overhead removed by the shared AI client.
+
+Compares two strategies against the AI provider endpoint:
+
+* ``cold``: a new HTTP client per call (what ``get_ai_service`` used to do),
+  so every call pays DNS + TCP + TLS before the request is sent.
+* ``pooled``: one shared client with keep-alive (``AIClientRegistry``), so
+  only the first call pays the handshake.
+
+A cheap authenticated-or-not GET is used so no tokens are spent; a 401 is
+fine since only transport latency is measured.
+
+Usage:
+    uv run python scripts/bench_ai_client.py --calls 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+def _summary(label: str, samples: List[float]) -> str:
+    """Format latency statistics in milliseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return (
+        f"{label:<8} mean={statistics.mean(samples) * 1000:7.1f} ms  "
+        f"p50={statistics.median(samples) * 1000:7.1f} ms  "
+        f"p95={p95 * 1000:7.1f} ms"
+    )
+
+
+async def _timed_get(client: httpx.AsyncClient, url: str, headers: dict) -> float:
+    """Time a single GET request."""
+    start = time.perf_counter()
+    response = await client.get(url, headers=headers)
+    await response.aread()
+    return time.perf_counter() - start
+
+
+async def bench_cold(url: str, headers: dict, calls: int) -> List[float]:
+    """A fresh client (and connection) per call."""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            await _timed_get(client, url, headers)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_pooled(url: str, headers: dict, calls: int) -> List[float]:
+    """One shared keep-alive client for every call (warm-up call excluded)."""
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60)
+    async with httpx.AsyncClient(limits=limits) as client:
+        await _timed_get(client, url, headers)
+        return [await _timed_get(client, url, headers) for _ in range(calls)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument(
+        "--url",
+        default=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/models",
+    )
+    args = parser.parse_args()
+
+    headers = {}
+    if os.getenv("OPENAI_API_KEY"):
+        headers["Authorization"] = f"Bearer {os.environ['OPENAI_API_KEY']}"
+
+    print(f"Benchmarking {args.calls} sequential calls to {args.url}")
+    cold = await bench_cold(args.url, headers, args.calls)
+    pooled = await bench_pooled(args.url, headers, args.calls)
+
+    print(_summary("cold", cold))
+    print(_summary("pooled", pooled))
+    overhead = statistics.mean(cold) - statistics.mean(pooled)
+    print(f"Connection setup overhead removed per call: {overhead * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,13 +6,16 @@ from .send_message_command import SendMessageCommand
 # Queries
 from .get_session_query import GetSessionQuery
 from .get_session_messages_query import GetSessionMessagesQuery
+from .get_session_messages_page_query import GetSessionMessagesPageQuery
 from .get_session_by_slug_query import GetSessionBySlugQuery
+from .get_ai_job_query import GetAIJobQuery
 
 # Handlers
 from .create_session_handler import CreateSessionHandler
 from .send_message_handler import SendMessageHandler
 from .get_session_handler import GetSessionHandler
 from .get_session_messages_handler import GetSessionMessagesHandler
+from .get_ai_job_handler import GetAIJobHandler
 
 # Auth
 from .auth import (
@@ -33,6 +36,7 @@ from .auth import (
     GetUserQuery,
     GetUserHandler,
     GetUserSessionsQuery,
+    GetUserSessionSummariesQuery,
     GetUserSessionsHandler,
 )
 
@@ -43,12 +47,15 @@ __all__ = [
     # Queries
     "GetSessionQuery",
     "GetSessionMessagesQuery",
+    "GetSessionMessagesPageQuery",
     "GetSessionBySlugQuery",
+    "GetAIJobQuery",
     # Handlers
     "CreateSessionHandler",
     "SendMessageHandler",
     "GetSessionHandler",
     "GetSessionMessagesHandler",
+    "GetAIJobHandler",
     # Auth
     "RegisterUserCommand",
     "RegisterUserHandler",
@@ -67,5 +74,6 @@ __all__ = [
     "GetUserQuery",
     "GetUserHandler",
     "GetUserSessionsQuery",
+    "GetUserSessionSummariesQuery",
     "GetUserSessionsHandler",
 ]
\ No newline at end of file
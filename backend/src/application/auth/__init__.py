@@ -6,7 +6,7 @@ from .refresh_token_command import RefreshTokenCommand, RefreshTokenHandler, Ref
 from .update_profile_command import UpdateProfileCommand, UpdateProfileHandler
 from .link_session_to_user_command import LinkSessionToUserCommand, LinkSessionToUserHandler
 from .get_user_query import GetUserQuery, GetUserHandler
-from .get_user_sessions_query import GetUserSessionsQuery, GetUserSessionsHandler
+from .get_user_sessions_query import GetUserSessionsQuery, GetUserSessionSummariesQuery, GetUserSessionsHandler
 from .resend_verification_command import ResendVerificationCommand, ResendVerificationHandler
 
 __all__ = [
@@ -27,6 +27,7 @@ __all__ = [
     "GetUserQuery",
     "GetUserHandler",
     "GetUserSessionsQuery",
+    "GetUserSessionSummariesQuery",
     "GetUserSessionsHandler",
     "ResendVerificationCommand",
     "ResendVerificationHandler",
@@ -1,8 +1,9 @@
 """Get user sessions query and handler."""
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Tuple
 
-from src.domain.entities import ChatSession
+from src.application.pagination import decode_cursor, encode_cursor
+from src.domain.entities import ChatSession, SessionSummary
 from src.domain.repositories import SessionRepository
 
 
@@ -12,6 +13,14 @@ class GetUserSessionsQuery:
     user_id: str
 
 
+@dataclass
+class GetUserSessionSummariesQuery:
+    """Query to get one page of session summaries for a user."""
+    user_id: str
+    limit: int = 20
+    before: Optional[str] = None
+
+
 class GetUserSessionsHandler:
     """Handler for getting user sessions."""
 
@@ -30,3 +39,32 @@ class GetUserSessionsHandler:
         """
         sessions = await self.session_repository.get_by_user_id(query.user_id)
         return sessions
+
+    async def handle_summaries(
+        self, query: GetUserSessionSummariesQuery
+    ) -> Tuple[List[SessionSummary], Optional[str]]:
+        """
+        Handle getting a page of session summaries.
+
+        Args:
+            query: Query with user ID, page size and optional cursor
+
+        Returns:
+            Tuple of (summaries, most recent first; cursor of the next page or None)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        before = decode_cursor(query.before) if query.before else None
+
+        # Fetch one extra row to know whether another page exists
+        summaries = await self.session_repository.get_summaries_by_user_id(
+            query.user_id, query.limit + 1, before
+        )
+        next_cursor = None
+        if len(summaries) > query.limit:
+            summaries = summaries[: query.limit]
+            last = summaries[-1]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+
+        return summaries, next_cursor
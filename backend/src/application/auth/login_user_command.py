@@ -3,7 +3,7 @@ from dataclasses import dataclass
 
 from src.domain.entities import User, RefreshToken
 from src.domain.repositories import UserRepository, RefreshTokenRepository
-from src.infrastructure.security import PasswordService, JWTService
+from src.infrastructure.security import AsyncPasswordService, JWTService
 
 
 @dataclass
@@ -28,7 +28,7 @@ class LoginUserHandler:
         self,
         user_repository: UserRepository,
         refresh_token_repository: RefreshTokenRepository,
-        password_service: PasswordService,
+        password_service: AsyncPasswordService,
         jwt_service: JWTService,
     ):
         self.user_repository = user_repository
@@ -54,14 +54,22 @@ class LoginUserHandler:
         if not user:
             raise ValueError("Email ou mot de passe invalide")
 
-        # Verify password
-        if not self.password_service.verify_password(command.password, user.hashed_password):
+        # Verify password (off the event loop), getting a new hash if outdated
+        is_valid, new_hash = await self.password_service.verify_and_update(
+            command.password, user.hashed_password
+        )
+        if not is_valid:
             raise ValueError("Email ou mot de passe invalide")
 
         # Check if email is verified
         if not user.is_verified:
             raise ValueError("Email non vérifié. Veuillez vérifier votre boîte de réception pour l'email de vérification.")
 
+        # Upgrade the stored hash if the Argon2 parameters changed
+        if new_hash:
+            user.hashed_password = new_hash
+            user = await self.user_repository.update(user)
+
         # Create access token
         access_token = self.jwt_service.create_access_token(
             data={"sub": user.id, "email": user.email}
@@ -2,10 +2,9 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from src.domain.entities import User
-from src.domain.repositories import UserRepository
-from src.infrastructure.security import PasswordService
-from src.infrastructure.email import EmailService
+from src.domain.entities import OutboxEmail, User
+from src.domain.repositories import EmailOutboxRepository, UserRepository
+from src.infrastructure.security import AsyncPasswordService
 
 
 @dataclass
@@ -28,12 +27,12 @@ class RegisterUserHandler:
     def __init__(
         self,
         user_repository: UserRepository,
-        password_service: PasswordService,
-        email_service: EmailService,
+        password_service: AsyncPasswordService,
+        email_outbox: EmailOutboxRepository,
     ):
         self.user_repository = user_repository
         self.password_service = password_service
-        self.email_service = email_service
+        self.email_outbox = email_outbox
 
     async def handle(self, command: RegisterUserCommand) -> User:
         """
@@ -53,8 +52,8 @@ class RegisterUserHandler:
         if existing_user:
             raise ValueError(f"User with email {command.email} already exists")
 
-        # Hash password
-        hashed_password = self.password_service.hash_password(command.password)
+        # Hash password (off the event loop)
+        hashed_password = await self.password_service.hash_password(command.password)
 
         # Create user entity
         user = User.create(
@@ -72,12 +71,14 @@ class RegisterUserHandler:
         # Save to database
         user = await self.user_repository.create(user)
 
-        # Send verification email
+        # Queue verification email (committed with the user, sent in the background)
         if user.verification_token:
-            await self.email_service.send_verification_email(
-                email=user.email,
-                verification_token=user.verification_token,
-                first_name=user.first_name,
+            await self.email_outbox.create(
+                OutboxEmail.verification(
+                    to_email=user.email,
+                    verification_token=user.verification_token,
+                    first_name=user.first_name,
+                )
             )
 
         return user
@@ -1,9 +1,8 @@
 """Resend verification email command and handler."""
 from dataclasses import dataclass
 
-from src.domain.entities import User
-from src.domain.repositories import UserRepository
-from src.infrastructure.email import EmailService
+from src.domain.entities import OutboxEmail
+from src.domain.repositories import EmailOutboxRepository, UserRepository
 
 
 @dataclass
@@ -18,10 +17,10 @@ class ResendVerificationHandler:
     def __init__(
         self,
         user_repository: UserRepository,
-        email_service: EmailService,
+        email_outbox: EmailOutboxRepository,
     ):
         self.user_repository = user_repository
-        self.email_service = email_service
+        self.email_outbox = email_outbox
 
     async def handle(self, command: ResendVerificationCommand) -> bool:
         """
@@ -31,7 +30,7 @@ class ResendVerificationHandler:
             command: Resend verification command
 
         Returns:
-            True if email was sent successfully
+            True once the email is queued for sending
 
         Raises:
             ValueError: If user not found or already verified
@@ -45,14 +44,13 @@ class ResendVerificationHandler:
         if user.is_verified:
             raise ValueError("Email déjà vérifié")
 
-        # Send verification email
-        success = await self.email_service.send_verification_email(
-            email=user.email,
-            verification_token=user.verification_token,
-            first_name=user.first_name,
+        # Queue verification email (sent in the background)
+        await self.email_outbox.create(
+            OutboxEmail.verification(
+                to_email=user.email,
+                verification_token=user.verification_token,
+                first_name=user.first_name,
+            )
         )
 
-        if not success:
-            raise ValueError("Échec de l'envoi de l'email")
-
         return True
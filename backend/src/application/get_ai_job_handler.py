@@ -0,0 +1,22 @@
+"""Get AI job handler."""
+from typing import Callable
+
+from src.domain.entities import AIJob
+from src.domain.repositories import UnitOfWork
+
+from .get_ai_job_query import GetAIJobQuery
+
+
+class GetAIJobHandler:
+    """Handler for getting AI job status."""
+
+    def __init__(self, uow_factory: Callable[[], UnitOfWork]):
+        self.uow_factory = uow_factory
+
+    async def handle(self, query: GetAIJobQuery) -> AIJob:
+        """Handle the get AI job query."""
+        async with self.uow_factory() as uow:
+            job = await uow.jobs.get_by_id(query.job_id)
+        if not job:
+            raise ValueError(f"Job {query.job_id} not found")
+        return job
@@ -0,0 +1,8 @@
+"""Get AI job query."""
+from dataclasses import dataclass
+
+
+@dataclass
+class GetAIJobQuery:
+    """Query to get the status of an asynchronous AI job."""
+    job_id: str
@@ -1,10 +1,12 @@
 """Get session messages handler."""
-from typing import List
+from typing import List, Optional, Tuple
 
 from src.domain.entities import ChatMessage
 from src.domain.repositories import MessageRepository
 
+from .get_session_messages_page_query import GetSessionMessagesPageQuery
 from .get_session_messages_query import GetSessionMessagesQuery
+from .pagination import decode_cursor, encode_cursor
 
 
 class GetSessionMessagesHandler:
@@ -15,4 +17,22 @@ class GetSessionMessagesHandler:
 
     async def handle(self, query: GetSessionMessagesQuery) -> List[ChatMessage]:
         """Handle the get session messages query."""
-        return await self.message_repository.get_by_session_id(query.session_id)
\ No newline at end of file
+        return await self.message_repository.get_by_session_id(query.session_id)
+
+    async def handle_page(
+        self, query: GetSessionMessagesPageQuery
+    ) -> Tuple[List[ChatMessage], Optional[str]]:
+        """Return a page of messages in chronological order and the cursor of the next (older) page."""
+        before = decode_cursor(query.before) if query.before else None
+
+        # Fetch one extra row to know whether an older page exists
+        messages = await self.message_repository.get_page(
+            query.session_id, query.limit + 1, before
+        )
+        next_cursor = None
+        if len(messages) > query.limit:
+            messages = messages[: query.limit]
+            oldest = messages[-1]
+            next_cursor = encode_cursor(oldest.timestamp, oldest.id)
+
+        return list(reversed(messages)), next_cursor
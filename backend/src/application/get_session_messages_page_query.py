@@ -0,0 +1,11 @@
+"""Get session messages page query."""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class GetSessionMessagesPageQuery:
+    """Query to get one page of a session's messages, newest page first."""
+    session_id: str
+    limit: int = 50
+    before: Optional[str] = None
@@ -1,9 +1,31 @@
 """Send message command."""
 from dataclasses import dataclass
+from typing import Optional
+
+from src.infrastructure.ai.call_ledger import UsageAccount
+from src.infrastructure.deadline import Deadline
 
 
 @dataclass
 class SendMessageCommand:
     """Command to send a message in a chat session."""
     session_id: str
-    message: str
\ No newline at end of file
+    message: str
+    user_id: Optional[str] = None
+    clinic_name: Optional[str] = None
+    deadline: Optional[Deadline] = None
+    request_id: Optional[str] = None  # Client-chosen id the turn can be cancelled by
+
+    @property
+    def fairness_key(self) -> str:
+        """Key the AI admission queue is shared on: clinic, else user, else session."""
+        if self.clinic_name:
+            return f"clinic:{self.clinic_name.strip().lower()}"
+        if self.user_id:
+            return f"user:{self.user_id}"
+        return f"session:{self.session_id}"
+
+    @property
+    def account(self) -> UsageAccount:
+        """Who the turn's AI tokens are counted against."""
+        return UsageAccount(user_id=self.user_id, clinic_name=self.clinic_name)
@@ -1,61 +1,422 @@
 """Send message handler."""
-from src.domain.entities import ChatMessage, VeterinaryAssessment
-from src.domain.repositories import SessionRepository, MessageRepository
-from src.infrastructure.ai.ai_service import AIService
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from src.domain.entities import AIJob, ChatMessage, ChatSession, VeterinaryAssessment
+from src.domain.repositories import UnitOfWork
+from src.infrastructure.admission import AdmissionRejectedError, FairAdmissionController
+from src.infrastructure.ai.ai_service import AIService, AIServiceUnavailableError, AssessmentStreamEvent
+from src.infrastructure.ai.token_budget import TokenBudget
+from src.infrastructure.deadline import Deadline, DeadlineExceededError
+from src.infrastructure.inflight import InFlightRegistry, InFlightTurn, TurnCancelledError
+from src.infrastructure.session_queue import SessionPlace, SessionWorkQueue
 
 from .send_message_command import SendMessageCommand
 
+# Share of the remaining time the opening transaction may use
+BEGIN_STAGE_SHARE = 0.1
+
+# Time kept back from the AI call to persist its answer
+FINISH_RESERVE_SECONDS = 2.0
+
 
 class SendMessageHandler:
-    """Handler for sending messages and getting AI responses."""
+    """Handler for sending messages and getting AI responses.
+
+    A turn runs as two short units of work around the AI call: the user
+    message is committed first, the AI is called with no database
+    connection held, and the result is persisted in a second transaction.
+    If the provider is unavailable the user message is removed again, so
+    the client can resend it without leaving an unanswered duplicate.
+
+    The command's deadline is split across the stages: the opening
+    transaction and the waits for the session and for an AI slot take
+    what they need within it, the AI call
+    gets the rest minus ``FINISH_RESERVE_SECONDS``, and the final
+    transaction gets that reserve. A turn that runs out of time is rolled
+    back like an unavailable provider, and so is a turn cancelled by its
+    client (by request id) or abandoned by a disconnect.
+
+    With a session queue, turns of a session run one at a time: a message
+    posted while another turn runs waits for it, and messages that queued
+    up together are answered by a single AI call whose assessment every
+    one of their requests returns.
+
+    With a token budget, a user or clinic past its monthly budget gets a
+    ``TokenBudgetExceededError`` before anything is stored. A first turn
+    answered from the assessment cache doesn't wait for an AI slot.
+    """
 
     def __init__(
         self,
-        session_repository: SessionRepository,
-        message_repository: MessageRepository,
+        uow_factory: Callable[[], UnitOfWork],
         ai_service: AIService,
+        admission: Optional[FairAdmissionController] = None,
+        inflight: Optional[InFlightRegistry] = None,
+        session_queue: Optional[SessionWorkQueue] = None,
+        budget: Optional[TokenBudget] = None,
     ):
-        self.session_repository = session_repository
-        self.message_repository = message_repository
+        self.uow_factory = uow_factory
         self.ai_service = ai_service
+        self.admission = admission
+        self.inflight = inflight
+        self.session_queue = session_queue
+        self.budget = budget
 
     async def handle(self, command: SendMessageCommand) -> VeterinaryAssessment:
         """Handle the send message command."""
+        deadline = command.deadline or Deadline()
+        await self._check_budget(command)
+        async with self._track(command) as turn, self._place(command) as place:
+            async with deadline.stage("begin", share=BEGIN_STAGE_SHARE):
+                session, user_message, messages = await self._begin(command)
+
+            async for event in self._run_turn(command, deadline, turn, place, session, user_message, messages):
+                assessment = event.assessment
+        return assessment
+
+    async def handle_stream(
+        self, command: SendMessageCommand
+    ) -> AsyncIterator[AssessmentStreamEvent]:
+        """Handle the send message command, streaming the AI response.
+
+        Deltas and completed fields are forwarded as they arrive; the final
+        ``completed`` event is only emitted once the turn has been persisted.
+        A message answered by an earlier turn only gets the ``completed`` event.
+        """
+        deadline = command.deadline or Deadline()
+        await self._check_budget(command)
+        async with self._track(command) as turn, self._place(command) as place:
+            async with deadline.stage("begin", share=BEGIN_STAGE_SHARE):
+                session, user_message, messages = await self._begin(command)
+
+            async for event in self._run_turn(
+                command, deadline, turn, place, session, user_message, messages, stream=True
+            ):
+                if event.type == "completed":
+                    completed = event
+                else:
+                    yield event
+        yield completed
+
+    async def submit_job(self, command: SendMessageCommand) -> AIJob:
+        """Persist the user message and a pending job to be run in the background."""
+        await self._check_budget(command)
+        async with self.uow_factory() as uow:
+            session, user_message = await self._start_turn(uow, command)
+            job = await uow.jobs.create(AIJob.create(session.id, user_message.id))
+        return job
+
+    async def run_job(
+        self, job_id: str, stale_before: datetime, deadline: Optional[Deadline] = None
+    ) -> Optional[AIJob]:
+        """Run a queued job; returns None if another worker already owns it.
+
+        The job runs like a turn of its session's user: after the session's
+        earlier turns, then in an AI slot, within ``deadline``. If it gets
+        no answer its user message is removed again, as for an interactive
+        turn, and the job is marked failed.
+        """
+        async with self.uow_factory() as uow:
+            if not await uow.jobs.claim(job_id, stale_before):
+                return None
+            job = await uow.jobs.get_by_id(job_id)
+            if job is None:
+                return None
+            session = await uow.sessions.get_by_id(job.session_id)
+            if session is None:
+                job.mark_failed("Session introuvable")
+                await uow.jobs.update(job)
+                return job
+            messages = await uow.messages.get_recent_messages(job.session_id, limit=20)
+
+        # Answer the job's own message even if newer ones arrived since
+        index = next(
+            (index for index, message in enumerate(messages) if message.id == job.user_message_id), None
+        )
+        if index is None:
+            async with self.uow_factory() as uow:
+                job.mark_failed("Message introuvable")
+                await uow.jobs.update(job)
+            return job
+        user_message = messages[index]
+
+        command = self._job_command(session, user_message)
+        turn = InFlightTurn(session.id, None)
+        try:
+            async with self._place(command) as place:
+                async for _ in self._run_turn(
+                    command, deadline or Deadline(), turn, place, session, user_message, messages[:index], job=job
+                ):
+                    pass
+        except Exception as e:
+            async with self.uow_factory() as uow:
+                job.mark_failed(str(e))
+                await uow.jobs.update(job)
+            raise
+        return job
+
+    async def _run_turn(
+        self,
+        command: SendMessageCommand,
+        deadline: Deadline,
+        turn: InFlightTurn,
+        place: Optional[SessionPlace],
+        session: ChatSession,
+        user_message: ChatMessage,
+        history: List[ChatMessage],
+        stream: bool = False,
+        job: Optional[AIJob] = None,
+    ) -> AsyncIterator[AssessmentStreamEvent]:
+        """Answer a turn whose user message is stored, and persist the answer.
+
+        The turn waits for the session's earlier turns, is answered from the
+        assessment cache or by the AI in a slot, and ends with the
+        ``completed`` event once stored (with ``job`` marked succeeded in the
+        same transaction). With ``stream`` the AI's events are yielded as
+        they arrive. A turn that gets no answer has its user message removed.
+        """
+        try:
+            session, messages, answer = await self._wait_for_turn(
+                command, place, session, user_message, history, deadline, turn
+            )
+            assessment = answer
+            if answer is None:
+                # A cached first answer needs no AI slot
+                ai_deadline = deadline.reserve(FINISH_RESERVE_SECONDS)
+                assessment = await self.ai_service.cached_answer(messages, session, deadline=ai_deadline)
+                if assessment is not None and stream:
+                    for event in self.ai_service.field_events(assessment):
+                        yield event
+            if assessment is None:
+                async with self._slot(command, deadline, turn):
+                    if stream:
+                        async for event in self._stream_answer(command, messages, session, ai_deadline, turn):
+                            if event.type == "completed":
+                                assessment = event.assessment
+                            else:
+                                yield event
+                    else:
+                        # Process message using your OpenAI assistant
+                        async with ai_deadline.stage("ai"):
+                            assessment = await turn.run(
+                                self.ai_service.process_message(
+                                    messages,
+                                    session,
+                                    deadline=ai_deadline,
+                                    account=command.account,
+                                    check_cache=False,
+                                )
+                            )
+                    self._check_not_cancelled(turn)
+        except (
+            AIServiceUnavailableError, AdmissionRejectedError, DeadlineExceededError, TurnCancelledError
+        ):
+            await self._abort_turn(user_message, turn)
+            raise
+        except asyncio.CancelledError:
+            # The client is gone: nobody will read the answer. A job stopped
+            # at shutdown keeps its message, to run again on the next start.
+            if job is None:
+                await asyncio.shield(self._abort_turn(user_message, turn))
+            raise
+
+        if answer is None or job is not None:
+            async with deadline.stage("finish"):
+                async with self.uow_factory() as uow:
+                    # A turn that merged this message has already stored the answer
+                    if answer is None:
+                        await self._finish_turn(uow, session, assessment)
+                    if job is not None:
+                        job.mark_succeeded(assessment.to_dict())
+                        await uow.jobs.update(job)
+        if answer is None and place is not None:
+            place.complete(assessment)
+        yield AssessmentStreamEvent(type="completed", assessment=assessment)
+
+    async def _stream_answer(
+        self,
+        command: SendMessageCommand,
+        messages: List[ChatMessage],
+        session: ChatSession,
+        deadline: Deadline,
+        turn: InFlightTurn,
+    ) -> AsyncIterator[AssessmentStreamEvent]:
+        """Stream the AI's answer, each event awaited so that a cancel stops it."""
+        # The stream checks the deadline itself between events
+        deadline.check("ai")
+        events = self.ai_service.stream_message(
+            messages,
+            session,
+            deadline=deadline,
+            on_response_id=turn.set_response_id,
+            account=command.account,
+            check_cache=False,
+        )
+        while True:
+            try:
+                event = await turn.run(events.__anext__())
+            except StopAsyncIteration:
+                return
+            yield event
+
+    def _job_command(self, session: ChatSession, message: ChatMessage) -> SendMessageCommand:
+        """The command a job's turn runs as, on behalf of its session's user."""
+        return SendMessageCommand(session_id=session.id, message=message.content, user_id=session.user_id)
+
+    @asynccontextmanager
+    async def _track(self, command: SendMessageCommand) -> AsyncIterator[InFlightTurn]:
+        """Register the turn so that its client can cancel it."""
+        if self.inflight is None:
+            yield InFlightTurn(command.session_id, command.request_id)
+            return
+        async with self.inflight.track(command.session_id, command.request_id) as turn:
+            yield turn
+
+    @asynccontextmanager
+    async def _place(self, command: SendMessageCommand) -> AsyncIterator[Optional[SessionPlace]]:
+        """Take the turn's place in its session's queue, if turns are serialized."""
+        if self.session_queue is None:
+            yield None
+            return
+        place = self.session_queue.join(command.session_id)
+        try:
+            yield place
+        finally:
+            await self.session_queue.leave(place)
+
+    async def _wait_for_turn(
+        self,
+        command: SendMessageCommand,
+        place: Optional[SessionPlace],
+        session: ChatSession,
+        user_message: ChatMessage,
+        messages: List[ChatMessage],
+        deadline: Deadline,
+        turn: InFlightTurn,
+    ) -> Tuple[ChatSession, List[ChatMessage], Optional[VeterinaryAssessment]]:
+        """Wait for the session's earlier turns to finish.
+
+        Returns the session and the messages to send (the history, then the
+        messages this turn answers), or the answer of an earlier turn that
+        merged this message.
+        """
+        if place is None:
+            return session, self._turn_messages(messages, [user_message]), None
+        async with deadline.stage("queue"):
+            await turn.run(self.session_queue.enter(place, user_message))
+        if place.answered:
+            return session, messages, place.result
+
+        if place.stale:
+            async with deadline.stage("begin", share=BEGIN_STAGE_SHARE):
+                session, messages = await self._load_context(command.session_id)
+        return session, self._turn_messages(messages, [user_message] + place.merged), None
+
+    def _turn_messages(
+        self, history: List[ChatMessage], answered: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        """History up to the last answer, followed by the messages this turn answers.
+
+        User messages of other turns still in flight are left out: their
+        timestamps don't tell which answer they belong to.
+        """
+        ids = {message.id for message in answered}
+        context = [message for message in history if message.id not in ids]
+        while context and context[-1].role == "user":
+            context.pop()
+        return context + answered
+
+    @asynccontextmanager
+    async def _slot(
+        self, command: SendMessageCommand, deadline: Deadline, turn: InFlightTurn
+    ) -> AsyncIterator[None]:
+        """Hold an AI slot for the turn; a cancel also ends the wait for one."""
+        if self.admission is None:
+            yield
+            return
+        await turn.run(self.admission.acquire(command.fairness_key, timeout=deadline.timeout()))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.admission.release(time.monotonic() - started)
+
+    async def _check_budget(self, command: SendMessageCommand) -> None:
+        """Refuse the turn if its user or clinic has used its monthly token budget."""
+        if self.budget is not None:
+            await self.budget.check(command.account)
+
+    def _check_not_cancelled(self, turn: InFlightTurn) -> None:
+        """Catch a cancel that arrived after the answer but before it was saved."""
+        if turn.cancelled:
+            raise TurnCancelledError("Requête annulée")
+
+    async def _begin(
+        self, command: SendMessageCommand
+    ) -> Tuple[ChatSession, ChatMessage, List[ChatMessage]]:
+        """Persist the user message and return the session, the message and the history."""
+        async with self.uow_factory() as uow:
+            session, user_message = await self._start_turn(uow, command)
+
+            # Get message history for AI context
+            messages = await uow.messages.get_recent_messages(
+                command.session_id, limit=20
+            )
+        return session, user_message, messages
+
+    async def _load_context(self, session_id: str) -> Tuple[ChatSession, List[ChatMessage]]:
+        """Reload the session and its history after earlier turns changed them."""
+        async with self.uow_factory() as uow:
+            session = await uow.sessions.get_by_id(session_id)
+            messages = await uow.messages.get_recent_messages(session_id, limit=20)
+        return session, messages
+
+    async def _abort_turn(self, user_message: ChatMessage, turn: InFlightTurn) -> None:
+        """Remove the user message of a turn that got no answer, and stop its response."""
+        async with self.uow_factory() as uow:
+            await uow.messages.delete(user_message.id)
+        if turn.cancelled and turn.response_id:
+            await self.ai_service.cancel_response(turn.response_id)
+
+    async def _start_turn(
+        self, uow: UnitOfWork, command: SendMessageCommand
+    ) -> Tuple[ChatSession, ChatMessage]:
+        """Persist the user message of a new turn."""
         # Get the session
-        session = await self.session_repository.get_by_id(command.session_id)
+        session = await uow.sessions.get_by_id(command.session_id)
         if not session:
             raise ValueError(f"Session {command.session_id} not found")
 
         # Generate slug from first message if not already set
         if not session.slug:
             session.generate_slug_from_message(command.message)
+            await uow.sessions.update(session)
 
         # Create and save user message
         user_message = ChatMessage.create_user_message(
             content=command.message,
             session_id=command.session_id
         )
-        await self.message_repository.create(user_message)
-
-        # Get message history for AI context
-        messages = await self.message_repository.get_recent_messages(
-            command.session_id, limit=20
-        )
-
-        # Process message using your OpenAI assistant
-        assessment = await self.ai_service.process_message(messages, session)
+        await uow.messages.create(user_message)
+        return session, user_message
 
+    async def _finish_turn(
+        self, uow: UnitOfWork, session: ChatSession, assessment: VeterinaryAssessment
+    ) -> None:
+        """Persist the assistant message and the session's new assessment."""
         # Create and save assistant message with status and follow-up question
         assistant_message = ChatMessage.create_assistant_message(
             content=f"Assessment: {assessment.assessment}",
-            session_id=command.session_id,
+            session_id=session.id,
             status=assessment.status,
             follow_up_question=assessment.question if assessment.question else None
         )
-        await self.message_repository.create(assistant_message)
+        await uow.messages.create(assistant_message)
 
         # Update session with current assessment
         session.update_assessment(assessment)
-        await self.session_repository.update(session)
-
-        return assessment
\ No newline at end of file
+        await uow.sessions.update(session)
@@ -1,6 +1,6 @@
 """Domain layer - Core business logic."""
 from .entities import ChatSession, ChatMessage, VeterinaryAssessment
-from .repositories import SessionRepository, MessageRepository
+from .repositories import SessionRepository, MessageRepository, AIJobRepository, UnitOfWork
 
 __all__ = [
     "ChatSession",
@@ -8,4 +8,6 @@ __all__ = [
     "VeterinaryAssessment",
     "SessionRepository",
     "MessageRepository",
+    "AIJobRepository",
+    "UnitOfWork",
 ]
\ No newline at end of file
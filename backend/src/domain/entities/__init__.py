@@ -7,5 +7,8 @@ from .dog_breed import DogBreed
 from .consultation_reason import ConsultationReason
 from .user import User
 from .refresh_token import RefreshToken
+from .ai_job import AIJob
+from .session_summary import SessionSummary
+from .outbox_email import OutboxEmail
 
-__all__ = ["ChatSession", "ChatMessage", "VeterinaryAssessment", "PatientData", "CollectionResponse", "ResponseType", "DogBreed", "ConsultationReason", "User", "RefreshToken"]
\ No newline at end of file
+__all__ = ["ChatSession", "ChatMessage", "VeterinaryAssessment", "PatientData", "CollectionResponse", "ResponseType", "DogBreed", "ConsultationReason", "User", "RefreshToken", "AIJob", "SessionSummary", "OutboxEmail"]
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""AI job entity for asynchronous consultations."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+import uuid
+
+
+def generate_id() -> str:
+    """Generate a new UUID as string."""
+    return str(uuid.uuid4())
+
+
+@dataclass
+class AIJob:
+    """Background AI generation for a persisted user message."""
+    id: str
+    session_id: str
+    user_message_id: str
+    status: str  # "pending", "running", "succeeded" or "failed"
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def create(cls, session_id: str, user_message_id: str) -> AIJob:
+        """Create a new pending job."""
+        now = datetime.now(UTC)
+        return cls(
+            id=generate_id(),
+            session_id=session_id,
+            user_message_id=user_message_id,
+            status="pending",
+            created_at=now,
+            updated_at=now,
+        )
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if the job has a final result."""
+        return self.status in ("succeeded", "failed")
+
+    def mark_running(self) -> None:
+        """Mark the job as picked up by a worker."""
+        self.status = "running"
+        self.updated_at = datetime.now(UTC)
+
+    def mark_succeeded(self, result: Dict[str, Any]) -> None:
+        """Store the assessment produced by the job."""
+        self.status = "succeeded"
+        self.result = result
+        self.error = None
+        self.updated_at = datetime.now(UTC)
+
+    def mark_failed(self, error: str) -> None:
+        """Record why the job failed."""
+        self.status = "failed"
+        self.error = error
+        self.updated_at = datetime.now(UTC)
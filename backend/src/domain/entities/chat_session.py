@@ -1,6 +1,7 @@
 """Chat session entity."""
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from datetime import datetime, UTC
 from typing import Optional, TYPE_CHECKING
@@ -48,6 +49,13 @@ class ChatSession:
     patient_data: Optional["PatientData"] = None
     is_collecting_data: bool = True
     user_id: Optional[str] = None
+    # Bumped whenever the patient data actually changes
+    patient_data_revision: int = 0
+    # Revision of the patient data last sent into the provider conversation
+    patient_context_revision: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._patient_snapshot = self._snapshot(self.patient_data)
 
     @classmethod
     def create(cls) -> ChatSession:
@@ -73,14 +81,30 @@ class ChatSession:
         self.openai_thread_id = thread_id
         self.updated_at = datetime.now(UTC)
     
-    def update_patient_data(self, patient_data: "PatientData") -> None:
-        """Update patient data."""
+    def update_patient_data(self, patient_data: "PatientData") -> bool:
+        """Update patient data.
+
+        Returns:
+            Whether the data changed, in which case ``patient_data_revision`` is bumped
+        """
         self.patient_data = patient_data
         self.updated_at = datetime.now(UTC)
+
+        # The data is usually edited in place, so compare with the last snapshot
+        snapshot = self._snapshot(patient_data)
+        changed = snapshot != self._patient_snapshot
+        if changed:
+            self._patient_snapshot = snapshot
+            self.patient_data_revision += 1
         
         # Switch to diagnostic phase if data is complete
         if patient_data and patient_data.is_complete:
             self.is_collecting_data = False
+        return changed
+
+    def mark_patient_context_sent(self) -> None:
+        """Record that the provider conversation has the current patient data."""
+        self.patient_context_revision = self.patient_data_revision
     
     def start_diagnosis_phase(self) -> None:
         """Start the diagnosis phase."""
@@ -91,4 +115,9 @@ class ChatSession:
         """Generate and set slug from first user message."""
         if not self.slug:  # Only generate if not already set
             self.slug = generate_slug_from_text(message)
-            self.updated_at = datetime.now(UTC)
\ No newline at end of file
+            self.updated_at = datetime.now(UTC)
+
+    @staticmethod
+    def _snapshot(patient_data: Optional["PatientData"]) -> Optional[dict]:
+        """Copy of the patient data, for change detection."""
+        return copy.deepcopy(patient_data.to_dict()) if patient_data else None
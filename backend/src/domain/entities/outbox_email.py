@@ -0,0 +1,72 @@
+"""Outbox email entity."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+import uuid
+
+
+def generate_id() -> str:
+    """Generate a new UUID as string."""
+    return str(uuid.uuid4())
+
+
+@dataclass
+class OutboxEmail:
+    """Email queued in the same transaction as the change that triggers it.
+
+    Only the template name and its parameters are stored; the dispatcher
+    renders the message when it sends it.
+    """
+    id: str
+    template: str  # e.g. "verification"
+    to_email: str
+    created_at: datetime
+    next_attempt_at: datetime
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"  # "pending", "sent" or "failed"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+    @classmethod
+    def create(cls, template: str, to_email: str, params: Dict[str, Any]) -> OutboxEmail:
+        """Create a new pending email, due immediately."""
+        now = datetime.now(UTC)
+        return cls(
+            id=generate_id(),
+            template=template,
+            to_email=to_email,
+            params=params,
+            created_at=now,
+            next_attempt_at=now,
+        )
+
+    @classmethod
+    def verification(cls, to_email: str, verification_token: str, first_name: str) -> OutboxEmail:
+        """Create the email verification message of a user."""
+        return cls.create(
+            "verification",
+            to_email,
+            {"verification_token": verification_token, "first_name": first_name},
+        )
+
+    def mark_sent(self) -> None:
+        """Record a successful delivery to the provider."""
+        self.status = "sent"
+        self.attempts += 1
+        self.last_error = None
+        self.sent_at = datetime.now(UTC)
+
+    def schedule_retry(self, error: str, next_attempt_at: datetime) -> None:
+        """Record a failed attempt and when to try again."""
+        self.attempts += 1
+        self.last_error = error
+        self.next_attempt_at = next_attempt_at
+
+    def mark_failed(self, error: str) -> None:
+        """Give up on the email."""
+        self.status = "failed"
+        self.attempts += 1
+        self.last_error = error
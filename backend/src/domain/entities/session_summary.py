@@ -0,0 +1,15 @@
+"""Session summary read model."""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class SessionSummary:
+    """Lightweight view of a chat session for session lists."""
+    id: str
+    slug: Optional[str]
+    updated_at: datetime
+    localization: Optional[str] = None
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
@@ -1,6 +1,6 @@
 """Veterinary assessment entity."""
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -34,6 +34,10 @@ class VeterinaryAssessment:
         """Set the single clarifying question."""
         self.question = question
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
     def add_patient_data(self, data: str) -> None:
         """Add patient data information."""
         if data not in self.patient_data:
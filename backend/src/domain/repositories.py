@@ -1,8 +1,9 @@
 """Repository interfaces for domain entities."""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from src.domain.entities import ChatSession, ChatMessage, DogBreed, ConsultationReason, User, RefreshToken
+from src.domain.entities import ChatSession, ChatMessage, DogBreed, ConsultationReason, User, RefreshToken, AIJob, SessionSummary, OutboxEmail
 
 
 class SessionRepository(ABC):
@@ -33,6 +34,13 @@ class SessionRepository(ABC):
         """Get all sessions for a user."""
         pass
 
+    @abstractmethod
+    async def get_summaries_by_user_id(
+        self, user_id: str, limit: int, before: Optional[Tuple[datetime, str]] = None
+    ) -> List[SessionSummary]:
+        """Get session summaries older than the ``(updated_at, id)`` key, most recent first."""
+        pass
+
 
 class MessageRepository(ABC):
     """Repository interface for chat messages."""
@@ -52,6 +60,18 @@ class MessageRepository(ABC):
         """Get recent messages for a session."""
         pass
 
+    @abstractmethod
+    async def get_page(
+        self, session_id: str, limit: int, before: Optional[Tuple[datetime, str]] = None
+    ) -> List[ChatMessage]:
+        """Get up to ``limit`` messages older than the ``(timestamp, id)`` key, newest first."""
+        pass
+
+    @abstractmethod
+    async def delete(self, message_id: str) -> None:
+        """Delete a message."""
+        pass
+
 
 class DogBreedRepository(ABC):
     """Repository interface for dog breeds."""
@@ -141,4 +161,90 @@ class RefreshTokenRepository(ABC):
     @abstractmethod
     async def delete_expired(self) -> None:
         """Delete all expired refresh tokens."""
-        pass
\ No newline at end of file
+        pass
+
+
+class AIJobRepository(ABC):
+    """Repository interface for asynchronous AI jobs."""
+
+    @abstractmethod
+    async def create(self, job: AIJob) -> AIJob:
+        """Create a new job."""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, job_id: str) -> Optional[AIJob]:
+        """Get a job by ID."""
+        pass
+
+    @abstractmethod
+    async def update(self, job: AIJob) -> AIJob:
+        """Update an existing job."""
+        pass
+
+    @abstractmethod
+    async def claim(self, job_id: str, stale_before: datetime) -> bool:
+        """Atomically mark a job as running.
+
+        Succeeds if the job is pending, or running but not updated since
+        ``stale_before`` (its worker died). Returns False if another worker
+        owns the job.
+        """
+        pass
+
+    @abstractmethod
+    async def get_claimable_ids(self, stale_before: datetime) -> List[str]:
+        """Get IDs of pending jobs and of running jobs abandoned before ``stale_before``."""
+        pass
+
+
+class EmailOutboxRepository(ABC):
+    """Repository interface for the transactional email outbox."""
+
+    @abstractmethod
+    async def create(self, email: OutboxEmail) -> OutboxEmail:
+        """Queue a new email."""
+        pass
+
+    @abstractmethod
+    async def claim_due(self, limit: int, now: datetime, lease_until: datetime) -> List[OutboxEmail]:
+        """Claim up to ``limit`` pending emails due at ``now`` until ``lease_until``."""
+        pass
+
+    @abstractmethod
+    async def update(self, email: OutboxEmail) -> OutboxEmail:
+        """Update the delivery state of an email."""
+        pass
+
+    @abstractmethod
+    async def count_pending(self) -> int:
+        """Count emails not yet sent or given up on."""
+        pass
+
+
+class UnitOfWork(ABC):
+    """Short-lived transaction scope exposing the chat repositories.
+
+    Usage::
+
+        async with uow_factory() as uow:
+            session = await uow.sessions.get_by_id(session_id)
+            await uow.messages.create(message)
+
+    The transaction is committed when the block exits normally and rolled
+    back otherwise; the underlying connection is released in both cases.
+    """
+
+    sessions: SessionRepository
+    messages: MessageRepository
+    jobs: AIJobRepository
+
+    @abstractmethod
+    async def __aenter__(self) -> "UnitOfWork":
+        """Begin the unit of work."""
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Commit or roll back, then release the connection."""
+        pass
@@ -6,9 +6,12 @@ from .repositories import (
     SQLConsultationReasonRepository,
     SQLUserRepository,
     SQLRefreshTokenRepository,
+    SQLAIJobRepository,
+    SQLEmailOutboxRepository,
 )
+from .unit_of_work import SQLUnitOfWork
 from .ai.ai_service import AIService
-from .security import PasswordService, JWTService
+from .security import PasswordService, AsyncPasswordService, JWTService
 from .email import EmailService
 
 __all__ = [
@@ -18,8 +21,12 @@ __all__ = [
     "SQLConsultationReasonRepository",
     "SQLUserRepository",
     "SQLRefreshTokenRepository",
+    "SQLAIJobRepository",
+    "SQLEmailOutboxRepository",
+    "SQLUnitOfWork",
     "AIService",
     "PasswordService",
+    "AsyncPasswordService",
     "JWTService",
     "EmailService",
 ]
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Fair-queuing admission control for AI calls."""
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an AI call cannot be admitted (queue full or wait timed out)."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FairAdmissionController:
+    """Global concurrency cap with round-robin queuing across tenants.
+
+    Callers are grouped by a fairness key (clinic, user, or session for
+    anonymous use). When every slot is busy, callers wait in their key's
+    queue and freed slots are handed out one key at a time, so a clinic
+    submitting a batch of cases only delays its own requests. Queues are
+    bounded globally and per key, and a caller gives up after
+    ``queue_timeout``; both cases raise ``AdmissionRejectedError`` with a
+    Retry-After estimate instead of letting latency pile up.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_per_key: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            max_concurrency: AI calls in flight (AI_MAX_CONCURRENCY, default 16)
+            max_queue: Callers waiting in total (AI_MAX_QUEUE, default 64)
+            max_queue_per_key: Callers waiting per key (AI_MAX_QUEUE_PER_KEY, default 8)
+            queue_timeout: Maximum wait for a slot (AI_QUEUE_TIMEOUT_SECONDS, default 30)
+        """
+        self.limit = max_concurrency or int(os.getenv("AI_MAX_CONCURRENCY", "16"))
+        self.max_queue = max_queue or int(os.getenv("AI_MAX_QUEUE", "64"))
+        self.max_queue_per_key = max_queue_per_key or int(os.getenv("AI_MAX_QUEUE_PER_KEY", "8"))
+        self.queue_timeout = queue_timeout or float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", "30"))
+        self._in_flight = 0
+        self._queued = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # Moving average of how long a slot is held, for Retry-After
+        self._avg_hold = 10.0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of admitted calls."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of callers waiting for a slot."""
+        return self._queued
+
+    def set_limit(self, limit: int) -> None:
+        """Change the concurrency limit, admitting waiters if it grew."""
+        self.limit = max(1, limit)
+        self._dispatch()
+        self._publish()
+
+    def check(self, key: str) -> None:
+        """
+        Reject up front if a new caller for ``key`` could not even be queued.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full
+        """
+        if self._in_flight < self.limit and not self._queued:
+            return
+        if self._queued >= self.max_queue or len(self._queues.get(key, ())) >= self.max_queue_per_key:
+            metrics.incr("ai_admission_rejected_total", labels={"reason": "queue_full"})
+            raise AdmissionRejectedError(
+                "Trop de consultations en cours, veuillez réessayer", self._retry_after()
+            )
+
+    @asynccontextmanager
+    async def slot(self, key: str, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold one AI slot for the duration of the block.
+
+        Args:
+            key: Fairness key
+            timeout: Maximum wait, if shorter than ``queue_timeout``
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait times out
+        """
+        await self.acquire(key, timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    async def acquire(self, key: str, timeout: Optional[float] = None) -> None:
+        """Wait for a slot; pair every successful call with ``release()``."""
+        if self._in_flight < self.limit and not self._queued:
+            self._admit(0.0)
+            return
+
+        self.check(key)
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(future)
+        self._queued += 1
+        self._publish()
+        enqueued = time.monotonic()
+        try:
+            wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+            await asyncio.wait_for(asyncio.shield(future), timeout=wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot back
+                self.release()
+            else:
+                future.cancel()
+                self._remove(key, future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            metrics.incr("ai_admission_rejected_total", labels={"reason": "timeout"})
+            raise AdmissionRejectedError(
+                "Délai d'attente dépassé, veuillez réessayer", self._retry_after()
+            ) from None
+        metrics.observe("ai_admission_wait_seconds", time.monotonic() - enqueued)
+
+    def release(self, held: Optional[float] = None) -> None:
+        """Free a slot (held for ``held`` seconds) and hand it to the next key in round-robin order."""
+        if held is not None:
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+        self._in_flight -= 1
+        self._dispatch()
+        self._publish()
+
+    def _admit(self, waited: float) -> None:
+        """Count a call as in flight."""
+        self._in_flight += 1
+        metrics.observe("ai_admission_wait_seconds", waited)
+        self._publish()
+
+    def _dispatch(self) -> None:
+        """Grant free slots, taking one waiter per key in turn."""
+        while self._in_flight < self.limit and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _remove(self, key: str, future: asyncio.Future) -> None:
+        """Drop an abandoned waiter from its queue."""
+        queue = self._queues.get(key)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self._queued -= 1
+        if not queue:
+            del self._queues[key]
+        self._publish()
+
+    def _retry_after(self) -> int:
+        """Estimate in seconds until a new caller could be admitted."""
+        estimate = self._avg_hold * (self._queued + 1) / max(self.limit, 1)
+        return max(1, min(60, math.ceil(estimate)))
+
+    def _publish(self) -> None:
+        """Report queue length and in-flight count."""
+        metrics.set_gauge("ai_admission_queue_length", self._queued)
+        metrics.set_gauge("ai_admission_in_flight", self._in_flight)
+        metrics.set_gauge("ai_admission_queued_keys", len(self._queues))
+
+
+# Global admission controller instance
+ai_admission = FairAdmissionController()
@@ -0,0 +1,177 @@
+"""Adaptive (AIMD) concurrency limit for AI provider calls."""
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+import openai
+
+from src.infrastructure.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def overload_reason(error: BaseException) -> Optional[str]:
+    """Return why an error signals provider overload, or None for other errors.
+
+    A timeout only gets here when the provider used up the client's whole
+    timeout; one cut short by the caller's deadline is raised as
+    ``DeadlineExceededError`` by ``AIService._call`` instead.
+    """
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return "server_error"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    return None
+
+
+def percentile(samples: Deque[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty sample window."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class AdaptiveConcurrencyLimit:
+    """Additive-increase / multiplicative-decrease limit on AI calls.
+
+    Every successful call while the limit is in use raises it by
+    ``1 / limit`` (about +1 per round of calls). A 429, a 5xx, a timeout,
+    or a p90 latency more than ``tolerance`` times its baseline cuts it to
+    ``limit * backoff``, at most once per ``cooldown`` so a burst of
+    errors from the same episode counts once. Latencies are tracked per
+    call kind because a streamed call is measured to its first byte and
+    a plain call to its last. The limit is pushed to ``on_change``
+    (typically the admission controller) whenever its integer part moves.
+    """
+
+    def __init__(
+        self,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        backoff: Optional[float] = None,
+        tolerance: Optional[float] = None,
+        window: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        on_change: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Initialize the adaptive limit.
+
+        Args:
+            initial_limit: Starting limit (AI_LIMIT_INITIAL, default max_limit)
+            min_limit: Floor (AI_LIMIT_MIN, default 2)
+            max_limit: Ceiling (AI_MAX_CONCURRENCY, default 16)
+            backoff: Decrease factor (AI_LIMIT_BACKOFF, default 0.7)
+            tolerance: Allowed p90 / baseline ratio (AI_LIMIT_LATENCY_TOLERANCE, default 2.0)
+            window: Latency samples per kind (AI_LIMIT_WINDOW, default 50)
+            cooldown_seconds: Minimum time between decreases (AI_LIMIT_COOLDOWN_SECONDS, default 5)
+            on_change: Called with the new integer limit
+        """
+        self.max_limit = max_limit or int(os.getenv("AI_MAX_CONCURRENCY", "16"))
+        self.min_limit = min(min_limit or int(os.getenv("AI_LIMIT_MIN", "2")), self.max_limit)
+        self.backoff = backoff or float(os.getenv("AI_LIMIT_BACKOFF", "0.7"))
+        self.tolerance = tolerance or float(os.getenv("AI_LIMIT_LATENCY_TOLERANCE", "2.0"))
+        self.window = window or int(os.getenv("AI_LIMIT_WINDOW", "50"))
+        self.cooldown = cooldown_seconds or float(os.getenv("AI_LIMIT_COOLDOWN_SECONDS", "5"))
+        self.on_change = on_change
+        initial = initial_limit or int(os.getenv("AI_LIMIT_INITIAL", str(self.max_limit)))
+        self._limit = float(max(self.min_limit, min(self.max_limit, initial)))
+        self._in_flight = 0
+        self._samples: Dict[str, Deque[float]] = {}
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Provider calls currently running."""
+        return self._in_flight
+
+    def latency_p90(self, kind: str) -> Optional[float]:
+        """Recent p90 latency in seconds for a call kind."""
+        samples = self._samples.get(kind)
+        return percentile(samples, 0.9) if samples else None
+
+    def baseline(self, kind: str) -> Optional[float]:
+        """Uncongested latency estimate in seconds for a call kind."""
+        return self._baselines.get(kind)
+
+    @asynccontextmanager
+    async def track(self, kind: str) -> AsyncIterator[None]:
+        """Measure one provider call and feed its outcome into the limit."""
+        saturated = self._in_flight + 1 >= self._limit / 2
+        self._in_flight += 1
+        metrics.set_gauge("ai_provider_in_flight", self._in_flight)
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            reason = overload_reason(e)
+            if reason:
+                self._decrease(reason)
+            raise
+        else:
+            self.record_latency(kind, time.monotonic() - started, saturated)
+        finally:
+            self._in_flight -= 1
+            metrics.set_gauge("ai_provider_in_flight", self._in_flight)
+
+    def record_latency(self, kind: str, latency: float, saturated: bool = True) -> None:
+        """Record a successful call; grow the limit unless latency is degrading."""
+        samples = self._samples.setdefault(kind, deque(maxlen=self.window))
+        samples.append(latency)
+        p90 = percentile(samples, 0.9)
+        metrics.set_gauge("ai_latency_p90_seconds", p90, labels={"kind": kind})
+
+        if len(samples) >= min(10, self.window):
+            baseline = self._baselines.get(kind, p90)
+            congested = p90 > baseline * self.tolerance
+            # Quick to fall, slow to rise: a spike is congestion, while a
+            # lasting shift (time of day, prompt change) becomes the new normal
+            baseline += (0.1 if p90 < baseline else 0.02) * (p90 - baseline)
+            self._baselines[kind] = baseline
+            metrics.set_gauge("ai_latency_baseline_seconds", baseline, labels={"kind": kind})
+            if congested:
+                if self._decrease("latency"):
+                    # Judge the new limit on fresh samples only
+                    samples.clear()
+                return
+
+        # Only a limit that is actually in use has earned an increase
+        if saturated:
+            self._set(self._limit + 1 / self._limit)
+
+    def _decrease(self, reason: str) -> bool:
+        """Cut the limit multiplicatively, unless one cut happened recently."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        metrics.incr("ai_limit_decreases_total", labels={"reason": reason})
+        self._set(self._limit * self.backoff)
+        logger.warning(f"AI concurrency limit cut to {self.limit} ({reason})")
+        return True
+
+    def _set(self, value: float) -> None:
+        """Clamp and apply a new limit, notifying on integer changes."""
+        previous = self.limit
+        self._limit = max(float(self.min_limit), min(float(self.max_limit), value))
+        if self.limit != previous:
+            self._publish()
+
+    def _publish(self) -> None:
+        """Report the limit and push it to the listener."""
+        metrics.set_gauge("ai_concurrency_limit", self.limit)
+        if self.on_change is not None:
+            self.on_change(self.limit)
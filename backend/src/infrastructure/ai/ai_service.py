@@ -1,13 +1,76 @@
 """AI service for veterinary neurological diagnostics using OpenAI Prompts API."""
-import json
-from typing import List, Dict, Any
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
 import openai
 
 from src.domain.entities import ChatMessage, VeterinaryAssessment, PatientData
+from src.infrastructure.deadline import Deadline, DeadlineExceededError
+from src.infrastructure.metrics import metrics
+
+from .adaptive_limit import AdaptiveConcurrencyLimit
+from .assessment_cache import AssessmentCache, assessment_cache_key
+from .assessment_decoding import AssessmentDecodeError, AssessmentDecoder
+from .call_ledger import AICallLedger, AICallRecord, UsageAccount
+from .context_window import ContextWindow
+from .conversation_pool import ConversationPool
+from .model_routing import ModelRoute, ModelRouter, record_route_call
+from .partial_json import IncrementalJSONObjectParser
+from .prompt_layout import PromptLayout
+from .resilience import ResilientCaller, is_transient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Assessment fields pushed to the client as soon as they are complete
+STREAMED_FIELDS = ("assessment", "localization", "differentials")
+
+
+# Retry-After suggested when the provider did not send one
+DEFAULT_RETRY_AFTER_SECONDS = 5
+
+
+class AIServiceUnavailableError(Exception):
+    """Raised when the AI provider is overloaded or down (429, 5xx, timeout, open circuit)."""
+
+    def __init__(self, message: str, retry_after: int = DEFAULT_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_error(cls, error: Exception) -> "AIServiceUnavailableError":
+        """Wrap a provider error, keeping its Retry-After when it has one."""
+        retry_after = getattr(error, "retry_after", None) or DEFAULT_RETRY_AFTER_SECONDS
+        response = getattr(error, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        if header:
+            try:
+                retry_after = max(1, int(float(header)))
+            except ValueError:
+                pass
+        return cls("Le service d'analyse est surchargé, veuillez réessayer", retry_after)
+
+
+@dataclass
+class AssessmentStreamEvent:
+    """Event emitted while an assessment is being streamed."""
+    type: str  # "delta", "field" or "completed"
+    data: Dict[str, Any] = field(default_factory=dict)
+    assessment: Optional[VeterinaryAssessment] = None
 
 
 class AIService:
-    """AI service for generating veterinary assessments using OpenAI Prompts API."""
+    """AI service for generating veterinary assessments using OpenAI Prompts API.
+
+    Each session's turns are chained in a provider conversation, unless a
+    ``context_window`` is given: the input is then rebuilt from the stored
+    consultation on every turn and stays bounded however long it gets.
+    """
 
     def __init__(
         self,
@@ -17,59 +80,236 @@ class AIService:
         model: str = "gpt-4o",
         temperature: float = 0.3,
         max_tokens: int = 2000,
+        client: Optional[openai.AsyncOpenAI] = None,
+        conversation_pool: Optional[ConversationPool] = None,
+        assessment_cache: Optional[AssessmentCache] = None,
+        concurrency_limit: Optional[AdaptiveConcurrencyLimit] = None,
+        resilience: Optional[ResilientCaller] = None,
+        context_window: Optional[ContextWindow] = None,
+        router: Optional[ModelRouter] = None,
+        layout: Optional[PromptLayout] = None,
+        ledger: Optional[AICallLedger] = None,
+        decoder: Optional[AssessmentDecoder] = None,
+        provider_timeout: Optional[float] = None,
     ):
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = client or openai.AsyncOpenAI(api_key=api_key)
+        self.conversation_pool = conversation_pool
+        self.assessment_cache = assessment_cache
+        self.concurrency_limit = concurrency_limit
+        self.resilience = resilience
+        self.context_window = context_window
+        self._background_tasks: set = set()
         self.prompt_id = prompt_id
         self.prompt_version = prompt_version
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.router = router or ModelRouter(model, prompt_version)
+        self.layout = layout or PromptLayout()
+        self.ledger = ledger
+        self.decoder = decoder or AssessmentDecoder()
+        # Timeout the client is configured with (OPENAI_TIMEOUT, default 300)
+        self.provider_timeout = provider_timeout or float(os.getenv("OPENAI_TIMEOUT", "300"))
 
     async def process_message(
-        self, messages: List[ChatMessage], session
+        self,
+        messages: List[ChatMessage],
+        session,
+        deadline: Optional[Deadline] = None,
+        account: Optional[UsageAccount] = None,
+        check_cache: bool = True,
     ) -> VeterinaryAssessment:
-        """Process message using OpenAI Prompts API."""
+        """Process message using OpenAI Prompts API.
+
+        ``account`` is who the call's tokens are counted against in the
+        ledger (by default the session's user). ``check_cache=False``
+        skips the assessment cache lookup, for a caller that already got a
+        miss from ``cached_answer``.
+
+        Raises:
+            AIServiceUnavailableError: If the provider is overloaded or down
+            DeadlineExceededError: If the deadline passes before an answer
+        """
         try:
-            return await self._use_prompt_api(messages, session)
+            return await self._use_prompt_api(messages, session, deadline, account, check_cache)
         except Exception as e:
+            self._raise_if_no_answer(e, deadline)
             print(f"[ERROR] AI Service error: {str(e)}")
-            return VeterinaryAssessment(
-                assessment=f"Erreur technique: {str(e)}",
-                treatment="Consultation vétérinaire recommandée",
-                prognosis="Indéterminé",
-                question="Veuillez reformuler votre question",
-                confidence_level="faible"
-            )
+            return self._fallback_assessment(e)
+
+    async def cached_answer(
+        self,
+        messages: List[ChatMessage],
+        session,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[VeterinaryAssessment]:
+        """Answer a first turn from the assessment cache, or return None.
+
+        A hit doesn't generate anything, so callers look it up before
+        waiting for an AI slot rather than holding one to read the cache.
+        """
+        try:
+            route = self._route(messages, session)
+            cache_key = self._first_turn_cache_key(messages, session, route)
+            return await self._cached_assessment(cache_key, messages, session, deadline)
+        except Exception as e:
+            # The turn then goes to the provider, which reports its own errors
+            logger.warning(f"Assessment cache lookup failed: {e}")
+            return None
+
+    def field_events(self, assessment: VeterinaryAssessment) -> List[AssessmentStreamEvent]:
+        """The field events streamed for an assessment that was not generated (a cache hit)."""
+        return [
+            AssessmentStreamEvent(type="field", data={"name": name, "value": getattr(assessment, name)})
+            for name in STREAMED_FIELDS
+        ]
+
+    def _raise_if_no_answer(self, error: Exception, deadline: Optional[Deadline]) -> None:
+        """Re-raise failures worth retrying later instead of degrading them into an answer."""
+        if isinstance(error, DeadlineExceededError):
+            raise error
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceededError("Request deadline exceeded during ai") from error
+        if is_transient(error):
+            raise AIServiceUnavailableError.from_error(error) from error
+
+    async def cancel_response(self, response_id: str) -> None:
+        """Ask the provider to stop a response.
+
+        Only background responses can be cancelled this way; a foreground
+        one is stopped by closing its connection, so failures are expected
+        and only counted.
+        """
+        try:
+            await self.client.responses.cancel(response_id)
+            metrics.incr("ai_provider_cancels_total", labels={"outcome": "cancelled"})
+        except Exception:
+            metrics.incr("ai_provider_cancels_total", labels={"outcome": "unsupported"})
+
+    def _fallback_assessment(self, error: Exception) -> VeterinaryAssessment:
+        """Build the degraded assessment returned when the AI call fails."""
+        return VeterinaryAssessment(
+            assessment=f"Erreur technique: {str(error)}",
+            treatment="Consultation vétérinaire recommandée",
+            prognosis="Indéterminé",
+            question="Veuillez reformuler votre question",
+            confidence_level="faible"
+        )
+
+    async def stream_message(
+        self,
+        messages: List[ChatMessage],
+        session,
+        deadline: Optional[Deadline] = None,
+        on_response_id: Optional[Callable[[str], None]] = None,
+        account: Optional[UsageAccount] = None,
+        check_cache: bool = True,
+    ) -> AsyncIterator[AssessmentStreamEvent]:
+        """Stream an assessment, yielding text deltas and completed fields.
+
+        The last event is always a ``completed`` event carrying the final
+        assessment (or the same degraded fallback as ``process_message``).
+        ``on_response_id`` receives the provider's response id as soon as
+        it is known, so that the response can be cancelled.
+        ``check_cache`` is as for ``process_message``.
+
+        Raises:
+            AIServiceUnavailableError: If the provider is overloaded or down
+            DeadlineExceededError: If the deadline passes before the answer is complete
+        """
+        try:
+            route = self._route(messages, session)
+            cache_key = self._first_turn_cache_key(messages, session, route)
+            cached = None
+            if check_cache:
+                cached = await self._cached_assessment(cache_key, messages, session, deadline)
+            if cached is not None:
+                for event in self.field_events(cached):
+                    yield event
+                yield AssessmentStreamEvent(type="completed", assessment=cached)
+                return
+
+            request = await self._build_request(messages, session, route, deadline)
+            parser = IncrementalJSONObjectParser(fields=STREAMED_FIELDS)
+            final_text = None
+            usage = None
+
+            # Only opening the stream is retried: no event has been seen yet
+            started = time.monotonic()
+            async with self._ledger_call(session, route, account) as call:
+                stream = await self._call(
+                    "stream",
+                    lambda **options: self.client.responses.create(**request, stream=True, **options),
+                    deadline=deadline,
+                    call=call,
+                )
+                try:
+                    async for event in stream:
+                        if deadline is not None:
+                            deadline.check("ai")
+                        if event.type == "response.created" and on_response_id is not None:
+                            on_response_id(event.response.id)
+                        elif event.type == "response.output_text.delta":
+                            yield AssessmentStreamEvent(type="delta", data={"text": event.delta})
+                            for name, value in parser.feed(event.delta):
+                                yield AssessmentStreamEvent(
+                                    type="field", data={"name": name, "value": value}
+                                )
+                        elif event.type == "response.completed":
+                            final_text = getattr(event.response, "output_text", None)
+                            usage = getattr(event.response, "usage", None)
+                        elif event.type in ("response.failed", "error"):
+                            raise RuntimeError(f"Streaming response failed: {event.type}")
+                finally:
+                    # Dropping the connection is what stops a foreground generation
+                    await stream.close()
+                call.set_usage(usage)
+            record_route_call(route, time.monotonic() - started, usage)
+            self._mark_sent(request, session)
+
+            content = final_text if final_text is not None else parser.text
+            assessment = await self._parse_content(content, session)
+            await self._store_first_turn(cache_key, content)
+        except Exception as e:
+            self._raise_if_no_answer(e, deadline)
+            print(f"[ERROR] AI Service streaming error: {str(e)}")
+            assessment = self._fallback_assessment(e)
+
+        yield AssessmentStreamEvent(type="completed", assessment=assessment)
 
     async def _use_prompt_api(
-        self, messages: List[ChatMessage], session
+        self,
+        messages: List[ChatMessage],
+        session,
+        deadline: Optional[Deadline] = None,
+        account: Optional[UsageAccount] = None,
+        check_cache: bool = True,
     ) -> VeterinaryAssessment:
         """Use OpenAI Prompts API with Conversations to generate assessment."""
-        # Get or create conversation for this session
-        conversation_id = await self._get_or_create_conversation(session)
-
-        # Get the latest user message
-        latest_message = messages[-1] if messages else None
-        if not latest_message or latest_message.role != "user":
-            raise ValueError("No user message found")
+        route = self._route(messages, session)
+        cache_key = self._first_turn_cache_key(messages, session, route)
+        if check_cache:
+            cached = await self._cached_assessment(cache_key, messages, session, deadline)
+            if cached is not None:
+                return cached
 
-        # Prepare the user input with patient data context if available
-        user_input = latest_message.content
-        if session.patient_data:
-            patient_context = self._format_patient_data_for_ai(session.patient_data)
-            user_input = f"{patient_context}\n\n{user_input}"
+        request = await self._build_request(messages, session, route, deadline)
 
         # Call the Prompts API with Conversations
         try:
-            response = await self.client.responses.create(
-                model=self.model,
-                conversation=conversation_id,
-                prompt={
-                    "id": self.prompt_id,
-                    "version": self.prompt_version
-                },
-                input=[{"role": "user", "content": user_input}]
-            )
+            # Never hedged: a duplicate is a second billed generation, and
+            # a conversation-bound one would append the turn twice
+            started = time.monotonic()
+            async with self._ledger_call(session, route, account) as call:
+                response = await self._call(
+                    "response",
+                    lambda **options: self.client.responses.create(**request, **options),
+                    deadline=deadline,
+                    call=call,
+                )
+                call.set_usage(getattr(response, "usage", None))
+            record_route_call(route, time.monotonic() - started, getattr(response, "usage", None))
+            self._mark_sent(request, session)
 
             # Extract the response content
             if hasattr(response, 'output_text'):
@@ -79,38 +319,269 @@ class AIService:
             else:
                 content = str(response)
 
-            # Try to parse as JSON
-            try:
-                assessment_data = json.loads(content)
-
-                # Process patient_data from AI response and update session
-                if 'patient_data' in assessment_data and assessment_data['patient_data']:
-                    await self._process_ai_patient_data(assessment_data['patient_data'], session)
-
-                return VeterinaryAssessment(**assessment_data)
-            except json.JSONDecodeError:
-                # If not JSON, create assessment from text
-                return VeterinaryAssessment(
-                    assessment=content,
-                    treatment="Consultation avec votre vétérinaire",
-                    prognosis="Nécessite examen clinique",
-                    question="Pouvez-vous fournir plus de détails sur les symptômes?",
-                    confidence_level="moyenne"
-                )
+            assessment = await self._parse_content(content, session)
+            await self._store_first_turn(cache_key, content)
+            return assessment
 
         except Exception as e:
             print(f"[ERROR] Prompts API call failed: {str(e)}")
             raise
 
-    async def _get_or_create_conversation(self, session) -> str:
+    async def _call(
+        self,
+        kind: str,
+        fn: Callable[..., Awaitable[T]],
+        hedgeable: bool = False,
+        deadline: Optional[Deadline] = None,
+        call: Optional[AICallRecord] = None,
+    ) -> T:
+        """Run a provider call through the resilience layer and adaptive limit.
+
+        Each attempt gets the time left before the deadline as its client
+        timeout, so the HTTP request is dropped when the caller gives up.
+        A timeout cut short that way is the caller's, not a sign of
+        overload: it is raised as ``DeadlineExceededError``, which neither
+        lowers the adaptive limit nor counts against the circuit breaker.
+        Attempts are counted on ``call``, if given. Only calls that
+        generate nothing may be ``hedgeable``: the losing copy of a hedge
+        is cancelled and its usage is never reported to the ledger.
+        """
+        async def attempt() -> T:
+            if call is not None:
+                call.attempts += 1
+            timeout = deadline.timeout() if deadline is not None else None
+            # A streamed call is measured to its first byte
+            async with self._track(kind):
+                if timeout is None:
+                    return await fn()
+                try:
+                    return await fn(timeout=timeout)
+                except openai.APITimeoutError as e:
+                    if deadline.expired or timeout < self.provider_timeout:
+                        raise DeadlineExceededError(f"Request deadline exceeded during {kind}") from e
+                    raise
+
+        if self.resilience is None:
+            return await attempt()
+        return await self.resilience.call(kind, attempt, hedgeable=hedgeable, deadline=deadline)
+
+    @asynccontextmanager
+    async def _ledger_call(
+        self, session, route: ModelRoute, account: Optional[UsageAccount]
+    ) -> AsyncIterator[AICallRecord]:
+        """Time a generation and write it to the ledger, whatever its outcome."""
+        call = AICallRecord.start(session.id, route, account or UsageAccount(user_id=session.user_id))
+        started = time.monotonic()
+        try:
+            yield call
+        except BaseException as e:
+            call.fail(e)
+            raise
+        finally:
+            call.latency_ms = int((time.monotonic() - started) * 1000)
+            if self.ledger is not None:
+                self.ledger.record(call)
+
+    def _track(self, kind: str) -> AsyncContextManager[None]:
+        """Feed a provider call into the adaptive limit, if any."""
+        if self.concurrency_limit is None:
+            return nullcontext()
+        return self.concurrency_limit.track(kind)
+
+    def _route(self, messages: List[ChatMessage], session) -> ModelRoute:
+        """Pick the model and prompt version of this turn."""
+        return self.router.route(session, self._user_input(messages))
+
+    async def _build_request(
+        self,
+        messages: List[ChatMessage],
+        session,
+        route: ModelRoute,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Build the Responses API arguments for the latest user message."""
+        request = await self._request_input(messages, session, route, deadline)
+        response_format = self.decoder.response_format
+        if response_format is not None:
+            request["text"] = response_format
+        return request
+
+    async def _request_input(
+        self,
+        messages: List[ChatMessage],
+        session,
+        route: ModelRoute,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Model, prompt and input of the request, with the conversation if any."""
+        if self.context_window is not None:
+            unanswered = self._unanswered(messages)
+            return {
+                "model": route.model,
+                "prompt": {
+                    "id": self.prompt_id,
+                    "version": route.prompt_version
+                },
+                "input": self.context_window.build(
+                    messages[: len(messages) - len(unanswered)],
+                    self._user_input(messages),
+                    session.current_assessment,
+                    self.layout.patient_context(session),
+                ),
+                "prompt_cache_key": self.layout.cache_key(session),
+            }
+
+        # Get or create conversation for this session
+        conversation_id = await self._get_or_create_conversation(session, deadline)
+
+        return {
+            "model": route.model,
+            "conversation": conversation_id,
+            "prompt": {
+                "id": self.prompt_id,
+                "version": route.prompt_version
+            },
+            "input": self.layout.conversation_input(session, self._user_input(messages)),
+            "prompt_cache_key": self.layout.cache_key(session),
+        }
+
+    def _mark_sent(self, request: Dict[str, Any], session) -> None:
+        """Note that the conversation now holds the patient block the request carried."""
+        if "conversation" in request:
+            session.mark_patient_context_sent()
+
+    def _unanswered(self, messages: List[ChatMessage]) -> List[ChatMessage]:
+        """The trailing user messages, answered together by this turn."""
+        latest_message = messages[-1] if messages else None
+        if not latest_message or latest_message.role != "user":
+            raise ValueError("No user message found")
+
+        # Messages posted while the previous turn ran are answered together
+        unanswered = []
+        for message in reversed(messages):
+            if message.role != "user":
+                break
+            unanswered.insert(0, message)
+        return unanswered
+
+    def _user_input(self, messages: List[ChatMessage]) -> str:
+        """Text of the turn: the unanswered messages (patient data goes in its own item)."""
+        return "\n\n".join(message.content for message in self._unanswered(messages))
+
+    def _first_turn_cache_key(
+        self, messages: List[ChatMessage], session, route: ModelRoute
+    ) -> Optional[str]:
+        """Return the assessment cache key, or None if this is not a cacheable first turn."""
+        if not self.assessment_cache or not self.assessment_cache.enabled:
+            return None
+        # Later turns depend on the conversation history, not only on the inputs
+        if len(messages) != 1 or messages[0].role != "user" or session.openai_thread_id:
+            return None
+        return assessment_cache_key(
+            session.patient_data.to_dict() if session.patient_data else None,
+            messages[0].content,
+            self.prompt_id,
+            route.prompt_version,
+            route.model,
+        )
+
+    async def _cached_assessment(
+        self,
+        cache_key: Optional[str],
+        messages: List[ChatMessage],
+        session,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[VeterinaryAssessment]:
+        """Serve a first turn from the cache, seeding the conversation with it."""
+        if not cache_key:
+            return None
+        content = await self.assessment_cache.get(cache_key)
+        if content is None:
+            return None
+        if self.context_window is not None:
+            # No conversation to seed: the next turn is built from the database
+            return await self._parse_content(content, session)
+
+        # The next turn must see this exchange in the conversation; adding
+        # the items doesn't generate anything, so it runs in the background
+        conversation_id = await self._get_or_create_conversation(session, deadline)
+        items = self.layout.conversation_input(session, self._user_input(messages))
+        session.mark_patient_context_sent()
+        task = asyncio.create_task(self._seed_conversation(conversation_id, items, content))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+        return await self._parse_content(content, session)
+
+    async def _seed_conversation(
+        self, conversation_id: str, items: List[Dict[str, str]], content: str
+    ) -> None:
+        """Append a cached first exchange to a conversation."""
+        try:
+            await self.client.conversations.items.create(
+                conversation_id,
+                items=[*items, {"role": "assistant", "content": content}],
+            )
+        except Exception:
+            # The next turn then answers without this exchange in its context
+            logger.exception(f"Could not seed conversation {conversation_id}")
+            metrics.incr("ai_conversation_seed_failures_total")
+
+    async def _store_first_turn(self, cache_key: Optional[str], content: str) -> None:
+        """Cache a first-turn output if it is a well-formed assessment."""
+        if not cache_key:
+            return
+        try:
+            self.decoder.decode(content, count=False)
+        except AssessmentDecodeError:
+            return
+        await self.assessment_cache.put(cache_key, content)
+
+    async def _parse_content(self, content: str, session) -> VeterinaryAssessment:
+        """Convert the model output into an assessment.
+
+        Raises:
+            AssessmentDecodeError: If the output is JSON but not an assessment
+                (the caller answers with the degraded fallback rather than raw JSON)
+        """
+        try:
+            output = self.decoder.decode(content)
+        except AssessmentDecodeError as e:
+            if e.reason != "json":
+                raise
+            # Prose rather than JSON, even after repair: keep the text
+            return VeterinaryAssessment(
+                assessment=content,
+                treatment="Consultation avec votre vétérinaire",
+                prognosis="Nécessite examen clinique",
+                question="Pouvez-vous fournir plus de détails sur les symptômes?",
+                confidence_level="moyenne"
+            )
+
+        assessment_data = output.model_dump()
+
+        # Process patient_data from AI response and update session
+        patient_data = assessment_data.pop('patient_data')
+        if patient_data:
+            await self._process_ai_patient_data(patient_data, session)
+            assessment_data['patient_data'] = patient_data
+
+        return VeterinaryAssessment(**assessment_data)
+
+    async def _get_or_create_conversation(self, session, deadline: Optional[Deadline] = None) -> str:
         """Get existing conversation or create new one for session."""
         # Check if session already has a conversation_id (stored in openai_thread_id field)
         if session.openai_thread_id:
             return session.openai_thread_id
 
-        # Create new conversation
-        conversation = await self.client.conversations.create()
-        conversation_id = conversation.id
+        # Take a pre-created conversation, else create one now
+        conversation_id = self.conversation_pool.take() if self.conversation_pool else None
+        if not conversation_id:
+            # An extra empty conversation is free, so this one can be hedged
+            conversation = await self._call(
+                "conversation", self.client.conversations.create, hedgeable=True, deadline=deadline
+            )
+            conversation_id = conversation.id
 
         # Update session with the conversation_id (reusing the openai_thread_id field)
         session.set_openai_thread(conversation_id)
@@ -160,39 +631,3 @@ class AIService:
         print(f"[DEBUG] Processed AI patient data: race={ai_patient_data.get('race')}, "
               f"symptoms_count={len(ai_patient_data.get('symptomes', []))}, "
               f"exams_count={len(ai_patient_data.get('examens', []))}")
-
-    def _format_patient_data_for_ai(self, patient_data: PatientData) -> str:
-        """Format patient data for AI context."""
-        patient_dict = patient_data.to_dict()
-        
-        context_parts = ["[DONNÉES PATIENT DISPONIBLES]"]
-        
-        if patient_dict.get('age'):
-            context_parts.append(f"Âge: {patient_dict['age']}")
-        if patient_dict.get('sex'):
-            context_parts.append(f"Sexe: {patient_dict['sex']}")
-        if patient_dict.get('race'):
-            context_parts.append(f"Race: {patient_dict['race']}")
-        if patient_dict.get('weight'):
-            context_parts.append(f"Poids: {patient_dict['weight']}")
-        
-        if patient_dict.get('symptoms'):
-            context_parts.append(f"Symptômes: {', '.join(patient_dict['symptoms'])}")
-        
-        if patient_dict.get('neurological_exam'):
-            neuro_exam = patient_dict['neurological_exam']
-            context_parts.append("Examen neurologique:")
-            for key, value in neuro_exam.items():
-                if value:
-                    context_parts.append(f"  - {key}: {value}")
-        
-        if patient_dict.get('other_exams'):
-            other_exams = patient_dict['other_exams']
-            context_parts.append("Autres examens:")
-            for key, value in other_exams.items():
-                if value:
-                    context_parts.append(f"  - {key}: {value}")
-        
-        context_parts.append("[FIN DONNÉES PATIENT]")
-        
-        return "\n".join(context_parts)
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Content-addressed cache of first-turn assessments."""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from src.infrastructure.database import AssessmentCacheModel, database
+from src.infrastructure.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def assessment_cache_key(
+    patient_data: Optional[Dict[str, Any]],
+    message: str,
+    prompt_id: str,
+    prompt_version: str,
+    model: str,
+) -> str:
+    """Hash everything that determines a first-turn answer.
+
+    Keys are sorted and whitespace is fixed so that equal inputs always
+    produce the same digest, whatever the dict insertion order.
+    """
+    canonical = json.dumps(
+        {
+            "patient_data": patient_data,
+            "message": message.strip(),
+            "prompt_id": prompt_id,
+            "prompt_version": prompt_version,
+            "model": model,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AssessmentCache:
+    """Bounded LRU/TTL cache of raw model outputs, with an optional DB tier.
+
+    Consultations started from the same pre-consultation form and the same
+    opening message get the same first answer; serving it from here skips
+    the generation entirely. The in-memory tier is per worker; enabling
+    ``AI_ASSESSMENT_CACHE_DB`` shares entries across workers and restarts
+    through the ``ai_assessment_cache`` table.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        persistent: Optional[bool] = None,
+        session_factory=None,
+    ):
+        """
+        Initialize the assessment cache.
+
+        Args:
+            max_entries: In-memory entries (AI_ASSESSMENT_CACHE_SIZE, default 512, 0 disables)
+            ttl_seconds: Entry lifetime (AI_ASSESSMENT_CACHE_TTL_SECONDS, default 86400)
+            persistent: Use the database tier (AI_ASSESSMENT_CACHE_DB, default false)
+            session_factory: Session factory for the database tier
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("AI_ASSESSMENT_CACHE_SIZE", "512"))
+        self.ttl = ttl_seconds or float(os.getenv("AI_ASSESSMENT_CACHE_TTL_SECONDS", "86400"))
+        if persistent is None:
+            persistent = os.getenv("AI_ASSESSMENT_CACHE_DB", "false").lower() == "true"
+        self.persistent = persistent
+        self._session_factory = session_factory or database.async_session
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any tier is active."""
+        return self.max_entries > 0 or self.persistent
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached model output for a key, or None."""
+        content = self._get_memory(key)
+        if content is not None:
+            metrics.incr("ai_assessment_cache_hits_total", labels={"tier": "memory"})
+            return content
+
+        if self.persistent:
+            content = await self._get_db(key)
+            if content is not None:
+                self._put_memory(key, content)
+                metrics.incr("ai_assessment_cache_hits_total", labels={"tier": "db"})
+                return content
+
+        metrics.incr("ai_assessment_cache_misses_total")
+        return None
+
+    async def put(self, key: str, content: str) -> None:
+        """Store a model output in every active tier."""
+        self._put_memory(key, content)
+        if self.persistent:
+            await self._put_db(key, content)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        """Read the in-memory tier, dropping an expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _put_memory(self, key: str, content: str) -> None:
+        """Write the in-memory tier, evicting least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        metrics.set_gauge("ai_assessment_cache_entries", len(self._entries))
+
+    async def _get_db(self, key: str) -> Optional[str]:
+        """Read the database tier; errors are treated as misses."""
+        try:
+            async with self._session_factory() as session:
+                stmt = select(AssessmentCacheModel.content).where(
+                    AssessmentCacheModel.key == key,
+                    AssessmentCacheModel.expires_at > datetime.now(UTC).replace(tzinfo=None),
+                )
+                result = await session.execute(stmt)
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Assessment cache read failed: {e}")
+            return None
+
+    async def _put_db(self, key: str, content: str) -> None:
+        """Write the database tier, replacing an expired row for the same key."""
+        now = datetime.now(UTC).replace(tzinfo=None)
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    delete(AssessmentCacheModel).where(
+                        AssessmentCacheModel.key == key, AssessmentCacheModel.expires_at <= now
+                    )
+                )
+                await session.execute(
+                    insert(AssessmentCacheModel).values(
+                        key=key,
+                        content=content,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=self.ttl),
+                    )
+                )
+                await session.commit()
+        except IntegrityError:
+            # Another worker cached the same answer first
+            pass
+        except Exception as e:
+            logger.warning(f"Assessment cache write failed: {e}")
@@ -0,0 +1,276 @@
+"""Schema-checked decoding of the model's assessment output."""
+import copy
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator, model_validator
+
+from src.infrastructure.metrics import metrics
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*(.*?)\s*```$", re.DOTALL)
+
+
+class AssessmentDecodeError(ValueError):
+    """Raised when the model output is not a usable assessment."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Réponse du modèle illisible ({reason})")
+        self.reason = reason  # "json" (not JSON) or "schema" (JSON of the wrong shape)
+
+
+class _Output(BaseModel):
+    """Base of the output models: nulls mean "not given", so defaults apply."""
+    model_config = ConfigDict(extra="allow")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_nulls(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {
+                key: value
+                for key, value in data.items()
+                if value is not None or (key in cls.model_fields and cls.model_fields[key].is_required())
+            }
+        return data
+
+
+class DifferentialOutput(_Output):
+    """A differential diagnosis, as the model writes it."""
+    condition: str = ""
+    probability: str = ""
+    rationale: str = ""
+
+
+class PatientDataOutput(_Output):
+    """Patient data extracted by the model (same fields as ``PatientDataAI``)."""
+    race: Optional[str] = None
+    age: Optional[str] = None
+    sexe: Optional[str] = None
+    symptomes: List[str] = Field(default_factory=list)
+    examens: List[str] = Field(default_factory=list)
+    historique: Optional[str] = None
+    traitement_actuel: Optional[str] = None
+
+
+class AssessmentOutput(_Output):
+    """The model's assessment (same fields as ``VeterinaryAssessmentResponse``).
+
+    Accepts what the parsing before it accepted: a null assessment is an
+    empty one, and ``patient_data`` given as a list (which older prompts
+    produce) means no patient data, as in the API response.
+    """
+    assessment: str
+    status: str = "processed"
+    localization: Optional[str] = None
+    differentials: List[DifferentialOutput] = Field(default_factory=list)
+    diagnostics: List[str] = Field(default_factory=list)
+    treatment: str = ""
+    prognosis: str = ""
+    patient_data: Optional[PatientDataOutput] = None
+    question: str = ""
+    confidence_level: str = "moyenne"
+
+    @field_validator("assessment", mode="before")
+    @classmethod
+    def _null_assessment(cls, value: Any) -> Any:
+        return "" if value is None else value
+
+    @field_validator("patient_data", mode="before")
+    @classmethod
+    def _list_patient_data(cls, value: Any) -> Any:
+        return None if isinstance(value, list) else value
+
+
+# Built once: validating against it parses and checks the JSON in a single pass
+ASSESSMENT_ADAPTER = TypeAdapter(AssessmentOutput)
+
+
+def strict_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a pydantic JSON schema into one accepted by strict structured outputs.
+
+    Strict mode wants every property listed as required (optional ones are
+    nullable instead), no additional properties and no defaults. Titles
+    and docstrings are left out too: they would only add prompt tokens.
+
+    Args:
+        schema: Output of ``model_json_schema``
+
+    Returns:
+        A modified copy
+    """
+    schema = copy.deepcopy(schema)
+
+    def visit(node: Any) -> None:
+        if isinstance(node, list):
+            for item in node:
+                visit(item)
+            return
+        if not isinstance(node, dict):
+            return
+        node.pop("default", None)
+        node.pop("title", None)
+        node.pop("description", None)
+        if "properties" in node:
+            node["required"] = list(node["properties"])
+            node["additionalProperties"] = False
+            for child in node["properties"].values():
+                visit(child)
+        for key in ("items", "anyOf", "$defs"):
+            if key in node:
+                visit(list(node[key].values()) if key == "$defs" else node[key])
+
+    visit(schema)
+    return schema
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing brace or bracket, outside strings."""
+    out = []
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char == ",":
+            following = text[index + 1:].lstrip()
+            if following[:1] in ("}", "]"):
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def repair_json(text: str) -> Tuple[str, List[str]]:
+    """
+    Fix the usual defects of model-written JSON.
+
+    Args:
+        text: Output that failed to parse
+
+    Returns:
+        The repaired text and the repairs applied ("fence", "extract", "trailing_comma")
+    """
+    repairs = []
+    text = text.strip()
+    match = _FENCE.match(text)
+    if match:
+        text = match.group(1)
+        repairs.append("fence")
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start and (start > 0 or end < len(text) - 1):
+        # Prose around the object
+        text = text[start:end + 1]
+        repairs.append("extract")
+    stripped = _strip_trailing_commas(text)
+    if stripped != text:
+        text = stripped
+        repairs.append("trailing_comma")
+    return text, repairs
+
+
+def _is_json_error(error: ValidationError) -> bool:
+    """Whether validation failed on the JSON syntax rather than on the schema."""
+    return any(item["type"] == "json_invalid" for item in error.errors())
+
+
+class AssessmentDecoder:
+    """Turns the model output into a validated assessment, repairing it if cheap.
+
+    With structured outputs the provider constrains generation to
+    ``AssessmentOutput``'s schema, so the output parses as is. The
+    precompiled adapter validates it in one pass. Output that still
+    doesn't parse (a fenced block, prose around the object, a trailing
+    comma) is repaired locally instead of being shown as plain text,
+    which made the user ask again and paid for another generation.
+    Unknown keys are dropped and nulls stand for missing values. Decodes,
+    repairs and failures are counted.
+    """
+
+    def __init__(self, structured_output: Optional[bool] = None):
+        """
+        Initialize the decoder.
+
+        Args:
+            structured_output: Ask the provider for schema-constrained output (AI_STRUCTURED_OUTPUT, default true)
+        """
+        if structured_output is None:
+            structured_output = os.getenv("AI_STRUCTURED_OUTPUT", "true").lower() == "true"
+        self.structured_output = structured_output
+        self._schema = strict_json_schema(AssessmentOutput.model_json_schema())
+
+    @property
+    def response_format(self) -> Optional[Dict[str, Any]]:
+        """The ``text`` argument of a Responses API call, or None without structured output."""
+        if not self.structured_output:
+            return None
+        return {
+            "format": {
+                "type": "json_schema",
+                "name": "veterinary_assessment",
+                "schema": self._schema,
+                "strict": True,
+            }
+        }
+
+    def decode(self, content: str, count: bool = True) -> AssessmentOutput:
+        """
+        Validate the model output, repairing it if needed.
+
+        Args:
+            content: Text produced by the model
+            count: Report the outcome in the metrics
+
+        Returns:
+            The assessment
+
+        Raises:
+            AssessmentDecodeError: If the output is not a usable assessment, even after repair
+        """
+        repairs: List[str] = []
+        try:
+            output = ASSESSMENT_ADAPTER.validate_json(content)
+        except ValidationError as error:
+            output = None
+            if _is_json_error(error):
+                repaired, repairs = repair_json(content)
+                if repairs:
+                    try:
+                        output = ASSESSMENT_ADAPTER.validate_json(repaired)
+                    except ValidationError as retry_error:
+                        error = retry_error
+            if output is None:
+                reason = "json" if _is_json_error(error) else "schema"
+                if count:
+                    metrics.incr("ai_decode_failures_total", labels={"reason": reason})
+                    metrics.incr("ai_decode_total", labels={"result": "failed"})
+                raise AssessmentDecodeError(reason) from error
+
+        if self._drop_extra(output):
+            repairs.append("extra_keys")
+        if count:
+            for repair in repairs:
+                metrics.incr("ai_decode_repairs_total", labels={"kind": repair})
+            metrics.incr("ai_decode_total", labels={"result": "repaired" if repairs else "valid"})
+        return output
+
+    def _drop_extra(self, output: BaseModel) -> bool:
+        """Remove keys outside the schema, at any depth; returns whether there were any."""
+        dropped = False
+        if output.model_extra:
+            output.model_extra.clear()
+            dropped = True
+        for value in output.__dict__.values():
+            items = value if isinstance(value, list) else [value]
+            for item in items:
+                if isinstance(item, BaseModel):
+                    dropped = self._drop_extra(item) or dropped
+        return dropped
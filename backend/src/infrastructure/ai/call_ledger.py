@@ -0,0 +1,348 @@
+"""Ledger of AI provider calls: tokens, latency and outcome of each call."""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+import openai
+from sqlalchemy import func, insert, select
+
+from src.infrastructure.database import AICallModel, database
+from src.infrastructure.deadline import DeadlineExceededError
+from src.infrastructure.metrics import metrics
+
+from .model_routing import ModelRoute
+from .resilience import is_transient
+
+logger = logging.getLogger(__name__)
+
+# Columns the rollups can be grouped by
+ROLLUP_COLUMNS = {
+    "session": AICallModel.session_id,
+    "user": AICallModel.user_id,
+    "clinic": AICallModel.clinic_name,
+}
+
+
+def normalize_clinic(clinic_name: Optional[str]) -> Optional[str]:
+    """Clinic names as typed at registration, folded to one key per clinic."""
+    if not clinic_name or not clinic_name.strip():
+        return None
+    return clinic_name.strip().lower()
+
+
+@dataclass
+class UsageAccount:
+    """Who the tokens of a call are counted against."""
+    user_id: Optional[str] = None
+    clinic_name: Optional[str] = None
+
+
+@dataclass
+class AICallRecord:
+    """One provider call, as written to the ledger."""
+    session_id: Optional[str]
+    route: str
+    model: str
+    prompt_version: str
+    user_id: Optional[str] = None
+    clinic_name: Optional[str] = None
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: int = 0
+    attempts: int = 0
+    outcome: str = "ok"
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    @classmethod
+    def start(cls, session_id: Optional[str], route: ModelRoute, account: Optional[UsageAccount]) -> "AICallRecord":
+        """Open the record of a call about to be made."""
+        account = account or UsageAccount()
+        return cls(
+            session_id=session_id,
+            route=route.name,
+            model=route.model,
+            prompt_version=route.prompt_version,
+            user_id=account.user_id,
+            clinic_name=normalize_clinic(account.clinic_name),
+        )
+
+    @property
+    def retries(self) -> int:
+        """Attempts beyond the first (retries and hedges)."""
+        return max(0, self.attempts - 1)
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens."""
+        return self.input_tokens + self.output_tokens
+
+    def set_usage(self, usage: Optional[Any]) -> None:
+        """Copy the token counts of the provider's usage object."""
+        if usage is None:
+            return
+        details = getattr(usage, "input_tokens_details", None)
+        self.input_tokens = getattr(usage, "input_tokens", 0) or 0
+        self.cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        self.output_tokens = getattr(usage, "output_tokens", 0) or 0
+
+    def fail(self, error: BaseException) -> None:
+        """Classify the error that ended the call."""
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.outcome = "cancelled"
+        elif isinstance(error, (DeadlineExceededError, openai.APITimeoutError)):
+            self.outcome = "timeout"
+        elif isinstance(error, Exception) and is_transient(error):
+            self.outcome = "unavailable"
+        else:
+            self.outcome = "error"
+
+
+@dataclass
+class TokenUsage:
+    """Totals of a set of ledger rows."""
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens."""
+        return self.input_tokens + self.output_tokens
+
+
+class AICallLedger:
+    """Writes a row per AI provider call, in batches, off the request path.
+
+    ``record`` only appends to an in-memory buffer; a background task
+    inserts the buffer every ``flush_interval`` seconds, or as soon as
+    ``batch_size`` records are waiting. If the database is unavailable the
+    records are kept for the next flush, up to ``max_pending``, past which
+    the oldest are dropped: losing accounting rows is better than holding
+    up or crashing turns. Records still buffered are written on ``close``.
+
+    The rollups read the table, so they don't see the records of the last
+    few seconds; ``recent_tokens`` covers those for this process.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Initialize the ledger.
+
+        Args:
+            session_factory: Session factory for the ledger table
+            batch_size: Records per insert (AI_LEDGER_BATCH_SIZE, default 200)
+            flush_interval: Seconds between writes (AI_LEDGER_FLUSH_SECONDS, default 2)
+            max_pending: Records kept while the database is unavailable (AI_LEDGER_MAX_PENDING, default 10000)
+        """
+        self._session_factory = session_factory or database.async_session
+        self.batch_size = batch_size or int(os.getenv("AI_LEDGER_BATCH_SIZE", "200"))
+        self.flush_interval = flush_interval or float(os.getenv("AI_LEDGER_FLUSH_SECONDS", "2"))
+        self.max_pending = max_pending or int(os.getenv("AI_LEDGER_MAX_PENDING", "10000"))
+        self._pending: List[AICallRecord] = []
+        # (scope, key) -> tokens recorded by this process, for the budgets
+        self._recent: Dict[Tuple[str, str], int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        """Start the background writer."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="ai-call-ledger")
+        logger.info(f"AI call ledger started (batch_size={self.batch_size})")
+
+    async def close(self) -> None:
+        """Stop the background writer, writing what is still buffered."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            while await self.flush():
+                pass
+        except Exception as e:
+            logger.error(f"Could not write {len(self._pending)} AI call records: {e}")
+
+    def record(self, call: AICallRecord) -> None:
+        """Queue a finished call for writing."""
+        self._pending.append(call)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            metrics.incr("ai_ledger_dropped_total", overflow)
+        if call.user_id:
+            self._count(("user", call.user_id), call.total_tokens)
+        if call.clinic_name:
+            self._count(("clinic", call.clinic_name), call.total_tokens)
+        metrics.set_gauge("ai_ledger_pending", len(self._pending))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def recent_tokens(self, scope: str, key: str) -> int:
+        """Tokens recorded by this process for a user or clinic since it started (a counter)."""
+        return self._recent.get((scope, key), 0)
+
+    async def flush(self) -> int:
+        """Write one batch of buffered records; returns the number written."""
+        batch = self._pending[: self.batch_size]
+        if not batch:
+            return 0
+        del self._pending[: len(batch)]
+        try:
+            async with self._session_factory() as session:
+                await session.execute(insert(AICallModel), [self._row(call) for call in batch])
+                await session.commit()
+        except Exception:
+            # Put them back for the next flush, ahead of newer records
+            self._pending[:0] = batch
+            metrics.incr("ai_ledger_write_failures_total")
+            raise
+        finally:
+            metrics.set_gauge("ai_ledger_pending", len(self._pending))
+        metrics.incr("ai_ledger_written_total", len(batch))
+        return len(batch)
+
+    async def usage(
+        self,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        clinic_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> TokenUsage:
+        """
+        Total usage of a session, user or clinic.
+
+        Args:
+            session_id: Only calls of this session
+            user_id: Only calls of this user
+            clinic_name: Only calls of this clinic
+            since: Only calls made from this time on
+
+        Returns:
+            The totals of the matching calls
+        """
+        query = select(*self._totals())
+        query = self._filtered(query, session_id, user_id, clinic_name, since)
+        async with self._session_factory() as session:
+            row = (await session.execute(query)).one()
+        return self._usage(row)
+
+    async def top(
+        self, group_by: str, since: Optional[datetime] = None, limit: int = 20
+    ) -> List[Tuple[str, TokenUsage]]:
+        """
+        Sessions, users or clinics that used the most tokens.
+
+        Args:
+            group_by: "session", "user" or "clinic"
+            since: Only count calls made from this time on
+            limit: Number of entries returned
+
+        Returns:
+            (key, usage) pairs, heaviest first
+        """
+        column = ROLLUP_COLUMNS[group_by]
+        total = func.sum(AICallModel.input_tokens + AICallModel.output_tokens)
+        query = (
+            select(column, *self._totals())
+            .where(column.is_not(None))
+            .group_by(column)
+            .order_by(total.desc())
+            .limit(limit)
+        )
+        query = self._filtered(query, since=since)
+        async with self._session_factory() as session:
+            rows = (await session.execute(query)).all()
+        return [(row[0], self._usage(row[1:])) for row in rows]
+
+    async def _run(self) -> None:
+        """Write batches as they fill up, or every ``flush_interval`` seconds."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.flush() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"AI call ledger write failed: {e}")
+
+    def _count(self, key: Tuple[str, str], tokens: int) -> None:
+        """Add to a per-process token counter."""
+        self._recent[key] = self._recent.get(key, 0) + tokens
+
+    def _totals(self) -> tuple:
+        """Aggregate columns of a rollup."""
+        return (
+            func.count(AICallModel.id),
+            func.coalesce(func.sum(AICallModel.input_tokens), 0),
+            func.coalesce(func.sum(AICallModel.cached_tokens), 0),
+            func.coalesce(func.sum(AICallModel.output_tokens), 0),
+            func.coalesce(func.sum(AICallModel.latency_ms), 0),
+        )
+
+    def _filtered(
+        self,
+        query,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        clinic_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ):
+        """Restrict a rollup to a session, user, clinic and period."""
+        if session_id is not None:
+            query = query.where(AICallModel.session_id == session_id)
+        if user_id is not None:
+            query = query.where(AICallModel.user_id == user_id)
+        if clinic_name is not None:
+            query = query.where(AICallModel.clinic_name == normalize_clinic(clinic_name))
+        if since is not None:
+            query = query.where(AICallModel.created_at >= since.astimezone(UTC).replace(tzinfo=None))
+        return query
+
+    def _usage(self, row) -> TokenUsage:
+        """Build totals from an aggregate row."""
+        calls, input_tokens, cached_tokens, output_tokens, latency_ms = (int(value or 0) for value in row)
+        return TokenUsage(calls, input_tokens, cached_tokens, output_tokens, latency_ms)
+
+    def _row(self, call: AICallRecord) -> Dict[str, Any]:
+        """Column values of a record."""
+        return {
+            "created_at": call.created_at.astimezone(UTC).replace(tzinfo=None),
+            "session_id": call.session_id,
+            "user_id": call.user_id,
+            "clinic_name": call.clinic_name,
+            "route": call.route,
+            "model": call.model,
+            "prompt_version": call.prompt_version,
+            "input_tokens": call.input_tokens,
+            "cached_tokens": call.cached_tokens,
+            "output_tokens": call.output_tokens,
+            "latency_ms": call.latency_ms,
+            "retries": call.retries,
+            "outcome": call.outcome,
+        }
+
+
+# Global AI call ledger
+ai_call_ledger = AICallLedger()
@@ -0,0 +1,203 @@
+"""Process-wide OpenAI client and AI service registry."""
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+import openai
+
+from src.infrastructure.admission import ai_admission
+
+from .adaptive_limit import AdaptiveConcurrencyLimit
+from .ai_service import AIService
+from .assessment_cache import AssessmentCache
+from .call_ledger import ai_call_ledger
+from .context_window import ContextWindow
+from .conversation_pool import ConversationPool
+from .model_routing import ModelRouter
+from .resilience import ResilientCaller
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AIClientSettings:
+    """AI provider and HTTP connection pool settings."""
+    api_key: Optional[str]
+    prompt_id: Optional[str]
+    prompt_version: str = "6"
+    model: str = "gpt-5.2"
+    temperature: float = 0.3
+    max_tokens: int = 2000
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    timeout: float = 300.0
+    connect_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "AIClientSettings":
+        """Load settings from environment variables."""
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            prompt_id=os.getenv("OPENAI_PROMPT_ID"),
+            prompt_version=os.getenv("OPENAI_PROMPT_VERSION", "6"),
+            model=os.getenv("OPENAI_MODEL", "gpt-5.2"),
+            temperature=float(os.getenv("TEMPERATURE", "0.3")),
+            max_tokens=int(os.getenv("MAX_TOKENS", "2000")),
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60")),
+            http2=os.getenv("OPENAI_HTTP2", "false").lower() == "true",
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "300")),
+            connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10")),
+        )
+
+    def validate(self) -> None:
+        """Raise ValueError if the provider is not configured."""
+        if not self.api_key or self.api_key == "demo_key":
+            raise ValueError(
+                "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+            )
+        if not self.prompt_id or self.prompt_id == "pmpt_demo":
+            raise ValueError(
+                "OpenAI Prompt ID not configured. Please set OPENAI_PROMPT_ID environment variable."
+            )
+
+
+class AIClientRegistry:
+    """Holds one pooled OpenAI client and AI service per worker process.
+
+    Building an ``AsyncOpenAI`` client per request gives every call a cold
+    connection pool, so each one pays a fresh TCP + TLS handshake. The
+    registry is started once by the application lifespan and shared by all
+    requests handled by the worker.
+    """
+
+    def __init__(self):
+        self.settings: Optional[AIClientSettings] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._service: Optional[AIService] = None
+        self._conversation_pool: Optional[ConversationPool] = None
+        self._concurrency_limit: Optional[AdaptiveConcurrencyLimit] = None
+        self._resilience: Optional[ResilientCaller] = None
+        self._error: Optional[str] = None
+
+    @property
+    def client(self) -> Optional[openai.AsyncOpenAI]:
+        """Return the shared OpenAI client, if started."""
+        return self._client
+
+    @property
+    def concurrency_limit(self) -> Optional[AdaptiveConcurrencyLimit]:
+        """Return the adaptive concurrency limit, if enabled."""
+        return self._concurrency_limit
+
+    @property
+    def resilience(self) -> Optional[ResilientCaller]:
+        """Return the retry / circuit breaker layer, if started."""
+        return self._resilience
+
+    def start(self, settings: Optional[AIClientSettings] = None) -> None:
+        """Create the shared HTTP pool, OpenAI client and AI service."""
+        if self._service is not None:
+            return
+
+        self.settings = settings or AIClientSettings.from_env()
+        try:
+            self.settings.validate()
+        except ValueError as e:
+            # Keep the app bootable without AI; requests get a clear error
+            self._error = str(e)
+            logger.warning(f"AI service disabled: {e}")
+            return
+
+        http2 = self.settings.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("OPENAI_HTTP2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+        self._http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                self.settings.timeout, connect=self.settings.connect_timeout
+            ),
+        )
+        self._client = openai.AsyncOpenAI(
+            api_key=self.settings.api_key,
+            http_client=self._http_client,
+            # Retries are done by ResilientCaller, which knows what is safe to repeat
+            max_retries=0,
+        )
+        self._resilience = ResilientCaller()
+        context_window = None
+        if os.getenv("AI_CONTEXT_MODE", "conversation").lower() == "local":
+            # Bounded input rebuilt from the database; no provider conversations
+            context_window = ContextWindow()
+        else:
+            self._conversation_pool = ConversationPool(self._client)
+            self._conversation_pool.start()
+        if os.getenv("AI_ADAPTIVE_LIMIT", "true").lower() == "true":
+            # Drives the admission controller's limit from provider feedback
+            self._concurrency_limit = AdaptiveConcurrencyLimit(on_change=ai_admission.set_limit)
+        self._service = AIService(
+            api_key=self.settings.api_key,
+            prompt_id=self.settings.prompt_id,
+            prompt_version=self.settings.prompt_version,
+            model=self.settings.model,
+            temperature=self.settings.temperature,
+            max_tokens=self.settings.max_tokens,
+            client=self._client,
+            conversation_pool=self._conversation_pool,
+            assessment_cache=AssessmentCache(),
+            concurrency_limit=self._concurrency_limit,
+            resilience=self._resilience,
+            context_window=context_window,
+            router=ModelRouter(self.settings.model, self.settings.prompt_version),
+            ledger=ai_call_ledger,
+            provider_timeout=self.settings.timeout,
+        )
+        self._error = None
+        logger.info(
+            f"AI client started (max_connections={self.settings.max_connections}, "
+            f"keepalive={self.settings.max_keepalive_connections}, http2={http2})"
+        )
+
+    def get_service(self) -> AIService:
+        """Return the shared AI service, starting the registry if needed.
+
+        Raises:
+            RuntimeError: If the AI provider is not configured
+        """
+        if self._service is None and self._error is None:
+            self.start()
+        if self._service is None:
+            raise RuntimeError(self._error or "AI service not available")
+        return self._service
+
+    async def close(self) -> None:
+        """Close the shared client and its connection pool."""
+        if self._conversation_pool is not None:
+            await self._conversation_pool.close()
+        if self._client is not None:
+            await self._client.close()
+        self._http_client = None
+        self._client = None
+        self._service = None
+        self._conversation_pool = None
+        self._concurrency_limit = None
+        self._resilience = None
+        self._error = None
+
+
+# Global registry instance
+ai_client_registry = AIClientRegistry()
@@ -0,0 +1,134 @@
+"""Bounded model context built from the stored consultation."""
+import os
+from typing import Dict, List, Optional
+
+from src.domain.entities import ChatMessage, VeterinaryAssessment
+from src.infrastructure.metrics import metrics
+
+# Rough size of a token in French clinical text; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ContextWindow:
+    """Builds a bounded model input instead of relying on the provider conversation.
+
+    A provider conversation replays every earlier turn, so a long work-up
+    pays more input tokens and latency on each message. Here the input is
+    rebuilt from the database on every turn: the patient data, which
+    rarely changes and so stays in the provider's prompt cache, then a
+    structured summary of the consultation (current assessment, earlier
+    statements of the owner), then the last ``max_turns`` exchanges
+    verbatim, then the new message. When that exceeds ``token_budget``
+    the oldest statements are dropped first, then the oldest verbatim
+    turns are folded into the summary.
+    """
+
+    def __init__(
+        self,
+        max_turns: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        statement_chars: Optional[int] = None,
+    ):
+        """
+        Initialize the context window.
+
+        Args:
+            max_turns: Exchanges kept verbatim (AI_CONTEXT_TURNS, default 4)
+            token_budget: Estimated input tokens per turn (AI_CONTEXT_TOKEN_BUDGET, default 3000)
+            statement_chars: Length an earlier owner message is cut to in the summary (default 240)
+        """
+        self.max_turns = max_turns or int(os.getenv("AI_CONTEXT_TURNS", "4"))
+        self.token_budget = token_budget or int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "3000"))
+        self.statement_chars = statement_chars or 240
+
+    def build(
+        self,
+        history: List[ChatMessage],
+        user_input: str,
+        assessment: Optional[VeterinaryAssessment] = None,
+        patient_context: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Build the Responses API input items for a turn.
+
+        Args:
+            history: Earlier messages, oldest first, without the ones being answered
+            user_input: Text of the message(s) being answered
+            assessment: The session's current assessment
+            patient_context: Formatted patient data block
+
+        Returns:
+            Input items: patient data, summary, verbatim turns, new message
+        """
+        recent = history[-2 * self.max_turns:] if self.max_turns > 0 else []
+        older = history[: len(history) - len(recent)]
+        statements = [self._statement(message) for message in older if message.role == "user"]
+
+        fixed = estimate_tokens(user_input) + (estimate_tokens(patient_context) if patient_context else 0)
+
+        def size() -> int:
+            summary = self._summary(assessment, statements)
+            return fixed + estimate_tokens(summary) + self._size(recent)
+
+        # Drop the oldest statements first, then fold verbatim turns into the summary
+        while size() > self.token_budget and (statements or recent):
+            if statements:
+                statements.pop(0)
+            else:
+                message = recent.pop(0)
+                if message.role == "user":
+                    statements.append(self._statement(message))
+
+        items = []
+        if patient_context:
+            items.append({"role": "developer", "content": patient_context})
+        summary = self._summary(assessment, statements)
+        if summary:
+            items.append({"role": "developer", "content": summary})
+        items.extend({"role": message.role, "content": message.content} for message in recent)
+        items.append({"role": "user", "content": user_input})
+
+        metrics.observe("ai_context_tokens", sum(estimate_tokens(item["content"]) for item in items))
+        metrics.observe("ai_context_verbatim_messages", len(recent))
+        return items
+
+    def _summary(self, assessment: Optional[VeterinaryAssessment], statements: List[str]) -> str:
+        """Structured summary of the consultation so far ("" at its start)."""
+        parts = []
+        if assessment is not None:
+            parts.append("[ÉVALUATION EN COURS]")
+            parts.append(f"Évaluation: {assessment.assessment}")
+            if assessment.localization:
+                parts.append(f"Localisation: {assessment.localization}")
+            if assessment.differentials:
+                differentials = "; ".join(
+                    f"{item.get('condition', '')} ({item.get('probability', '')})"
+                    for item in assessment.differentials
+                )
+                parts.append(f"Diagnostics différentiels: {differentials}")
+            if assessment.diagnostics:
+                parts.append(f"Examens proposés: {', '.join(assessment.diagnostics)}")
+            if assessment.question:
+                parts.append(f"Dernière question posée: {assessment.question}")
+            parts.append("[FIN ÉVALUATION]")
+        if statements:
+            parts.append("[PROPOS ANTÉRIEURS DU PROPRIÉTAIRE]")
+            parts.extend(f"- {statement}" for statement in statements)
+            parts.append("[FIN PROPOS]")
+        return "\n".join(parts)
+
+    def _statement(self, message: ChatMessage) -> str:
+        """An earlier owner message, shortened for the summary."""
+        text = " ".join(message.content.split())
+        if len(text) > self.statement_chars:
+            text = text[: self.statement_chars - 1] + "…"
+        return text
+
+    def _size(self, messages: List[ChatMessage]) -> int:
+        """Estimated tokens of verbatim messages."""
+        return sum(estimate_tokens(message.content) for message in messages)
@@ -0,0 +1,116 @@
+"""Pool of pre-created OpenAI conversations."""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import openai
+
+from src.infrastructure.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationPool:
+    """Background-filled pool of conversation ids for new sessions.
+
+    Creating the conversation of a new session is a full provider round
+    trip before its first response can even be requested. The pool creates
+    conversations ahead of time: a new session takes one, and the pool is
+    topped back up to ``target_size`` in the background once it drops to
+    ``low_watermark``. Ids older than ``ttl`` are discarded unused.
+    """
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        target_size: Optional[int] = None,
+        low_watermark: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the conversation pool.
+
+        Args:
+            client: Shared OpenAI client
+            target_size: Ids kept ready (AI_CONVERSATION_POOL_SIZE, default 8, 0 disables)
+            low_watermark: Refill threshold (AI_CONVERSATION_POOL_LOW_WATERMARK, default 3)
+            ttl_seconds: Maximum age of a pooled id (AI_CONVERSATION_POOL_TTL_SECONDS, default 3600)
+        """
+        self.client = client
+        self.target_size = target_size if target_size is not None else int(os.getenv("AI_CONVERSATION_POOL_SIZE", "8"))
+        self.low_watermark = low_watermark if low_watermark is not None else int(os.getenv("AI_CONVERSATION_POOL_LOW_WATERMARK", "3"))
+        self.ttl = ttl_seconds or float(os.getenv("AI_CONVERSATION_POOL_TTL_SECONDS", "3600"))
+        self._ids: Deque[Tuple[float, str]] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def size(self) -> int:
+        """Number of pooled ids (including any not yet discarded as expired)."""
+        return len(self._ids)
+
+    def start(self) -> None:
+        """Fill the pool in the background."""
+        self._schedule_refill()
+
+    def take(self) -> Optional[str]:
+        """Return a fresh pooled conversation id, or None if the pool is empty."""
+        now = time.monotonic()
+        conversation_id = None
+        while self._ids:
+            created_at, candidate = self._ids.popleft()
+            if now - created_at <= self.ttl:
+                conversation_id = candidate
+                break
+            metrics.incr("ai_conversation_pool_expired_total")
+
+        if conversation_id:
+            self._hits += 1
+            metrics.incr("ai_conversation_pool_hits_total")
+        else:
+            self._misses += 1
+            metrics.incr("ai_conversation_pool_misses_total")
+        metrics.set_gauge("ai_conversation_pool_hit_ratio", self._hits / (self._hits + self._misses))
+        metrics.set_gauge("ai_conversation_pool_size", len(self._ids))
+
+        if len(self._ids) <= self.low_watermark:
+            self._schedule_refill()
+        return conversation_id
+
+    async def close(self) -> None:
+        """Stop any running refill."""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+        self._ids.clear()
+
+    def _schedule_refill(self) -> None:
+        """Start a refill unless one is already running."""
+        if self.target_size <= 0 or (self._refill_task and not self._refill_task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop yet (e.g. started from sync code); the first take() refills
+            return
+        self._refill_task = loop.create_task(self._refill(), name="ai-conversation-pool-refill")
+
+    async def _refill(self) -> None:
+        """Create conversations until the pool is back at its target size."""
+        while len(self._ids) < self.target_size:
+            try:
+                conversation = await self.client.conversations.create()
+            except Exception as e:
+                # Keep serving misses synchronously; retry on the next take()
+                logger.warning(f"Could not pre-create AI conversation: {e}")
+                return
+            self._ids.append((time.monotonic(), conversation.id))
+            metrics.set_gauge("ai_conversation_pool_size", len(self._ids))
@@ -0,0 +1,81 @@
+"""Per-turn choice of model and prompt version."""
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.infrastructure.metrics import metrics
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model and prompt version used for a turn."""
+    name: str  # "intake" or "diagnosis"
+    model: str
+    prompt_version: str
+
+
+class ModelRouter:
+    """Sends intake turns to a cheaper model and the rest to the main one.
+
+    While the session is still collecting data and the patient data is
+    incomplete, a turn mostly extracts breed, age and symptoms, which a
+    smaller model does faster and for less. Long messages stay on the
+    main model even then, since they usually carry the clinical history
+    that the diagnosis depends on. Without an intake model every turn
+    takes the diagnosis route.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        prompt_version: str,
+        intake_model: Optional[str] = None,
+        intake_prompt_version: Optional[str] = None,
+        intake_max_chars: Optional[int] = None,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            model: Main model, used for diagnosis turns
+            prompt_version: Prompt version used with the main model
+            intake_model: Model for intake turns (AI_INTAKE_MODEL, default none)
+            intake_prompt_version: Prompt version for intake turns (AI_INTAKE_PROMPT_VERSION, default: same)
+            intake_max_chars: Longest message routed to intake (AI_INTAKE_MAX_CHARS, default 600)
+        """
+        self.diagnosis = ModelRoute("diagnosis", model, prompt_version)
+        intake_model = intake_model or os.getenv("AI_INTAKE_MODEL")
+        intake_prompt_version = intake_prompt_version or os.getenv("AI_INTAKE_PROMPT_VERSION") or prompt_version
+        self.intake = ModelRoute("intake", intake_model, intake_prompt_version) if intake_model else None
+        self.intake_max_chars = intake_max_chars or int(os.getenv("AI_INTAKE_MAX_CHARS", "600"))
+
+    def route(self, session, user_input: str) -> ModelRoute:
+        """Pick the route of a turn from the session's phase and the message."""
+        if self.intake is None or not session.is_collecting_data:
+            return self.diagnosis
+        if session.patient_data and session.patient_data.is_complete:
+            return self.diagnosis
+        if len(user_input) > self.intake_max_chars:
+            return self.diagnosis
+        return self.intake
+
+
+def record_route_call(route: ModelRoute, seconds: float, usage: Optional[Any]) -> None:
+    """Report a completed call's latency and token usage under its route.
+
+    The share of input tokens served from the provider's prompt cache is
+    observed per call in ``ai_prompt_cache_ratio``.
+    """
+    labels = {"route": route.name, "model": route.model}
+    metrics.incr("ai_route_requests_total", labels=labels)
+    metrics.observe("ai_route_latency_seconds", seconds, labels=labels)
+    if usage is None:
+        return
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    metrics.incr("ai_route_input_tokens_total", input_tokens, labels=labels)
+    metrics.incr("ai_route_cached_input_tokens_total", cached_tokens, labels=labels)
+    metrics.incr("ai_route_output_tokens_total", getattr(usage, "output_tokens", 0) or 0, labels=labels)
+    if input_tokens:
+        metrics.observe("ai_prompt_cache_ratio", cached_tokens / input_tokens, labels=labels)
@@ -0,0 +1,99 @@
+"""Incremental parsing of a streamed JSON object."""
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+
+class IncrementalJSONObjectParser:
+    """Extract top-level members of a JSON object as soon as they are complete.
+
+    The model streams its assessment as a single JSON object. Tokens are fed
+    as they arrive and every member whose value has been fully received is
+    returned once, so the client can render e.g. the localization before the
+    treatment plan has been generated.
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None):
+        self._fields = set(fields) if fields is not None else None
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+
+    @property
+    def text(self) -> str:
+        """Return everything fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add a chunk of text and return the members completed by it."""
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+
+        while not self._finished:
+            if not self._started:
+                # Skip anything before the object (e.g. a markdown fence)
+                start = buffer.find("{", self._pos)
+                if start == -1:
+                    break
+                self._started = True
+                self._pos = start + 1
+                continue
+
+            pos = self._skip_whitespace(self._pos)
+            if pos >= len(buffer):
+                break
+
+            char = buffer[pos]
+            if char == ",":
+                self._pos = pos + 1
+                continue
+            if char == "}":
+                self._finished = True
+                break
+            if char != '"':
+                # Not something we can parse incrementally
+                self._finished = True
+                break
+
+            try:
+                key, key_end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+
+            colon = self._skip_whitespace(key_end)
+            if colon >= len(buffer):
+                break
+            if buffer[colon] != ":":
+                self._finished = True
+                break
+
+            value_start = self._skip_whitespace(colon + 1)
+            if value_start >= len(buffer):
+                break
+
+            try:
+                value, value_end = self._decoder.raw_decode(buffer, value_start)
+            except json.JSONDecodeError:
+                break
+
+            # A number is only complete once a delimiter follows it
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if value_end >= len(buffer) or buffer[value_end] not in ",}" + _WHITESPACE:
+                    break
+
+            self._pos = value_end
+            if self._fields is None or key in self._fields:
+                completed.append((key, value))
+
+        return completed
+
+    def _skip_whitespace(self, pos: int) -> int:
+        """Return the index of the next non-whitespace character."""
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
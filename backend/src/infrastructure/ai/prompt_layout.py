@@ -0,0 +1,130 @@
+"""Request layout that keeps the start of each prompt identical between turns."""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.domain.entities import PatientData
+
+# Fields of the patient block, in the order they are always written
+PATIENT_FIELDS = (
+    ("age", "Âge"),
+    ("sex", "Sexe"),
+    ("race", "Race"),
+    ("weight", "Poids"),
+    ("symptoms", "Symptômes"),
+    ("symptom_duration", "Durée des symptômes"),
+    ("symptom_progression", "Évolution"),
+    ("medical_history", "Antécédents"),
+    ("current_medications", "Traitements en cours"),
+)
+PATIENT_SECTIONS = (
+    ("neurological_exam", "Examen neurologique"),
+    ("other_exams", "Autres examens"),
+)
+
+
+def _text(value: Any) -> str:
+    """A value on one line, with its whitespace normalized."""
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(_text(item) for item in value if item)
+    elif isinstance(value, dict):
+        value = "; ".join(f"{key}: {_text(value[key])}" for key in sorted(value) if value[key])
+    return " ".join(str(value).split())
+
+
+def render_patient_context(patient_data: Optional[PatientData]) -> Optional[str]:
+    """
+    Format the patient data block the model sees.
+
+    The same data always gives the same text: fields are written in a
+    fixed order and exam results sorted by name, whatever order they were
+    collected in.
+
+    Args:
+        patient_data: The session's patient data
+
+    Returns:
+        The block, or None if nothing is known about the patient yet
+    """
+    if patient_data is None:
+        return None
+    patient_dict = patient_data.to_dict()
+
+    lines = []
+    for name, label in PATIENT_FIELDS:
+        if patient_dict.get(name):
+            lines.append(f"{label}: {_text(patient_dict[name])}")
+    for name, label in PATIENT_SECTIONS:
+        results = patient_dict.get(name) or {}
+        entries = [f"  - {key}: {_text(results[key])}" for key in sorted(results) if results[key]]
+        if entries:
+            lines.append(f"{label}:")
+            lines.extend(entries)
+    if not lines:
+        return None
+    return "\n".join(["[DONNÉES PATIENT DISPONIBLES]", *lines, "[FIN DONNÉES PATIENT]"])
+
+
+class PromptLayout:
+    """Orders a turn's input so that what rarely changes comes first.
+
+    Providers reuse the computation of a prompt prefix they have already
+    seen, which bills those input tokens at a discount and shortens the
+    time to the first token. Putting the patient data in front of every
+    user message, as the turn text's prefix, left nothing to reuse after
+    the stored instructions. Here the patient block is its own input item:
+    in a provider conversation it is appended only when the data changed
+    since it was last sent, so the conversation so far stays a stable
+    prefix; with a local context window it comes right after the
+    instructions, ahead of the parts that change every turn.
+
+    Blocks are rendered once per patient data revision and kept for the
+    last ``max_sessions`` sessions.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None):
+        """
+        Initialize the layout.
+
+        Args:
+            max_sessions: Sessions whose patient block is kept rendered (default 1024)
+        """
+        self.max_sessions = max_sessions or 1024
+        # Session id -> (patient data revision, rendered block)
+        self._blocks: "OrderedDict[str, Tuple[int, Optional[str]]]" = OrderedDict()
+
+    def patient_context(self, session) -> Optional[str]:
+        """The session's patient block, rendered again only after its data changed."""
+        cached = self._blocks.get(session.id)
+        if cached is not None and cached[0] == session.patient_data_revision:
+            self._blocks.move_to_end(session.id)
+            return cached[1]
+
+        block = render_patient_context(session.patient_data)
+        self._blocks[session.id] = (session.patient_data_revision, block)
+        self._blocks.move_to_end(session.id)
+        while len(self._blocks) > self.max_sessions:
+            self._blocks.popitem(last=False)
+        return block
+
+    def conversation_input(self, session, user_input: str) -> List[Dict[str, str]]:
+        """
+        Input items of a turn appended to the provider conversation.
+
+        Args:
+            session: The chat session
+            user_input: Text of the message(s) being answered
+
+        Returns:
+            The patient block if the conversation doesn't have it yet, then the message
+        """
+        items = []
+        if session.patient_context_revision != session.patient_data_revision:
+            block = self.patient_context(session)
+            if block:
+                items.append({"role": "developer", "content": block})
+        items.append({"role": "user", "content": user_input})
+        return items
+
+    def cache_key(self, session) -> str:
+        """Prompt cache key, so that a session's turns reach the provider cache holding its prefix."""
+        return f"consultation:{session.id}"
@@ -0,0 +1,290 @@
+"""Retries, hedging and circuit breaking for AI provider calls."""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import openai
+
+from src.infrastructure.deadline import Deadline
+from src.infrastructure.metrics import metrics
+
+from .adaptive_limit import overload_reason, percentile
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses after which the provider did not run the request
+RETRYABLE_STATUS_CODES = (429, 502, 503)
+
+# Gauge values for ai_circuit_state
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("AI provider circuit is open")
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed call can be sent again without running it twice.
+
+    Connection failures, 429s and 502/503s mean the request was not
+    processed. Timeouts, 500s and 504s are ambiguous (the answer may have
+    been generated, billed and appended to the conversation), so they are
+    not retried.
+    """
+    if isinstance(error, openai.APITimeoutError):
+        return False
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error means "try again later" rather than a bad request."""
+    return isinstance(error, CircuitOpenError) or is_retryable(error) or overload_reason(error) is not None
+
+
+class CircuitBreaker:
+    """Fails fast while the provider keeps failing.
+
+    After ``failure_threshold`` consecutive provider-side failures (5xx,
+    connection errors, timeouts) the circuit opens and calls are rejected
+    without touching the network for ``reset_timeout`` seconds. Then a
+    single probe is let through: success closes the circuit, failure
+    opens it again. 429s don't count: the provider is up, and the
+    adaptive limit deals with them.
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures to open (AI_CIRCUIT_FAILURE_THRESHOLD, default 5)
+            reset_timeout: Seconds before probing again (AI_CIRCUIT_RESET_SECONDS, default 30)
+        """
+        self.failure_threshold = failure_threshold or int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout or float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        metrics.set_gauge("ai_circuit_state", CIRCUIT_STATES[self.state])
+
+    def before_call(self) -> None:
+        """
+        Let a call through or reject it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe running
+        """
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self.reset_timeout:
+            self._transition("half_open")
+        # A probe that never reported back (e.g. cancelled) doesn't block forever
+        if self.state == "half_open" and (
+            self._probe_started is None or now - self._probe_started >= self.reset_timeout
+        ):
+            self._probe_started = now
+            return
+        metrics.incr("ai_circuit_rejected_total")
+        remaining = self.reset_timeout - (now - self._opened_at)
+        raise CircuitOpenError(max(1, int(remaining)))
+
+    def record_success(self) -> None:
+        """The provider answered; close the circuit."""
+        self._failures = 0
+        self._probe_started = None
+        if self.state != "closed":
+            self._transition("closed")
+
+    def record_failure(self) -> None:
+        """The provider failed; open the circuit past the threshold."""
+        self._failures += 1
+        self._probe_started = None
+        if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self._transition("open")
+
+    def _transition(self, state: str) -> None:
+        """Change state and report it."""
+        logger.warning(f"AI provider circuit {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge("ai_circuit_state", CIRCUIT_STATES[state])
+        metrics.incr("ai_circuit_transitions_total", labels={"to": state})
+
+
+class ResilientCaller:
+    """Runs provider calls with jittered retries, optional hedging and a breaker.
+
+    Only failures where the request was not processed are retried (see
+    ``is_retryable``), with full-jitter exponential backoff that honours
+    the provider's Retry-After. Hedging is off by default and only ever
+    applies to calls marked hedgeable, i.e. calls whose duplicate costs
+    nothing and has no side effect, such as creating an empty
+    conversation. A generation is never one, with or without a
+    conversation: each copy is billed. A call that has not answered
+    within the p95 of its kind gets a second copy, and the first answer
+    wins. Hedges are
+    capped at ``hedge_ratio`` of calls so a slow provider is not hit
+    with twice the load.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        hedge_ratio: Optional[float] = None,
+        hedge_min_delay: Optional[float] = None,
+        window: int = 100,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize the caller.
+
+        Args:
+            breaker: Circuit breaker shared by all calls
+            max_attempts: Attempts per call (AI_RETRY_MAX_ATTEMPTS, default 3)
+            backoff_base: First backoff in seconds (AI_RETRY_BACKOFF_SECONDS, default 0.5)
+            backoff_max: Backoff ceiling in seconds (AI_RETRY_BACKOFF_MAX_SECONDS, default 8)
+            hedge: Enable hedged requests (AI_HEDGE_ENABLED, default false)
+            hedge_ratio: Maximum hedges per call (AI_HEDGE_MAX_RATIO, default 0.1)
+            hedge_min_delay: Lower bound of the hedge delay (AI_HEDGE_MIN_DELAY_SECONDS, default 0.2)
+            window: Latency samples kept per call kind
+            min_samples: Samples needed before hedging a kind
+        """
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts or int(os.getenv("AI_RETRY_MAX_ATTEMPTS", "3"))
+        self.backoff_base = backoff_base or float(os.getenv("AI_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.backoff_max = backoff_max or float(os.getenv("AI_RETRY_BACKOFF_MAX_SECONDS", "8"))
+        if hedge is None:
+            hedge = os.getenv("AI_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge = hedge
+        self.hedge_ratio = hedge_ratio or float(os.getenv("AI_HEDGE_MAX_RATIO", "0.1"))
+        self.hedge_min_delay = hedge_min_delay or float(os.getenv("AI_HEDGE_MIN_DELAY_SECONDS", "0.2"))
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._calls = 0
+        self._hedges = 0
+
+    async def call(
+        self,
+        kind: str,
+        fn: Callable[[], Awaitable[T]],
+        hedgeable: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """
+        Run ``fn`` until it succeeds, fails permanently or runs out of attempts or time.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self._calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                delay = self._hedge_delay(kind) if hedgeable else None
+                if delay is None:
+                    result = await self._timed(kind, fn)
+                else:
+                    result = await self._hedged(kind, fn, delay)
+            except Exception as e:
+                if is_transient(e) and not isinstance(e, openai.RateLimitError):
+                    self.breaker.record_failure()
+                elif isinstance(e, openai.APIStatusError):
+                    # A 4xx is an answer: the provider is up
+                    self.breaker.record_success()
+                if not is_retryable(e):
+                    raise
+                backoff = self._backoff(attempt, e)
+                out_of_time = deadline is not None and backoff is not None and backoff >= deadline.remaining
+                if attempt == self.max_attempts or backoff is None or out_of_time:
+                    metrics.incr("ai_retries_exhausted_total", labels={"kind": kind})
+                    raise
+                metrics.incr("ai_retries_total", labels={"kind": kind, "reason": type(e).__name__})
+                logger.info(f"Retrying AI {kind} call in {backoff:.2f}s after {type(e).__name__} (attempt {attempt})")
+                await asyncio.sleep(backoff)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _timed(self, kind: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run one attempt, recording its latency on success."""
+        started = time.monotonic()
+        result = await fn()
+        self._latencies.setdefault(kind, deque(maxlen=self.window)).append(time.monotonic() - started)
+        return result
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        """p95 latency of a kind once known, if hedging is enabled."""
+        samples = self._latencies.get(kind)
+        if not self.hedge or not samples or len(samples) < self.min_samples:
+            return None
+        return max(self.hedge_min_delay, percentile(samples, 0.95))
+
+    async def _hedged(self, kind: str, fn: Callable[[], Awaitable[T]], delay: float) -> T:
+        """Start a second copy of a slow call; the first success wins."""
+        pending = {asyncio.create_task(self._timed(kind, fn))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return done.pop().result()
+            if self._hedges >= self.hedge_ratio * self._calls:
+                return await pending.pop()
+
+            self._hedges += 1
+            metrics.incr("ai_hedges_total", labels={"kind": kind})
+            hedge = asyncio.create_task(self._timed(kind, fn))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.incr("ai_hedge_wins_total", labels={"kind": kind})
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _backoff(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Full-jitter exponential backoff, or the provider's Retry-After if longer.
+
+        Returns None when the provider asks to wait longer than
+        ``backoff_max``: the caller is better served by a prompt 503.
+        """
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        response = getattr(error, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        if header:
+            try:
+                retry_after = float(header)
+            except ValueError:
+                return backoff
+            if retry_after > self.backoff_max:
+                return None
+            backoff = max(backoff, retry_after)
+        return backoff
@@ -0,0 +1,108 @@
+"""Monthly token budgets per user and per clinic."""
+import logging
+import os
+import time
+from datetime import datetime, UTC
+from typing import Dict, Optional, Tuple
+
+from src.infrastructure.admission import AdmissionRejectedError
+from src.infrastructure.metrics import metrics
+
+from .call_ledger import AICallLedger, UsageAccount, ai_call_ledger, normalize_clinic
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudgetExceededError(AdmissionRejectedError):
+    """Raised when a user or clinic has used its token budget for the month."""
+
+
+def month_start(now: datetime) -> datetime:
+    """First instant of the (UTC) calendar month of ``now``."""
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month_start(now: datetime) -> datetime:
+    """First instant of the month after ``now``'s."""
+    start = month_start(now)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+class TokenBudget:
+    """Refuses AI turns to users and clinics past their monthly token budget.
+
+    Usage is read from the call ledger and cached for ``refresh_seconds``
+    per user and clinic; the tokens this process recorded since are added
+    on top, so a heavy user is stopped without a query per turn. Another
+    worker's calls are seen at the next refresh, so a budget can be
+    overshot by what one refresh interval of traffic costs. A budget of 0
+    means no limit. If the ledger can't be read the turn is let through.
+    """
+
+    def __init__(
+        self,
+        ledger: Optional[AICallLedger] = None,
+        user_limit: Optional[int] = None,
+        clinic_limit: Optional[int] = None,
+        refresh_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            ledger: Ledger the usage is read from
+            user_limit: Tokens per user per month (AI_USER_MONTHLY_TOKEN_BUDGET, default 0: no limit)
+            clinic_limit: Tokens per clinic per month (AI_CLINIC_MONTHLY_TOKEN_BUDGET, default 0: no limit)
+            refresh_seconds: How long usage read from the ledger is reused (AI_TOKEN_BUDGET_REFRESH_SECONDS, default 60)
+        """
+        self.ledger = ledger or ai_call_ledger
+        self.user_limit = user_limit or int(os.getenv("AI_USER_MONTHLY_TOKEN_BUDGET", "0"))
+        self.clinic_limit = clinic_limit or int(os.getenv("AI_CLINIC_MONTHLY_TOKEN_BUDGET", "0"))
+        self.refresh_seconds = refresh_seconds or float(os.getenv("AI_TOKEN_BUDGET_REFRESH_SECONDS", "60"))
+        # (scope, key) -> (month start, read at, tokens in the ledger, local counter at read time)
+        self._cache: Dict[Tuple[str, str], Tuple[datetime, float, int, int]] = {}
+
+    async def check(self, account: UsageAccount) -> None:
+        """
+        Let a turn through if its user and clinic are within their budgets.
+
+        Raises:
+            TokenBudgetExceededError: If either has used its budget for the month
+        """
+        now = datetime.now(UTC)
+        checks = (
+            ("user", account.user_id, self.user_limit, "Budget mensuel de l'utilisateur atteint"),
+            ("clinic", normalize_clinic(account.clinic_name), self.clinic_limit, "Budget mensuel de la clinique atteint"),
+        )
+        for scope, key, limit, message in checks:
+            if not key or limit <= 0:
+                continue
+            spent = await self._spent(scope, key, now)
+            if spent is not None and spent >= limit:
+                metrics.incr("ai_token_budget_rejected_total", labels={"scope": scope})
+                retry_after = int((next_month_start(now) - now).total_seconds()) + 1
+                raise TokenBudgetExceededError(message, retry_after=retry_after)
+
+    async def _spent(self, scope: str, key: str, now: datetime) -> Optional[int]:
+        """Tokens used this month by a user or clinic, or None if unknown."""
+        start = month_start(now)
+        local = self.ledger.recent_tokens(scope, key)
+        cached = self._cache.get((scope, key))
+        if cached is not None and cached[0] == start and time.monotonic() - cached[1] < self.refresh_seconds:
+            _, _, stored, local_then = cached
+            return stored + local - local_then
+
+        filters = {"user_id": key} if scope == "user" else {"clinic_name": key}
+        try:
+            usage = await self.ledger.usage(since=start, **filters)
+        except Exception as e:
+            logger.warning(f"Could not read {scope} token usage: {e}")
+            return None
+        self._cache[(scope, key)] = (start, time.monotonic(), usage.total_tokens, local)
+        return usage.total_tokens
+
+
+# Global token budget
+ai_token_budget = TokenBudget()
@@ -6,7 +6,7 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from dotenv import load_dotenv
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Boolean, Integer, func
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Boolean, Integer, Index, func
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -130,6 +130,10 @@ class RefreshTokenModel(Base):
 class SessionModel(Base):
     """SQLAlchemy model for chat sessions."""
     __tablename__ = "chat_sessions"
+    # Serves the per-user session list ordered by recency
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -139,7 +143,9 @@ class SessionModel(Base):
     openai_thread_id = Column(String(255), nullable=True)
     patient_data = Column(JSON, nullable=True)
     is_collecting_data = Column(Boolean, default=True)
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=True, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=True)
+    patient_data_revision = Column(Integer, nullable=False, default=0, server_default="0")
+    patient_context_revision = Column(Integer, nullable=True)
 
     # Relationships
     messages = relationship("MessageModel", back_populates="session", cascade="all, delete-orphan")
@@ -149,9 +155,13 @@ class SessionModel(Base):
 class MessageModel(Base):
     """SQLAlchemy model for chat messages."""
     __tablename__ = "chat_messages"
+    # Serves the session filter and the timestamp sort (history, recent, pages)
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_timestamp", "session_id", "timestamp"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
-    session_id = Column(String(36), ForeignKey("chat_sessions.id"), nullable=False, index=True)
+    session_id = Column(String(36), ForeignKey("chat_sessions.id"), nullable=False)
     role = Column(String(20), nullable=False)
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
@@ -162,6 +172,105 @@ class MessageModel(Base):
     session = relationship("SessionModel", back_populates="messages")
 
 
+class AIJobModel(Base):
+    """SQLAlchemy model for asynchronous AI jobs."""
+    __tablename__ = "ai_jobs"
+
+    id = Column(String(36), primary_key=True, index=True)
+    session_id = Column(String(36), ForeignKey("chat_sessions.id"), nullable=False, index=True)
+    user_message_id = Column(String(36), nullable=False)
+    status = Column(String(20), nullable=False, index=True)  # "pending", "running", "succeeded", "failed"
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class EmailOutboxModel(Base):
+    """SQLAlchemy model for queued outgoing emails."""
+    __tablename__ = "email_outbox"
+    # Serves the dispatcher's "pending and due" scan
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(String(36), primary_key=True, index=True)
+    template = Column(String(50), nullable=False)
+    to_email = Column(String(255), nullable=False)
+    params = Column(JSON, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # "pending", "sent", "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class AssessmentCacheModel(Base):
+    """SQLAlchemy model for the shared tier of the first-turn assessment cache."""
+    __tablename__ = "ai_assessment_cache"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of the canonical inputs
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class AICancellationModel(Base):
+    """SQLAlchemy model for cancellations waiting for the worker running the turn."""
+    __tablename__ = "ai_request_cancellations"
+
+    session_id = Column(String(36), primary_key=True)
+    request_id = Column(String(64), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class SessionLockModel(Base):
+    """SQLAlchemy model for the lease of the worker running a session's turn."""
+    __tablename__ = "chat_session_locks"
+
+    session_id = Column(String(36), primary_key=True)
+    owner = Column(String(32), nullable=False)  # Random token of the holder
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class IdempotencyKeyModel(Base):
+    """SQLAlchemy model for idempotency keys and the responses they replay."""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of the route scope and client key
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of the request body
+    status = Column(String(20), nullable=False)  # "pending" or "completed"
+    response = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class AICallModel(Base):
+    """SQLAlchemy model for the ledger of AI provider calls."""
+    __tablename__ = "ai_calls"
+    # Serve the per-user and per-clinic rollups over a period
+    __table_args__ = (
+        Index("ix_ai_calls_user_id_created_at", "user_id", "created_at"),
+        Index("ix_ai_calls_clinic_name_created_at", "clinic_name", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    session_id = Column(String(36), nullable=True, index=True)  # No foreign key: outlives deleted sessions
+    user_id = Column(String(36), nullable=True)
+    clinic_name = Column(String(255), nullable=True)  # Normalized (stripped, lower case)
+    route = Column(String(20), nullable=False)  # "intake" or "diagnosis"
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Integer, nullable=False)
+    retries = Column(Integer, nullable=False, default=0)
+    outcome = Column(String(20), nullable=False)  # "ok", "error", "unavailable", "timeout", "cancelled"
+
+
 class DogBreedModel(Base):
     """SQLAlchemy model for dog breeds."""
     __tablename__ = "dog_breeds"
@@ -0,0 +1,88 @@
+"""Per-request deadlines shared by every stage of a request."""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from .metrics import metrics
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a request runs out of time."""
+
+
+class Deadline:
+    """Absolute time by which a request must be answered.
+
+    Created once per request and passed down to every stage, so that the
+    database, the admission queue and the AI provider all work against
+    the same clock instead of each applying its own timeout. A deadline
+    without a timeout never expires.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, expires_at: Optional[float] = None):
+        """
+        Initialize the deadline.
+
+        Args:
+            timeout: Seconds from now, or None for no deadline
+            expires_at: Absolute ``time.monotonic()`` value (overrides timeout)
+        """
+        if expires_at is None:
+            expires_at = time.monotonic() + timeout if timeout is not None else math.inf
+        self.expires_at = expires_at
+
+    @property
+    def bounded(self) -> bool:
+        """Whether this deadline can expire."""
+        return self.expires_at != math.inf
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left (``math.inf`` without a deadline)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether no time is left."""
+        return self.remaining <= 0
+
+    def timeout(self) -> Optional[float]:
+        """Seconds left for a client timeout argument, or None without a deadline."""
+        return self.remaining if self.bounded else None
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """A deadline ``seconds`` earlier, leaving that time to later stages."""
+        return Deadline(expires_at=self.expires_at - seconds)
+
+    def check(self, stage: str) -> None:
+        """
+        Fail fast before starting a stage with no time left.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed
+        """
+        if self.expired:
+            metrics.incr("deadline_exceeded_total", labels={"stage": stage})
+            raise DeadlineExceededError(f"Request deadline exceeded before {stage}")
+
+    @asynccontextmanager
+    async def stage(self, name: str, share: float = 1.0) -> AsyncIterator[None]:
+        """
+        Run a block with ``share`` of the remaining time, cancelling it on expiry.
+
+        Raises:
+            DeadlineExceededError: If the block overruns its share
+        """
+        self.check(name)
+        budget = self.remaining * share if self.bounded else None
+        scope = asyncio.timeout(budget)
+        try:
+            async with scope:
+                yield
+        except TimeoutError as e:
+            if not scope.expired():
+                raise
+            metrics.incr("deadline_exceeded_total", labels={"stage": name})
+            raise DeadlineExceededError(f"Request deadline exceeded during {name}") from e
@@ -1,4 +1,5 @@
 """Email services for user notifications."""
 from .email_service import EmailService
+from .outbox_dispatcher import EmailOutboxDispatcher, email_outbox_dispatcher
 
-__all__ = ["EmailService"]
+__all__ = ["EmailService", "EmailOutboxDispatcher", "email_outbox_dispatcher"]
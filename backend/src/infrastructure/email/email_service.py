@@ -2,9 +2,11 @@
 import os
 import base64
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import resend
 
+from src.domain.entities import OutboxEmail
+
 
 class EmailService:
     """Service for sending emails via Resend."""
@@ -54,20 +56,8 @@ class EmailService:
         # Return empty string if logo not found
         return ""
 
-    async def send_verification_email(
-        self, email: str, verification_token: str, first_name: str
-    ) -> bool:
-        """
-        Send email verification email.
-
-        Args:
-            email: Recipient email address
-            verification_token: Verification token
-            first_name: User's first name
-
-        Returns:
-            True if email was sent successfully, False otherwise
-        """
+    def _verification_content(self, verification_token: str, first_name: str) -> Tuple[str, str]:
+        """Render the subject and HTML body of the verification email."""
         subject = "NeuroLocus - Vérifiez votre adresse email"
         verification_url = f"{self.frontend_url}/verify-email?token={verification_token}"
 
@@ -99,6 +89,23 @@ class EmailService:
             </html>
             """
 
+        return subject, html_content
+
+    async def send_verification_email(
+        self, email: str, verification_token: str, first_name: str
+    ) -> bool:
+        """
+        Send email verification email.
+
+        Args:
+            email: Recipient email address
+            verification_token: Verification token
+            first_name: User's first name
+
+        Returns:
+            True if email was sent successfully, False otherwise
+        """
+        subject, html_content = self._verification_content(verification_token, first_name)
         return await self._send_email(email, subject, html_content)
 
     async def send_password_reset_email(self, email: str, reset_token: str) -> bool:
@@ -156,3 +163,41 @@ class EmailService:
         except Exception as e:
             print(f"[ERROR] Failed to send email to {to_email}: {str(e)}")
             return False
+
+    def render(self, email: OutboxEmail) -> Dict[str, Any]:
+        """
+        Render a queued email into Resend send parameters.
+
+        Args:
+            email: Outbox email with its template name and parameters
+
+        Returns:
+            Resend email parameters
+
+        Raises:
+            ValueError: If the template is unknown
+        """
+        if email.template == "verification":
+            subject, html_content = self._verification_content(
+                email.params["verification_token"], email.params["first_name"]
+            )
+        else:
+            raise ValueError(f"Unknown email template: {email.template}")
+
+        return {
+            "from": self.from_email,
+            "to": email.to_email,
+            "subject": subject,
+            "html": html_content,
+        }
+
+    def send_batch(self, params: List[Dict[str, Any]]) -> None:
+        """
+        Send up to 100 rendered emails in a single Resend batch call.
+
+        This is a blocking HTTP call; run it in a thread from async code.
+
+        Raises:
+            Exception: If the provider rejects or fails the batch
+        """
+        resend.Batch.send(params)
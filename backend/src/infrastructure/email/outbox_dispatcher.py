@@ -0,0 +1,159 @@
+"""Background sender draining the transactional email outbox."""
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, UTC
+from typing import List, Optional
+
+from src.domain.entities import OutboxEmail
+from src.infrastructure.database import database
+from src.infrastructure.metrics import metrics
+from src.infrastructure.repositories import SQLEmailOutboxRepository
+
+from .email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# Resend accepts at most 100 emails per batch call
+MAX_BATCH_SIZE = 100
+
+
+class EmailOutboxDispatcher:
+    """Sends queued emails in batches, outside of any request.
+
+    Handlers only insert an ``email_outbox`` row in the same transaction as
+    the change that triggers the email, so a request never waits on the
+    provider. This task claims due rows, sends them with one batch call
+    run in a thread, and retries failed batches with exponential backoff.
+    Rows are claimed with ``SKIP LOCKED`` plus a lease, so several worker
+    processes can run a dispatcher each without sending an email twice.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        self._session_factory = session_factory or database.async_session
+        self.batch_size = min(batch_size or int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50")), MAX_BATCH_SIZE)
+        self.poll_interval = poll_interval or float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "2"))
+        self.max_attempts = max_attempts or int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+        self.backoff_base = backoff_base or float(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "5"))
+        self.lease = timedelta(seconds=lease_seconds or float(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "120")))
+        self._email_service: Optional[EmailService] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self, email_service: Optional[EmailService] = None) -> None:
+        """Start the dispatcher loop."""
+        if self._task is not None:
+            return
+        try:
+            self._email_service = email_service or EmailService()
+        except ValueError as e:
+            # Emails stay queued until a configured worker picks them up
+            logger.warning(f"Email outbox dispatcher disabled: {e}")
+            return
+        self._task = asyncio.create_task(self._run(), name="email-outbox-dispatcher")
+        logger.info(f"Email outbox dispatcher started (batch_size={self.batch_size})")
+
+    def notify(self) -> None:
+        """Wake the dispatcher early, e.g. after queuing an email."""
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        """Stop the dispatcher loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Drain due batches, then sleep until the next poll or wakeup."""
+        while True:
+            try:
+                while await self.dispatch_once() == self.batch_size:
+                    pass
+                await self._record_depth()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox dispatch failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch; returns the number of emails claimed."""
+        now = datetime.now(UTC)
+        async with self._session_factory() as session:
+            emails = await SQLEmailOutboxRepository(session).claim_due(
+                self.batch_size, now, now + self.lease
+            )
+            await session.commit()
+        if not emails:
+            return 0
+
+        sendable: List[OutboxEmail] = []
+        params = []
+        for email in emails:
+            try:
+                params.append(self._email_service.render(email))
+                sendable.append(email)
+            except Exception as e:
+                # A message that cannot be rendered will never succeed
+                email.mark_failed(f"Render error: {e}")
+
+        if sendable:
+            try:
+                await asyncio.to_thread(self._email_service.send_batch, params)
+                for email in sendable:
+                    email.mark_sent()
+                metrics.incr("email_outbox_sent_total", len(sendable))
+            except Exception as e:
+                logger.warning(f"Email batch of {len(sendable)} failed: {e}")
+                metrics.incr("email_outbox_batch_failures_total")
+                for email in sendable:
+                    self._retry_or_fail(email, str(e))
+
+        async with self._session_factory() as session:
+            repository = SQLEmailOutboxRepository(session)
+            for email in emails:
+                await repository.update(email)
+            await session.commit()
+
+        failed = sum(1 for email in emails if email.status == "failed")
+        if failed:
+            metrics.incr("email_outbox_failed_total", failed)
+        return len(emails)
+
+    def _retry_or_fail(self, email: OutboxEmail, error: str) -> None:
+        """Reschedule an email with jittered exponential backoff, or give up."""
+        if email.attempts + 1 >= self.max_attempts:
+            logger.error(f"Giving up on email {email.id} to {email.to_email}: {error}")
+            email.mark_failed(error)
+            return
+        delay = self.backoff_base * (2 ** email.attempts) * random.uniform(0.5, 1.0)
+        email.schedule_retry(error, datetime.now(UTC) + timedelta(seconds=delay))
+
+    async def _record_depth(self) -> None:
+        """Publish the number of unsent emails."""
+        async with self._session_factory() as session:
+            depth = await SQLEmailOutboxRepository(session).count_pending()
+        metrics.set_gauge("email_outbox_depth", depth)
+
+
+# Global email outbox dispatcher instance
+email_outbox_dispatcher = EmailOutboxDispatcher()
@@ -0,0 +1,238 @@
+"""Idempotency keys: replay a request's result instead of running it twice."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from .database import IdempotencyKeyModel, database
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Result = Dict[str, Any]
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when an idempotency key comes back with a different request."""
+
+
+class IdempotencyInProgressError(Exception):
+    """Raised when the original request is still running in another worker."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("A request with this idempotency key is still in progress")
+        self.retry_after = retry_after
+
+
+def idempotency_fingerprint(payload: Dict[str, Any]) -> str:
+    """Hash a request body, whatever its key order."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """A request running in this worker, with the retries attached to it."""
+
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task = task
+
+
+class IdempotencyStore:
+    """Runs a request once per idempotency key and replays its result.
+
+    Clients on flaky networks resend a message after a timeout; without a
+    key each resend stores another user message and pays for another
+    generation. The first request with a key records it as pending in
+    ``idempotency_keys`` and its successful result is kept for ``ttl``:
+    later requests with the key get that result back. A retry arriving
+    while the original runs in the same worker attaches to it; one that
+    reaches another worker waits for the pending row to complete. Failed
+    requests release their key, so a retry runs again.
+
+    The work runs detached from the request that started it, so that it
+    still completes (and can be replayed) if that client drops.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        pending_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        session_factory=None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: How long results are replayed (IDEMPOTENCY_TTL_SECONDS, default 86400)
+            pending_seconds: Lease of a running request, in case its worker dies (IDEMPOTENCY_PENDING_SECONDS, default 300)
+            poll_interval: Seconds between checks of a request running in another worker
+            session_factory: Session factory for the idempotency table
+        """
+        self.ttl = timedelta(seconds=ttl_seconds or float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")))
+        self.pending = timedelta(seconds=pending_seconds or float(os.getenv("IDEMPOTENCY_PENDING_SECONDS", "300")))
+        self.poll_interval = poll_interval or 0.5
+        self._session_factory = session_factory or database.async_session
+        self._flights: Dict[str, _Flight] = {}
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        work: Callable[[], Awaitable[Result]],
+        timeout: Optional[float] = None,
+    ) -> Tuple[Result, bool]:
+        """
+        Run ``work`` unless a request with the same key already did.
+
+        Args:
+            scope: What the key applies to (route, session, user)
+            key: Client-provided idempotency key
+            fingerprint: Hash of the request body (see ``idempotency_fingerprint``)
+            work: Produces the JSON-serializable result to store
+            timeout: Maximum wait for the same request running in another worker
+
+        Returns:
+            The result and whether it was replayed rather than produced here
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for a different request
+            IdempotencyInProgressError: If the original is still running elsewhere after ``timeout``
+        """
+        record_key = hashlib.sha256(f"{scope}\n{key}".encode("utf-8")).hexdigest()
+        flight = self._flights.get(record_key)
+        if flight is not None:
+            if flight.fingerprint != fingerprint:
+                metrics.incr("idempotency_requests_total", labels={"outcome": "conflict"})
+                raise IdempotencyKeyReusedError("Idempotency key already used for a different request")
+            metrics.incr("idempotency_requests_total", labels={"outcome": "joined"})
+            result, _ = await asyncio.shield(flight.task)
+            return result, True
+
+        task = asyncio.ensure_future(self._execute(record_key, fingerprint, work, timeout))
+        self._flights[record_key] = _Flight(fingerprint, task)
+        task.add_done_callback(lambda done: self._forget(record_key, done))
+        # A client that gives up doesn't stop the work: its retry will want the result
+        return await asyncio.shield(task)
+
+    def _forget(self, record_key: str, task: asyncio.Task) -> None:
+        """Drop a finished flight; its error is reported to whoever still waits."""
+        self._flights.pop(record_key, None)
+        if not task.cancelled():
+            # Marks the exception retrieved when every client has gone
+            task.exception()
+
+    async def _execute(
+        self,
+        record_key: str,
+        fingerprint: str,
+        work: Callable[[], Awaitable[Result]],
+        timeout: Optional[float],
+    ) -> Tuple[Result, bool]:
+        """Claim the key, then run the work or return the stored result."""
+        recorded = True
+        try:
+            stored = await self._claim(record_key, fingerprint, timeout)
+        except (IdempotencyKeyReusedError, IdempotencyInProgressError):
+            raise
+        except Exception as e:
+            # Without the table, still run the request once per worker
+            logger.warning(f"Idempotency key check failed: {e}")
+            stored, recorded = None, False
+        if stored is not None:
+            metrics.incr("idempotency_requests_total", labels={"outcome": "replayed"})
+            return stored, True
+
+        metrics.incr("idempotency_requests_total", labels={"outcome": "new"})
+        try:
+            result = await work()
+        except BaseException:
+            if recorded:
+                await self._release(record_key)
+            raise
+        if recorded:
+            await self._store(record_key, result)
+        return result, False
+
+    async def _claim(self, record_key: str, fingerprint: str, timeout: Optional[float]) -> Optional[Result]:
+        """Record the key as pending, or return the result stored for it."""
+        give_up_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            now = datetime.now(UTC).replace(tzinfo=None)
+            async with self._session_factory() as session:
+                try:
+                    await session.execute(
+                        insert(IdempotencyKeyModel).values(
+                            key=record_key,
+                            fingerprint=fingerprint,
+                            status="pending",
+                            created_at=now,
+                            expires_at=now + self.pending,
+                        )
+                    )
+                    await session.commit()
+                    return None
+                except IntegrityError:
+                    await session.rollback()
+
+                result = await session.execute(
+                    select(IdempotencyKeyModel).where(IdempotencyKeyModel.key == record_key)
+                )
+                row = result.scalar_one_or_none()
+                if row is not None and row.expires_at <= now:
+                    # Expired result, or a pending lease whose worker died
+                    await session.execute(
+                        delete(IdempotencyKeyModel).where(
+                            IdempotencyKeyModel.key == record_key, IdempotencyKeyModel.expires_at <= now
+                        )
+                    )
+                    await session.commit()
+                    continue
+            if row is None:
+                continue
+            if row.fingerprint != fingerprint:
+                metrics.incr("idempotency_requests_total", labels={"outcome": "conflict"})
+                raise IdempotencyKeyReusedError("Idempotency key already used for a different request")
+            if row.status == "completed":
+                return json.loads(row.response)
+
+            if give_up_at is not None and time.monotonic() + self.poll_interval >= give_up_at:
+                metrics.incr("idempotency_requests_total", labels={"outcome": "in_progress"})
+                raise IdempotencyInProgressError(retry_after=5)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _store(self, record_key: str, result: Result) -> None:
+        """Keep a successful result for replay."""
+        now = datetime.now(UTC).replace(tzinfo=None)
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(IdempotencyKeyModel)
+                    .where(IdempotencyKeyModel.key == record_key)
+                    .values(status="completed", response=json.dumps(result), expires_at=now + self.ttl)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not store idempotent result: {e}")
+
+    async def _release(self, record_key: str) -> None:
+        """Forget a failed request so that its retry runs again."""
+        try:
+            async with self._session_factory() as session:
+                await session.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.key == record_key))
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not release idempotency key: {e}")
+
+
+# Global idempotency store
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,200 @@
+"""Registry of in-flight AI turns that their client may cancel."""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+from typing import AsyncIterator, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from .database import AICancellationModel, database
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TurnCancelledError(Exception):
+    """Raised inside a turn cancelled by its client."""
+
+
+class InFlightTurn:
+    """A running turn, cancellable between (or during) its awaited steps."""
+
+    def __init__(self, session_id: str, request_id: Optional[str]):
+        self.session_id = session_id
+        self.request_id = request_id
+        self.response_id: Optional[str] = None
+        self.cancelled = False
+        self._step: Optional[asyncio.Future] = None
+
+    def set_response_id(self, response_id: str) -> None:
+        """Remember the provider's response id, to cancel it there too."""
+        self.response_id = response_id
+
+    async def run(self, step: Awaitable[T]) -> T:
+        """
+        Await one step of the turn so that ``cancel()`` can interrupt it.
+
+        Raises:
+            TurnCancelledError: If the turn is or gets cancelled
+        """
+        if self.cancelled:
+            if asyncio.iscoroutine(step):
+                step.close()
+            raise TurnCancelledError("Requête annulée")
+        self._step = asyncio.ensure_future(step)
+        try:
+            return await self._step
+        except asyncio.CancelledError:
+            # Only our own cancel becomes an error; the caller's propagates
+            if self.cancelled and self._step.cancelled() and not _current_task_cancelling():
+                raise TurnCancelledError("Requête annulée") from None
+            raise
+        finally:
+            self._step = None
+
+    def cancel(self) -> None:
+        """Cancel the running step and every later one."""
+        self.cancelled = True
+        if self._step is not None:
+            self._step.cancel()
+
+
+def _current_task_cancelling() -> bool:
+    """Whether the current task itself has been asked to cancel."""
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
+
+
+class InFlightRegistry:
+    """Turns running in this worker, by session and client request id.
+
+    A cancel that reaches the worker running the turn takes effect at
+    once. Any other worker records it in ``ai_request_cancellations``;
+    while a worker has turns in flight it polls that table and cancels
+    the ones listed there.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        poll_interval: Optional[float] = None,
+        retention_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            session_factory: Session factory for cross-worker cancellations
+            poll_interval: Seconds between polls while turns run (AI_CANCEL_POLL_SECONDS, default 1)
+            retention_seconds: Age after which unclaimed cancellations are dropped (default 3600)
+        """
+        self._session_factory = session_factory or database.async_session
+        self.poll_interval = poll_interval or float(os.getenv("AI_CANCEL_POLL_SECONDS", "1"))
+        self.retention = timedelta(seconds=retention_seconds or 3600)
+        self._turns: Dict[Tuple[str, str], InFlightTurn] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def track(self, session_id: str, request_id: Optional[str]) -> AsyncIterator[InFlightTurn]:
+        """Register a turn for the duration of the block (no-op without a request id)."""
+        turn = InFlightTurn(session_id, request_id)
+        key = (session_id, request_id)
+        if request_id is None or key in self._turns:
+            yield turn
+            return
+
+        self._turns[key] = turn
+        metrics.set_gauge("ai_inflight_turns", len(self._turns))
+        self._ensure_poller()
+        try:
+            yield turn
+        finally:
+            del self._turns[key]
+            metrics.set_gauge("ai_inflight_turns", len(self._turns))
+
+    async def cancel(self, session_id: str, request_id: str) -> bool:
+        """
+        Cancel a turn, locally if it runs here, else through the database.
+
+        Returns:
+            True if the turn was running in this worker
+        """
+        metrics.incr("ai_cancel_requests_total")
+        turn = self._turns.get((session_id, request_id))
+        if turn is not None:
+            turn.cancel()
+            return True
+
+        now = datetime.now(UTC).replace(tzinfo=None)
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(AICancellationModel).where(AICancellationModel.created_at < now - self.retention)
+            )
+            try:
+                await session.execute(
+                    insert(AICancellationModel).values(
+                        session_id=session_id, request_id=request_id, created_at=now
+                    )
+                )
+            except IntegrityError:
+                # Already requested
+                await session.rollback()
+                return False
+            await session.commit()
+        return False
+
+    async def close(self) -> None:
+        """Stop polling for cancellations."""
+        if self._poller is None:
+            return
+        self._poller.cancel()
+        try:
+            await self._poller
+        except asyncio.CancelledError:
+            pass
+        self._poller = None
+
+    def _ensure_poller(self) -> None:
+        """Start polling for cross-worker cancellations unless already running."""
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll(), name="ai-cancel-poller")
+
+    async def _poll(self) -> None:
+        """Apply cancellations recorded by other workers while turns are running."""
+        while self._turns:
+            await asyncio.sleep(self.poll_interval)
+            keys = list(self._turns)
+            if not keys:
+                break
+            try:
+                async with self._session_factory() as session:
+                    condition = tuple_(
+                        AICancellationModel.session_id, AICancellationModel.request_id
+                    ).in_(keys)
+                    result = await session.execute(
+                        select(AICancellationModel.session_id, AICancellationModel.request_id).where(condition)
+                    )
+                    found = [tuple(row) for row in result.all()]
+                    if found:
+                        await session.execute(
+                            delete(AICancellationModel).where(
+                                tuple_(AICancellationModel.session_id, AICancellationModel.request_id).in_(found)
+                            )
+                        )
+                        await session.commit()
+            except Exception as e:
+                logger.warning(f"Could not poll AI cancellations: {e}")
+                continue
+            for key in found:
+                turn = self._turns.get(key)
+                if turn is not None:
+                    turn.cancel()
+
+
+# Global in-flight turn registry
+ai_inflight = InFlightRegistry()
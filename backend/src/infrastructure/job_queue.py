@@ -0,0 +1,110 @@
+"""In-process worker pool for asynchronous AI jobs."""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AIJobQueue:
+    """Runs queued AI jobs on a fixed number of asyncio workers.
+
+    Jobs live in the ``ai_jobs`` table; this queue only carries their IDs.
+    A job whose worker dies stays ``running`` until its lease expires, after
+    which any worker may claim it again (on startup recovery).
+    """
+
+    def __init__(self, workers: Optional[int] = None, lease_seconds: Optional[int] = None):
+        self.workers = workers or int(os.getenv("AI_JOB_WORKERS", "4"))
+        self.lease = timedelta(seconds=lease_seconds or int(os.getenv("AI_JOB_LEASE_SECONDS", "600")))
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[Callable[[str], Awaitable[None]]] = None
+        # Jobs this process is running -> event set once they finish
+        self._running: Dict[str, asyncio.Event] = {}
+
+    @property
+    def stale_before(self) -> datetime:
+        """Running jobs not updated since this instant are considered abandoned."""
+        return datetime.now(UTC) - self.lease
+
+    async def start(
+        self,
+        runner: Callable[[str], Awaitable[None]],
+        recover: Optional[Callable[[], Awaitable[List[str]]]] = None,
+    ) -> None:
+        """Start the workers and re-enqueue jobs left over by a previous run."""
+        self._runner = runner
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"ai-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if recover is not None:
+            try:
+                for job_id in await recover():
+                    self.enqueue(job_id)
+            except Exception as e:
+                logger.warning(f"Could not recover pending AI jobs: {e}")
+        logger.info(f"AI job queue started with {self.workers} workers")
+
+    def enqueue(self, job_id: str) -> None:
+        """Schedule a job for execution."""
+        if self._queue is None:
+            raise RuntimeError("AI job queue is not started")
+        self._queue.put_nowait(job_id)
+        metrics.set_gauge("ai_job_queue_depth", self._queue.qsize())
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """Wait until a job run by this process finishes, or the timeout elapses.
+
+        A job not running here (still queued, or run by another process) is
+        just waited for ``timeout``, after which the caller reads it again.
+        """
+        event = self._running.get(job_id)
+        if event is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def close(self) -> None:
+        """Stop the workers; unfinished jobs are recovered on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def _work(self) -> None:
+        """Worker loop."""
+        while True:
+            job_id = await self._queue.get()
+            metrics.set_gauge("ai_job_queue_depth", self._queue.qsize())
+            # A job enqueued twice is tracked by the run that started first
+            finished = None
+            if job_id not in self._running:
+                finished = self._running[job_id] = asyncio.Event()
+            try:
+                await self._runner(job_id)
+                metrics.incr("ai_jobs_total", labels={"outcome": "done"})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                metrics.incr("ai_jobs_total", labels={"outcome": "error"})
+                logger.exception(f"AI job {job_id} failed")
+            finally:
+                self._queue.task_done()
+                if finished is not None:
+                    del self._running[job_id]
+                    finished.set()
+
+
+# Global job queue instance
+ai_job_queue = AIJobQueue()
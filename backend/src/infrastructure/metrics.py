@@ -0,0 +1,70 @@
+"""Lightweight in-process metrics registry."""
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+
+def _key(name: str, labels: Optional[Dict[str, str]] = None) -> str:
+    """Build a metric key such as ``ai_calls_total{route=intake}``."""
+    if not labels:
+        return name
+    formatted = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{formatted}}}"
+
+
+class MetricsRegistry:
+    """Process-local counters, gauges and timing summaries.
+
+    Values are per worker process; they are exposed as JSON on
+    ``GET /api/v1/metrics`` for scraping or ad-hoc inspection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """Record an observation (e.g. a latency in seconds)."""
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = {"count": 0, "sum": 0.0, "max": value, "last": value}
+                self._summaries[key] = summary
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+            summary["last"] = value
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of every metric."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {
+                    key: {**summary, "avg": summary["sum"] / summary["count"]}
+                    for key, summary in self._summaries.items()
+                },
+            }
+
+
+# Global metrics instance
+metrics = MetricsRegistry()
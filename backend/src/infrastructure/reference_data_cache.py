@@ -0,0 +1,108 @@
+"""In-process cache of pre-serialized reference data."""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import database
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Loads one dataset and returns its JSON body
+ReferenceDataLoader = Callable[[AsyncSession], Awaitable[bytes]]
+
+
+@dataclass
+class ReferenceDataPayload:
+    """Serialized dataset with its HTTP validator."""
+    body: bytes
+    etag: str
+    version: int
+    loaded_at: float
+
+
+class ReferenceDataCache:
+    """Versioned cache for small, rarely changing tables.
+
+    Dog breeds and consultation reasons only change when ``seed_data.py``
+    runs, yet every pre-consultation form load used to scan both tables.
+    Datasets are loaded once at startup, kept as ready-to-send JSON bytes
+    and reloaded in the background once their TTL has elapsed; the stale
+    payload keeps being served until the reload completes. Newly seeded
+    rows therefore show up within one TTL, or on the next restart.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, session_factory=None):
+        self.ttl = ttl_seconds or float(os.getenv("REFERENCE_DATA_TTL_SECONDS", "3600"))
+        self._session_factory = session_factory or database.async_session
+        self._loaders: Dict[str, ReferenceDataLoader] = {}
+        self._payloads: Dict[str, ReferenceDataPayload] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, loader: ReferenceDataLoader) -> None:
+        """Register the loader of a dataset (before ``load`` runs at startup)."""
+        self._loaders[name] = loader
+        self._locks[name] = asyncio.Lock()
+
+    async def load(self) -> None:
+        """Load every registered dataset (called at startup)."""
+        for name in self._loaders:
+            try:
+                await self._reload(name)
+            except Exception as e:
+                # Not fatal: the first request retries the load
+                logger.warning(f"Could not preload reference data '{name}': {e}")
+
+    async def get(self, name: str) -> ReferenceDataPayload:
+        """Return a dataset, loading it on first use and refreshing it when stale."""
+        payload = self._payloads.get(name)
+        if payload is None:
+            metrics.incr("reference_data_cache_misses_total", labels={"dataset": name})
+            return await self._reload(name)
+
+        metrics.incr("reference_data_cache_hits_total", labels={"dataset": name})
+        if time.monotonic() - payload.loaded_at > self.ttl and name not in self._refreshing:
+            task = asyncio.create_task(self._refresh(name))
+            self._refreshing[name] = task
+        return payload
+
+    async def _refresh(self, name: str) -> None:
+        """Background reload that keeps the previous payload on failure."""
+        try:
+            await self._reload(name)
+        except Exception as e:
+            logger.warning(f"Could not refresh reference data '{name}': {e}")
+        finally:
+            self._refreshing.pop(name, None)
+
+    async def _reload(self, name: str) -> ReferenceDataPayload:
+        """Run the loader of a dataset and swap in the new payload."""
+        async with self._locks[name]:
+            current = self._payloads.get(name)
+            # Another caller may have reloaded it while we waited for the lock
+            if current is not None and time.monotonic() - current.loaded_at <= self.ttl:
+                return current
+
+            async with self._session_factory() as session:
+                body = await self._loaders[name](session)
+
+            # Content-derived ETag: identical across workers and restarts
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            version = 1 if current is None else current.version + (current.etag != etag)
+            payload = ReferenceDataPayload(
+                body=body, etag=etag, version=version, loaded_at=time.monotonic()
+            )
+            self._payloads[name] = payload
+            metrics.incr("reference_data_cache_loads_total", labels={"dataset": name})
+            return payload
+
+
+# Global reference data cache instance
+reference_data_cache = ReferenceDataCache()
@@ -1,13 +1,37 @@
 """Repository implementations for domain entities."""
-from typing import List, Optional
+import copy
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, desc
+from sqlalchemy import event, select, desc, delete, func, insert, update, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.domain.entities import ChatSession, ChatMessage, VeterinaryAssessment, PatientData, DogBreed, ConsultationReason, User, RefreshToken
-from src.domain.repositories import SessionRepository, MessageRepository, DogBreedRepository, ConsultationReasonRepository, UserRepository, RefreshTokenRepository
+from src.domain.entities import ChatSession, ChatMessage, VeterinaryAssessment, PatientData, DogBreed, ConsultationReason, User, RefreshToken, AIJob, SessionSummary, OutboxEmail
+from src.domain.repositories import SessionRepository, MessageRepository, DogBreedRepository, ConsultationReasonRepository, UserRepository, RefreshTokenRepository, AIJobRepository, EmailOutboxRepository
 
-from .database import SessionModel, MessageModel, DogBreedModel, ConsultationReasonModel, UserModel, RefreshTokenModel
+from .database import SessionModel, MessageModel, DogBreedModel, ConsultationReasonModel, UserModel, RefreshTokenModel, AIJobModel, EmailOutboxModel
+from .security.user_cache import UserCache
+
+# Attribute holding the column values an entity had when last read or written
+_PERSISTED_STATE = "_persisted_columns"
+
+
+def _remember(entity: Any, columns: Dict[str, Any]) -> None:
+    """Record the persisted column values of an entity for dirty checking."""
+    # Deep copy so in-place edits of JSON columns (lists, dicts) are detected
+    setattr(entity, _PERSISTED_STATE, copy.deepcopy(columns))
+
+
+def _changed_columns(entity: Any, columns: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the columns that differ from the last persisted state.
+
+    Entities that were not loaded through a repository have no recorded
+    state, in which case every column is written.
+    """
+    previous = getattr(entity, _PERSISTED_STATE, None)
+    if previous is None:
+        return columns
+    return {key: value for key, value in columns.items() if previous.get(key) != value}
 
 
 def _session_to_entity(model: SessionModel) -> ChatSession:
@@ -35,7 +59,7 @@ def _session_to_entity(model: SessionModel) -> ChatSession:
     if model.patient_data:
         patient_data = PatientData.from_dict(model.patient_data)
 
-    return ChatSession(
+    entity = ChatSession(
         id=model.id,
         created_at=model.created_at,
         updated_at=model.updated_at,
@@ -45,41 +69,36 @@ def _session_to_entity(model: SessionModel) -> ChatSession:
         patient_data=patient_data,
         is_collecting_data=model.is_collecting_data if hasattr(model, 'is_collecting_data') else True,
         user_id=model.user_id if hasattr(model, 'user_id') else None,
+        patient_data_revision=model.patient_data_revision or 0,
+        patient_context_revision=model.patient_context_revision,
     )
+    _remember(entity, _session_columns(entity))
+    return entity
 
 
-def _entity_to_session_model(entity: ChatSession) -> SessionModel:
-    """Convert session entity to model."""
+def _session_columns(entity: ChatSession) -> Dict[str, Any]:
+    """Convert session entity to column values."""
     current_assessment_dict = None
     if entity.current_assessment:
-        current_assessment_dict = {
-            "assessment": entity.current_assessment.assessment,
-            "status": entity.current_assessment.status,
-            "localization": entity.current_assessment.localization,
-            "differentials": entity.current_assessment.differentials,
-            "diagnostics": entity.current_assessment.diagnostics,
-            "treatment": entity.current_assessment.treatment,
-            "prognosis": entity.current_assessment.prognosis,
-            "question": entity.current_assessment.question,
-            "patient_data": entity.current_assessment.patient_data,
-            "confidence_level": entity.current_assessment.confidence_level,
-        }
+        current_assessment_dict = entity.current_assessment.to_dict()
 
     patient_data_dict = None
     if entity.patient_data:
         patient_data_dict = entity.patient_data.to_dict()
 
-    return SessionModel(
-        id=entity.id,
-        created_at=entity.created_at,
-        updated_at=entity.updated_at,
-        slug=entity.slug,
-        current_assessment=current_assessment_dict,
-        openai_thread_id=entity.openai_thread_id,
-        patient_data=patient_data_dict,
-        is_collecting_data=entity.is_collecting_data,
-        user_id=entity.user_id,
-    )
+    return {
+        "id": entity.id,
+        "created_at": entity.created_at,
+        "updated_at": entity.updated_at,
+        "slug": entity.slug,
+        "current_assessment": current_assessment_dict,
+        "openai_thread_id": entity.openai_thread_id,
+        "patient_data": patient_data_dict,
+        "is_collecting_data": entity.is_collecting_data,
+        "user_id": entity.user_id,
+        "patient_data_revision": entity.patient_data_revision,
+        "patient_context_revision": entity.patient_context_revision,
+    }
 
 
 def _message_to_entity(model: MessageModel) -> ChatMessage:
@@ -95,17 +114,17 @@ def _message_to_entity(model: MessageModel) -> ChatMessage:
     )
 
 
-def _entity_to_message_model(entity: ChatMessage) -> MessageModel:
-    """Convert message entity to model."""
-    return MessageModel(
-        id=entity.id,
-        session_id=entity.session_id,
-        role=entity.role,
-        content=entity.content,
-        timestamp=entity.timestamp,
-        status=entity.status,
-        follow_up_question=entity.follow_up_question,
-    )
+def _message_columns(entity: ChatMessage) -> Dict[str, Any]:
+    """Convert message entity to column values."""
+    return {
+        "id": entity.id,
+        "session_id": entity.session_id,
+        "role": entity.role,
+        "content": entity.content,
+        "timestamp": entity.timestamp,
+        "status": entity.status,
+        "follow_up_question": entity.follow_up_question,
+    }
 
 
 class SQLSessionRepository(SessionRepository):
@@ -115,12 +134,11 @@ class SQLSessionRepository(SessionRepository):
         self.session = session
 
     async def create(self, session_entity: ChatSession) -> ChatSession:
-        """Create a new chat session."""
-        model = _entity_to_session_model(session_entity)
-        self.session.add(model)
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _session_to_entity(model)
+        """Create a new chat session with a single INSERT."""
+        columns = _session_columns(session_entity)
+        await self.session.execute(insert(SessionModel).values(**columns))
+        _remember(session_entity, columns)
+        return session_entity
 
     async def get_by_id(self, session_id: str) -> Optional[ChatSession]:
         """Get a session by ID."""
@@ -137,41 +155,32 @@ class SQLSessionRepository(SessionRepository):
         return _session_to_entity(model) if model else None
 
     async def update(self, session_entity: ChatSession) -> ChatSession:
-        """Update an existing session."""
-        stmt = select(SessionModel).where(SessionModel.id == session_entity.id)
+        """Update an existing session, writing only the changed columns."""
+        columns = _session_columns(session_entity)
+
+        # A missing assessment or patient data never clears the stored one
+        if columns["current_assessment"] is None:
+            del columns["current_assessment"]
+        if columns["patient_data"] is None:
+            del columns["patient_data"]
+
+        changes = _changed_columns(session_entity, columns)
+        changes.pop("id", None)
+        if not changes:
+            return session_entity
+
+        stmt = (
+            update(SessionModel)
+            .where(SessionModel.id == session_entity.id)
+            .values(**changes)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.session.execute(stmt)
-        model = result.scalar_one_or_none()
-        
-        if not model:
+        if result.rowcount == 0:
             raise ValueError(f"Session {session_entity.id} not found")
 
-        # Update fields
-        model.updated_at = session_entity.updated_at
-        model.slug = session_entity.slug
-        model.openai_thread_id = session_entity.openai_thread_id
-        model.is_collecting_data = session_entity.is_collecting_data
-        model.user_id = session_entity.user_id
-        
-        if session_entity.current_assessment:
-            model.current_assessment = {
-                "assessment": session_entity.current_assessment.assessment,
-                "status": session_entity.current_assessment.status,
-                "localization": session_entity.current_assessment.localization,
-                "differentials": session_entity.current_assessment.differentials,
-                "diagnostics": session_entity.current_assessment.diagnostics,
-                "treatment": session_entity.current_assessment.treatment,
-                "prognosis": session_entity.current_assessment.prognosis,
-                "question": session_entity.current_assessment.question,
-                "patient_data": session_entity.current_assessment.patient_data,
-                "confidence_level": session_entity.current_assessment.confidence_level,
-            }
-        
-        if session_entity.patient_data:
-            model.patient_data = session_entity.patient_data.to_dict()
-
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _session_to_entity(model)
+        _remember(session_entity, {**getattr(session_entity, _PERSISTED_STATE, {}), **columns})
+        return session_entity
 
     async def get_by_user_id(self, user_id: str) -> List[ChatSession]:
         """Get all sessions for a user."""
@@ -184,6 +193,54 @@ class SQLSessionRepository(SessionRepository):
         models = result.scalars().all()
         return [_session_to_entity(model) for model in models]
 
+    async def get_summaries_by_user_id(
+        self, user_id: str, limit: int, before: Optional[Tuple[datetime, str]] = None
+    ) -> List[SessionSummary]:
+        """Get a page of session summaries without loading the JSON blobs."""
+        # Correlated subqueries only run for the rows of the page and are
+        # answered from the (session_id, timestamp) index of chat_messages
+        message_count = (
+            select(func.count(MessageModel.id))
+            .where(MessageModel.session_id == SessionModel.id)
+            .scalar_subquery()
+        )
+        last_message_at = (
+            select(func.max(MessageModel.timestamp))
+            .where(MessageModel.session_id == SessionModel.id)
+            .scalar_subquery()
+        )
+        stmt = select(
+            SessionModel.id,
+            SessionModel.slug,
+            SessionModel.updated_at,
+            SessionModel.current_assessment["localization"].as_string(),
+            message_count,
+            last_message_at,
+        ).where(SessionModel.user_id == user_id)
+        if before is not None:
+            updated_at, session_id = before
+            updated_at = updated_at.replace(tzinfo=None)
+            stmt = stmt.where(
+                or_(
+                    SessionModel.updated_at < updated_at,
+                    and_(SessionModel.updated_at == updated_at, SessionModel.id < session_id),
+                )
+            )
+        stmt = stmt.order_by(desc(SessionModel.updated_at), desc(SessionModel.id)).limit(limit)
+
+        result = await self.session.execute(stmt)
+        return [
+            SessionSummary(
+                id=row[0],
+                slug=row[1],
+                updated_at=row[2],
+                localization=row[3],
+                message_count=row[4] or 0,
+                last_message_at=row[5],
+            )
+            for row in result.all()
+        ]
+
 
 class SQLMessageRepository(MessageRepository):
     """SQLAlchemy implementation of MessageRepository."""
@@ -192,12 +249,9 @@ class SQLMessageRepository(MessageRepository):
         self.session = session
 
     async def create(self, message: ChatMessage) -> ChatMessage:
-        """Create a new message."""
-        model = _entity_to_message_model(message)
-        self.session.add(model)
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _message_to_entity(model)
+        """Create a new message with a single INSERT."""
+        await self.session.execute(insert(MessageModel).values(**_message_columns(message)))
+        return message
 
     async def get_by_session_id(self, session_id: str) -> List[ChatMessage]:
         """Get all messages for a session."""
@@ -223,6 +277,34 @@ class SQLMessageRepository(MessageRepository):
         # Reverse to get chronological order
         return [_message_to_entity(model) for model in reversed(models)]
 
+    async def get_page(
+        self, session_id: str, limit: int, before: Optional[Tuple[datetime, str]] = None
+    ) -> List[ChatMessage]:
+        """Get a page of messages older than a keyset cursor, newest first."""
+        stmt = select(MessageModel).where(MessageModel.session_id == session_id)
+        if before is not None:
+            timestamp, message_id = before
+            timestamp = timestamp.replace(tzinfo=None)
+            # Keyset on (timestamp, id): id breaks ties between equal timestamps
+            stmt = stmt.where(
+                or_(
+                    MessageModel.timestamp < timestamp,
+                    and_(MessageModel.timestamp == timestamp, MessageModel.id < message_id),
+                )
+            )
+        stmt = stmt.order_by(desc(MessageModel.timestamp), desc(MessageModel.id)).limit(limit)
+        result = await self.session.execute(stmt)
+        return [_message_to_entity(model) for model in result.scalars().all()]
+
+    async def delete(self, message_id: str) -> None:
+        """Delete a message with a single DELETE."""
+        stmt = (
+            delete(MessageModel)
+            .where(MessageModel.id == message_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
 
 def _dog_breed_to_entity(model: DogBreedModel) -> DogBreed:
     """Convert dog breed model to entity."""
@@ -308,7 +390,7 @@ def _user_to_entity(model: UserModel) -> User:
     if model.verification_token_expires:
         verification_token_expires = model.verification_token_expires.replace(tzinfo=UTC)
 
-    return User(
+    entity = User(
         id=model.id,
         email=model.email,
         hashed_password=model.hashed_password,
@@ -325,32 +407,34 @@ def _user_to_entity(model: UserModel) -> User:
         created_at=model.created_at.replace(tzinfo=UTC),
         updated_at=model.updated_at.replace(tzinfo=UTC),
     )
+    _remember(entity, _user_columns(entity))
+    return entity
 
 
-def _entity_to_user_model(entity: User) -> UserModel:
-    """Convert user entity to model."""
+def _user_columns(entity: User) -> Dict[str, Any]:
+    """Convert user entity to column values."""
     # Remove timezone info for MySQL storage (MySQL doesn't store timezone info)
     verification_token_expires = None
     if entity.verification_token_expires:
         verification_token_expires = entity.verification_token_expires.replace(tzinfo=None)
 
-    return UserModel(
-        id=entity.id,
-        email=entity.email,
-        hashed_password=entity.hashed_password,
-        first_name=entity.first_name,
-        last_name=entity.last_name,
-        clinic_name=entity.clinic_name,
-        order_number=entity.order_number,
-        specialty=entity.specialty,
-        is_student=entity.is_student,
-        school_name=entity.school_name,
-        is_verified=entity.is_verified,
-        verification_token=entity.verification_token,
-        verification_token_expires=verification_token_expires,
-        created_at=entity.created_at.replace(tzinfo=None),
-        updated_at=entity.updated_at.replace(tzinfo=None),
-    )
+    return {
+        "id": entity.id,
+        "email": entity.email,
+        "hashed_password": entity.hashed_password,
+        "first_name": entity.first_name,
+        "last_name": entity.last_name,
+        "clinic_name": entity.clinic_name,
+        "order_number": entity.order_number,
+        "specialty": entity.specialty,
+        "is_student": entity.is_student,
+        "school_name": entity.school_name,
+        "is_verified": entity.is_verified,
+        "verification_token": entity.verification_token,
+        "verification_token_expires": verification_token_expires,
+        "created_at": entity.created_at.replace(tzinfo=None),
+        "updated_at": entity.updated_at.replace(tzinfo=None),
+    }
 
 
 def _refresh_token_to_entity(model: RefreshTokenModel) -> RefreshToken:
@@ -368,32 +452,32 @@ def _refresh_token_to_entity(model: RefreshTokenModel) -> RefreshToken:
     )
 
 
-def _entity_to_refresh_token_model(entity: RefreshToken) -> RefreshTokenModel:
-    """Convert refresh token entity to model."""
+def _refresh_token_columns(entity: RefreshToken) -> Dict[str, Any]:
+    """Convert refresh token entity to column values."""
     # Remove timezone info for MySQL storage (MySQL doesn't store timezone info)
-    return RefreshTokenModel(
-        id=entity.id,
-        user_id=entity.user_id,
-        token=entity.token,
-        expires_at=entity.expires_at.replace(tzinfo=None),
-        created_at=entity.created_at.replace(tzinfo=None),
-        revoked=entity.revoked,
-    )
+    return {
+        "id": entity.id,
+        "user_id": entity.user_id,
+        "token": entity.token,
+        "expires_at": entity.expires_at.replace(tzinfo=None),
+        "created_at": entity.created_at.replace(tzinfo=None),
+        "revoked": entity.revoked,
+    }
 
 
 class SQLUserRepository(UserRepository):
     """SQLAlchemy implementation of UserRepository."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, user_cache: Optional[UserCache] = None):
         self.session = session
+        self.user_cache = user_cache
 
     async def create(self, user: User) -> User:
-        """Create a new user."""
-        model = _entity_to_user_model(user)
-        self.session.add(model)
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _user_to_entity(model)
+        """Create a new user with a single INSERT."""
+        columns = _user_columns(user)
+        await self.session.execute(insert(UserModel).values(**columns))
+        _remember(user, columns)
+        return user
 
     async def get_by_id(self, user_id: str) -> Optional[User]:
         """Get a user by ID."""
@@ -410,32 +494,28 @@ class SQLUserRepository(UserRepository):
         return _user_to_entity(model) if model else None
 
     async def update(self, user: User) -> User:
-        """Update an existing user."""
-        stmt = select(UserModel).where(UserModel.id == user.id)
-        result = await self.session.execute(stmt)
-        model = result.scalar_one_or_none()
+        """Update an existing user, writing only the changed columns."""
+        columns = _user_columns(user)
+        changes = _changed_columns(user, columns)
+        changes.pop("id", None)
+        if not changes:
+            return user
 
-        if not model:
+        stmt = (
+            update(UserModel)
+            .where(UserModel.id == user.id)
+            .values(**changes)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        if result.rowcount == 0:
             raise ValueError(f"User {user.id} not found")
 
-        # Update fields
-        model.email = user.email
-        model.hashed_password = user.hashed_password
-        model.first_name = user.first_name
-        model.last_name = user.last_name
-        model.clinic_name = user.clinic_name
-        model.order_number = user.order_number
-        model.specialty = user.specialty
-        model.is_student = user.is_student
-        model.school_name = user.school_name
-        model.is_verified = user.is_verified
-        model.verification_token = user.verification_token
-        model.verification_token_expires = user.verification_token_expires
-        model.updated_at = user.updated_at
-
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _user_to_entity(model)
+        _remember(user, columns)
+        # Authenticated requests must not keep seeing the previous state
+        if self.user_cache:
+            self.user_cache.invalidate_on_commit(self.session, user.id)
+        return user
 
     async def get_by_verification_token(self, token: str) -> Optional[User]:
         """Get a user by verification token."""
@@ -448,16 +528,16 @@ class SQLUserRepository(UserRepository):
 class SQLRefreshTokenRepository(RefreshTokenRepository):
     """SQLAlchemy implementation of RefreshTokenRepository."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, user_cache: Optional[UserCache] = None):
         self.session = session
+        self.user_cache = user_cache
 
     async def create(self, refresh_token: RefreshToken) -> RefreshToken:
-        """Create a new refresh token."""
-        model = _entity_to_refresh_token_model(refresh_token)
-        self.session.add(model)
-        await self.session.flush()
-        await self.session.refresh(model)
-        return _refresh_token_to_entity(model)
+        """Create a new refresh token with a single INSERT."""
+        await self.session.execute(
+            insert(RefreshTokenModel).values(**_refresh_token_columns(refresh_token))
+        )
+        return refresh_token
 
     async def get_by_token(self, token: str) -> Optional[RefreshToken]:
         """Get a refresh token by token value."""
@@ -467,24 +547,230 @@ class SQLRefreshTokenRepository(RefreshTokenRepository):
         return _refresh_token_to_entity(model) if model else None
 
     async def revoke_user_tokens(self, user_id: str) -> None:
-        """Revoke all refresh tokens for a user."""
-        stmt = select(RefreshTokenModel).where(RefreshTokenModel.user_id == user_id)
+        """Revoke all refresh tokens for a user with a single UPDATE."""
+        stmt = (
+            update(RefreshTokenModel)
+            .where(RefreshTokenModel.user_id == user_id, RefreshTokenModel.revoked.is_(False))
+            .values(revoked=True)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+        # Revocation forces the user to be re-read on the next request
+        if self.user_cache:
+            self.user_cache.invalidate_on_commit(self.session, user_id)
+
+    async def delete_expired(self) -> None:
+        """Delete all expired refresh tokens with a single DELETE."""
+        stmt = (
+            delete(RefreshTokenModel)
+            .where(RefreshTokenModel.expires_at < datetime.now(UTC).replace(tzinfo=None))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+
+def _ai_job_to_entity(model: AIJobModel) -> AIJob:
+    """Convert AI job model to entity."""
+    return AIJob(
+        id=model.id,
+        session_id=model.session_id,
+        user_message_id=model.user_message_id,
+        status=model.status,
+        result=model.result,
+        error=model.error,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _ai_job_columns(entity: AIJob) -> Dict[str, Any]:
+    """Convert AI job entity to column values."""
+    return {
+        "id": entity.id,
+        "session_id": entity.session_id,
+        "user_message_id": entity.user_message_id,
+        "status": entity.status,
+        "result": entity.result,
+        "error": entity.error,
+        "created_at": entity.created_at,
+        "updated_at": entity.updated_at,
+    }
+
+
+class SQLAIJobRepository(AIJobRepository):
+    """SQLAlchemy implementation of AIJobRepository."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, job: AIJob) -> AIJob:
+        """Create a new job with a single INSERT."""
+        await self.session.execute(insert(AIJobModel).values(**_ai_job_columns(job)))
+        return job
+
+    async def get_by_id(self, job_id: str) -> Optional[AIJob]:
+        """Get a job by ID."""
+        stmt = select(AIJobModel).where(AIJobModel.id == job_id)
         result = await self.session.execute(stmt)
-        models = result.scalars().all()
+        model = result.scalar_one_or_none()
+        return _ai_job_to_entity(model) if model else None
 
-        for model in models:
-            model.revoked = True
+    async def update(self, job: AIJob) -> AIJob:
+        """Update the state of an existing job with a single UPDATE."""
+        stmt = (
+            update(AIJobModel)
+            .where(AIJobModel.id == job.id)
+            .values(
+                status=job.status,
+                result=job.result,
+                error=job.error,
+                updated_at=job.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        if result.rowcount == 0:
+            raise ValueError(f"Job {job.id} not found")
+        return job
 
-        await self.session.flush()
+    async def claim(self, job_id: str, stale_before: datetime) -> bool:
+        """Atomically mark a job as running."""
+        stmt = (
+            update(AIJobModel)
+            .where(
+                AIJobModel.id == job_id,
+                or_(
+                    AIJobModel.status == "pending",
+                    and_(AIJobModel.status == "running", AIJobModel.updated_at < stale_before.replace(tzinfo=None)),
+                ),
+            )
+            .values(status="running", updated_at=datetime.now(UTC).replace(tzinfo=None))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
 
-    async def delete_expired(self) -> None:
-        """Delete all expired refresh tokens."""
-        from datetime import datetime, UTC
-        stmt = select(RefreshTokenModel).where(RefreshTokenModel.expires_at < datetime.now(UTC))
+    async def get_claimable_ids(self, stale_before: datetime) -> List[str]:
+        """Get IDs of pending jobs and of abandoned running jobs."""
+        stmt = (
+            select(AIJobModel.id)
+            .where(
+                or_(
+                    AIJobModel.status == "pending",
+                    and_(AIJobModel.status == "running", AIJobModel.updated_at < stale_before.replace(tzinfo=None)),
+                )
+            )
+            .order_by(AIJobModel.created_at)
+        )
         result = await self.session.execute(stmt)
-        models = result.scalars().all()
+        return list(result.scalars().all())
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Drop timezone info for MySQL storage (MySQL doesn't store timezone info)."""
+    return value.replace(tzinfo=None) if value else None
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    """Add back the UTC timezone to a naive datetime read from MySQL."""
+    return value.replace(tzinfo=UTC) if value else None
+
+
+def _outbox_email_to_entity(model: EmailOutboxModel) -> OutboxEmail:
+    """Convert outbox model to entity."""
+    return OutboxEmail(
+        id=model.id,
+        template=model.template,
+        to_email=model.to_email,
+        params=model.params or {},
+        status=model.status,
+        attempts=model.attempts,
+        next_attempt_at=_aware(model.next_attempt_at),
+        last_error=model.last_error,
+        created_at=_aware(model.created_at),
+        sent_at=_aware(model.sent_at),
+    )
+
 
-        for model in models:
-            await self.session.delete(model)
+class SQLEmailOutboxRepository(EmailOutboxRepository):
+    """SQLAlchemy implementation of EmailOutboxRepository.
 
-        await self.session.flush()
\ No newline at end of file
+    ``on_commit`` is called once the transaction that queued an email
+    commits, e.g. to wake the dispatcher instead of leaving the email
+    until its next poll.
+    """
+
+    def __init__(self, session: AsyncSession, on_commit: Optional[Callable[[], None]] = None):
+        self.session = session
+        self.on_commit = on_commit
+
+    async def create(self, email: OutboxEmail) -> OutboxEmail:
+        """Queue a new email with a single INSERT."""
+        stmt = insert(EmailOutboxModel).values(
+            id=email.id,
+            template=email.template,
+            to_email=email.to_email,
+            params=email.params,
+            status=email.status,
+            attempts=email.attempts,
+            next_attempt_at=_naive(email.next_attempt_at),
+            created_at=_naive(email.created_at),
+        )
+        await self.session.execute(stmt)
+        if self.on_commit:
+            sync_session = self.session.sync_session
+            if not event.contains(sync_session, "after_commit", self._after_commit):
+                event.listen(sync_session, "after_commit", self._after_commit)
+        return email
+
+    def _after_commit(self, sync_session) -> None:
+        """Report that queued emails are now visible to the dispatcher."""
+        self.on_commit()
+
+    async def claim_due(self, limit: int, now: datetime, lease_until: datetime) -> List[OutboxEmail]:
+        """Lock due emails (skipping rows locked by other workers) and push their due time past the lease."""
+        stmt = (
+            select(EmailOutboxModel)
+            .where(
+                EmailOutboxModel.status == "pending",
+                EmailOutboxModel.next_attempt_at <= _naive(now),
+            )
+            .order_by(EmailOutboxModel.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        emails = [_outbox_email_to_entity(model) for model in result.scalars().all()]
+        if emails:
+            # A worker that dies mid-send releases its emails when the lease ends
+            await self.session.execute(
+                update(EmailOutboxModel)
+                .where(EmailOutboxModel.id.in_([email.id for email in emails]))
+                .values(next_attempt_at=_naive(lease_until))
+                .execution_options(synchronize_session=False)
+            )
+        return emails
+
+    async def update(self, email: OutboxEmail) -> OutboxEmail:
+        """Update the delivery state of an email with a single UPDATE."""
+        stmt = (
+            update(EmailOutboxModel)
+            .where(EmailOutboxModel.id == email.id)
+            .values(
+                status=email.status,
+                attempts=email.attempts,
+                next_attempt_at=_naive(email.next_attempt_at),
+                last_error=email.last_error,
+                sent_at=_naive(email.sent_at),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+        return email
+
+    async def count_pending(self) -> int:
+        """Count emails not yet sent or given up on."""
+        stmt = select(func.count()).select_from(EmailOutboxModel).where(EmailOutboxModel.status == "pending")
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
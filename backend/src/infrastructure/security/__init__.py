@@ -1,5 +1,19 @@
 """Security services for authentication and authorization."""
 from .password_service import PasswordService
 from .jwt_service import JWTService
+from .async_password_service import (
+    AsyncPasswordService,
+    PasswordHashingOverloadedError,
+    async_password_service,
+)
+from .user_cache import UserCache, user_cache
 
-__all__ = ["PasswordService", "JWTService"]
+__all__ = [
+    "PasswordService",
+    "JWTService",
+    "AsyncPasswordService",
+    "PasswordHashingOverloadedError",
+    "async_password_service",
+    "UserCache",
+    "user_cache",
+]
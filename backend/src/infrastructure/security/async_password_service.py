@@ -0,0 +1,155 @@
+"""Argon2 hashing offloaded to a bounded process pool."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from src.infrastructure.metrics import metrics
+
+from .password_service import PasswordService
+
+logger = logging.getLogger(__name__)
+
+# Per worker-process password context, built on first use
+_worker_context: Optional[CryptContext] = None
+
+
+def _get_context() -> CryptContext:
+    """Return the password context of the current process."""
+    global _worker_context
+    if _worker_context is None:
+        _worker_context = PasswordService().pwd_context
+    return _worker_context
+
+
+def _hash_password(password: str) -> str:
+    """Hash a password (runs in a worker process)."""
+    return _get_context().hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and rehash it if needed (runs in a worker process)."""
+    return _get_context().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashingOverloadedError(Exception):
+    """Raised when too many hashing jobs are already queued."""
+    pass
+
+
+class AsyncPasswordService:
+    """Async password hashing backed by a bounded ``ProcessPoolExecutor``.
+
+    Argon2 with 64 MB memory cost is deliberately slow; running it on the
+    event loop stalls every other request of the worker. Jobs are sent to a
+    small process pool instead, and once ``max_pending`` jobs are queued new
+    ones are rejected rather than piling up latency.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Initialize the async password service.
+
+        Args:
+            max_workers: Hashing processes (PASSWORD_HASH_WORKERS, default 2)
+            max_pending: Maximum queued + running jobs (PASSWORD_HASH_MAX_PENDING, default 32)
+        """
+        self.max_workers = max_workers or int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._policy = PasswordService()
+
+    def start(self) -> None:
+        """Start the process pool if it is not running."""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        # Warm the workers so the first login doesn't pay the process spawn
+        for _ in range(self.max_workers):
+            self._executor.submit(_get_context)
+        logger.info(f"Password hashing pool started with {self.max_workers} workers")
+
+    def close(self) -> None:
+        """Shut down the process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running hashing jobs."""
+        return self._pending
+
+    async def hash_password(self, password: str) -> str:
+        """
+        Hash a plain text password without blocking the event loop.
+
+        Raises:
+            PasswordHashingOverloadedError: If the queue is full
+        """
+        return await self._run("hash", _hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a plain text password against a hash.
+
+        Raises:
+            PasswordHashingOverloadedError: If the queue is full
+        """
+        valid, _ = await self.verify_and_update(plain_password, hashed_password)
+        return valid
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and return a new hash if the stored one is outdated.
+
+        Returns:
+            Tuple of (is valid, new hash or None)
+
+        Raises:
+            PasswordHashingOverloadedError: If the queue is full
+        """
+        return await self._run("verify", _verify_and_update, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Check if a hash uses outdated parameters (cheap, runs inline)."""
+        return self._policy.needs_rehash(hashed_password)
+
+    async def _run(self, operation: str, func, *args):
+        """Run a hashing function in the pool, enforcing the queue limit."""
+        if self._pending >= self.max_pending:
+            metrics.incr("password_hash_rejected_total")
+            raise PasswordHashingOverloadedError(
+                "Trop de requêtes d'authentification en cours, veuillez réessayer"
+            )
+
+        self.start()
+        self._pending += 1
+        metrics.set_gauge("password_hash_queue_depth", self._pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            metrics.set_gauge("password_hash_queue_depth", self._pending)
+            metrics.incr("password_hash_jobs_total", labels={"operation": operation})
+            metrics.observe(
+                "password_hash_seconds", time.perf_counter() - started,
+                labels={"operation": operation},
+            )
+
+
+# Global async password service instance
+async_password_service = AsyncPasswordService()
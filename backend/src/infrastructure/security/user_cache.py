@@ -0,0 +1,92 @@
+"""Process-local cache of authenticated users."""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities import User
+from src.infrastructure.metrics import metrics
+
+# Session.info key of the user ids to invalidate when the session commits
+_PENDING_KEY = "user_cache_invalidations"
+
+
+class UserCache:
+    """TTL + LRU cache of users keyed by user id.
+
+    Lets ``get_current_user`` authenticate a request from the access token
+    alone on a hit. Entries are invalidated when the user changes (profile
+    update, email verification, token revocation), once the transaction
+    making the change has committed: invalidating earlier would let a
+    concurrent request cache the row as it was before. The TTL bounds how
+    long another worker process, which keeps its own cache, can serve a
+    stale entry. Callers get their own copy of a cached user, so editing
+    it doesn't change what other requests see.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the user cache.
+
+        Args:
+            max_size: Maximum cached users (USER_CACHE_MAX_SIZE, default 10000)
+            ttl_seconds: Entry lifetime (USER_CACHE_TTL_SECONDS, default 60, 0 disables)
+        """
+        self.max_size = max_size or int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Return a cached user, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                metrics.incr("user_cache_hits_total")
+                return copy.copy(entry[1])
+            if entry is not None:
+                del self._entries[user_id]
+        metrics.incr("user_cache_misses_total")
+        return None
+
+    def put(self, user: User) -> None:
+        """Cache a user, evicting the least recently used entry if full."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user from the cache."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate_on_commit(self, session: AsyncSession, user_id: str) -> None:
+        """Drop a user from the cache once the session's current transaction commits."""
+        sync_session = session.sync_session
+        sync_session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+        if not event.contains(sync_session, "after_commit", self._after_commit):
+            event.listen(sync_session, "after_commit", self._after_commit)
+
+    def _after_commit(self, sync_session) -> None:
+        """Invalidate the users changed by the transaction that just committed."""
+        for user_id in sync_session.info.pop(_PENDING_KEY, ()):
+            self.invalidate(user_id)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global user cache instance
+user_cache = UserCache()
@@ -0,0 +1,302 @@
+"""Per-session ordering of chat turns, with coalescing of queued messages."""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from .admission import AdmissionRejectedError
+from .database import SessionLockModel, database
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _Lane:
+    """Queue state of one session."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Message id -> (message, future receiving the answer of the turn that merged it)
+        self.waiters: Dict[str, Tuple[Any, asyncio.Future]] = {}
+        # Bumped every time a turn finishes, to tell if a snapshot is stale
+        self.generation = 0
+        self.users = 0
+
+
+class SessionPlace:
+    """A turn's place in its session's queue.
+
+    After ``SessionWorkQueue.enter`` either ``answered`` is set, and
+    ``result`` is the answer of an earlier turn that merged this message,
+    or the turn runs (``leader``): it answers its own message together
+    with the ``merged`` ones queued behind it, and must ``complete`` with
+    that answer. ``stale`` tells a leader that the session may have
+    changed since the place was taken, so it must reload it.
+    """
+
+    def __init__(self, session_id: str, lane: _Lane):
+        self.session_id = session_id
+        self.lane = lane
+        self.generation = lane.generation
+        self.answered = False
+        self.leader = False
+        self.stale = False
+        self.result: Any = None
+        self._completed = False
+        self._followers: Dict[str, Tuple[Any, asyncio.Future]] = {}
+        self._lease: Optional[_SessionLease] = None
+
+    @property
+    def merged(self) -> List[Any]:
+        """Messages queued behind a leader, answered by its AI call (in arrival order)."""
+        return [message for message, _ in self._followers.values()]
+
+    def complete(self, result: Any) -> None:
+        """Record the leader's answer, handed to the messages it merged on leave."""
+        self.result = result
+        self._completed = True
+
+
+class _SessionLease:
+    """A held session lock: its owner token and the task renewing it."""
+
+    def __init__(self, owner: str, renewal: asyncio.Task):
+        self.owner = owner
+        self.renewal = renewal
+
+
+class DatabaseSessionLock:
+    """Lease row per session, so that turns in other workers wait too.
+
+    The running turn owns the session's row in ``chat_session_locks``
+    until it releases it or the lease expires. Every step is a short
+    transaction: no connection is held while the AI answers. The lease is
+    extended in the background while the turn runs, and a worker that
+    dies lets it expire, after which another worker takes it over.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        timeout: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the lock.
+
+        Args:
+            session_factory: Session factory for the lock table
+            timeout: Maximum wait for the lock (SESSION_LOCK_TIMEOUT_SECONDS, default 300)
+            lease_seconds: Lease of the holder, renewed while it runs (SESSION_LOCK_LEASE_SECONDS, default 30)
+            poll_interval: Seconds between attempts while another worker holds the lock
+        """
+        self._session_factory = session_factory or database.async_session
+        self.timeout = timeout or float(os.getenv("SESSION_LOCK_TIMEOUT_SECONDS", "300"))
+        self.lease = timedelta(seconds=lease_seconds or float(os.getenv("SESSION_LOCK_LEASE_SECONDS", "30")))
+        self.poll_interval = poll_interval or 0.5
+
+    async def acquire(self, session_id: str) -> _SessionLease:
+        """
+        Take the session's lock, waiting for the worker holding it.
+
+        Raises:
+            AdmissionRejectedError: If the lock is still held after ``timeout``
+        """
+        owner = uuid.uuid4().hex
+        give_up_at = time.monotonic() + self.timeout
+        while not await self._try_acquire(session_id, owner):
+            if time.monotonic() >= give_up_at:
+                raise AdmissionRejectedError("Session is busy", retry_after=5)
+            await asyncio.sleep(self.poll_interval)
+        renewal = asyncio.create_task(self._renew(session_id, owner))
+        return _SessionLease(owner, renewal)
+
+    async def release(self, session_id: str, lease: _SessionLease) -> None:
+        """Stop renewing the lease and delete its row."""
+        lease.renewal.cancel()
+        await asyncio.wait({lease.renewal})
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    delete(SessionLockModel).where(
+                        SessionLockModel.session_id == session_id, SessionLockModel.owner == lease.owner
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            # The lease expires by itself
+            logger.warning(f"Could not release session lock {session_id}: {e}")
+
+    async def _try_acquire(self, session_id: str, owner: str) -> bool:
+        """Insert the session's row, taking over a lease that expired."""
+        now = datetime.now(UTC).replace(tzinfo=None)
+        async with self._session_factory() as session:
+            # A holder whose worker died
+            await session.execute(
+                delete(SessionLockModel).where(
+                    SessionLockModel.session_id == session_id, SessionLockModel.expires_at <= now
+                )
+            )
+            try:
+                await session.execute(
+                    insert(SessionLockModel).values(
+                        session_id=session_id, owner=owner, expires_at=now + self.lease
+                    )
+                )
+                await session.commit()
+                return True
+            except IntegrityError:
+                await session.rollback()
+                return False
+
+    async def _renew(self, session_id: str, owner: str) -> None:
+        """Extend the lease until the lock is released."""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                async with self._session_factory() as session:
+                    result = await session.execute(
+                        update(SessionLockModel)
+                        .where(SessionLockModel.session_id == session_id, SessionLockModel.owner == owner)
+                        .values(expires_at=datetime.now(UTC).replace(tzinfo=None) + self.lease)
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Could not renew session lock {session_id}: {e}")
+                continue
+            if result.rowcount == 0:
+                # Expired and taken over: turns of this session may now overlap
+                logger.warning(f"Lost session lock {session_id}")
+                metrics.incr("session_lock_lost_total")
+                return
+
+
+class SessionWorkQueue:
+    """Runs the turns of each session one at a time, in arrival order.
+
+    Without it, two messages posted at once to a session (a double click,
+    two tabs) are answered concurrently on the same provider conversation
+    and the last write of the assessment wins. Here a turn waits for the
+    one before it, and messages that arrive while a turn is running are
+    answered together: the next turn to run sends all of them in one AI
+    call, and the requests that posted them get its answer instead of
+    generating their own.
+
+    Ordering is per process; with a ``DatabaseSessionLock`` the running
+    turn also holds its session's lease, so turns in other workers wait
+    for it too.
+    """
+
+    def __init__(self, lock: Optional[DatabaseSessionLock] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            lock: Cross-worker lock, or None to order turns within this process only
+        """
+        self.lock = lock
+        self._lanes: Dict[str, _Lane] = {}
+
+    def join(self, session_id: str) -> SessionPlace:
+        """Take a place before reading the session, to detect later changes."""
+        lane = self._lanes.setdefault(session_id, _Lane())
+        lane.users += 1
+        return SessionPlace(session_id, lane)
+
+    async def enter(self, place: SessionPlace, message: Any) -> None:
+        """Wait until the turn may run, or until an earlier turn answered its message.
+
+        Raises:
+            AdmissionRejectedError: If the cross-worker lock could not be taken
+        """
+        lane = place.lane
+        message_id = message.id
+        answer = asyncio.get_running_loop().create_future()
+        lane.waiters[message_id] = (message, answer)
+        self._publish()
+        started = time.monotonic()
+        acquire = asyncio.ensure_future(lane.lock.acquire())
+        try:
+            await asyncio.wait({acquire, answer}, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            lane.waiters.pop(message_id, None)
+            answer.cancel()
+            await self._drop_acquire(acquire, lane)
+            self._publish()
+            raise
+        metrics.observe("session_queue_wait_seconds", time.monotonic() - started)
+
+        if answer.done():
+            # An earlier turn merged this message into its AI call
+            await self._drop_acquire(acquire, lane)
+            place.answered = True
+            place.result = answer.result()
+            self._publish()
+            return
+
+        lane.waiters.pop(message_id, None)
+        answer.cancel()
+        if self.lock is not None:
+            try:
+                place._lease = await self.lock.acquire(place.session_id)
+            except BaseException:
+                lane.lock.release()
+                self._publish()
+                raise
+        place._followers = dict(lane.waiters)
+        place.leader = True
+        place.stale = place.generation != lane.generation or self.lock is not None
+        self._publish()
+
+    async def leave(self, place: SessionPlace) -> None:
+        """Give up the place, handing a leader's answer to the messages it merged."""
+        lane = place.lane
+        if place.leader:
+            if place._completed:
+                for message_id, waiter in place._followers.items():
+                    answer = waiter[1]
+                    if lane.waiters.get(message_id) is waiter and not answer.done():
+                        del lane.waiters[message_id]
+                        answer.set_result(place.result)
+                        metrics.incr("session_turns_coalesced_total")
+            lane.generation += 1
+            place.leader = False
+            lane.lock.release()
+            if place._lease is not None:
+                lease, place._lease = place._lease, None
+                await self.lock.release(place.session_id, lease)
+
+        lane.users -= 1
+        if lane.users == 0 and self._lanes.get(place.session_id) is lane:
+            del self._lanes[place.session_id]
+        self._publish()
+
+    async def _drop_acquire(self, acquire: asyncio.Future, lane: _Lane) -> None:
+        """Stop waiting for the lock, releasing it if it was granted meanwhile."""
+        if not acquire.done():
+            acquire.cancel()
+        await asyncio.wait({acquire})
+        if not acquire.cancelled():
+            lane.lock.release()
+
+    def _publish(self) -> None:
+        """Report how many messages are waiting for their session."""
+        metrics.set_gauge("session_queue_waiting", sum(len(lane.waiters) for lane in self._lanes.values()))
+
+
+def _configured_lock() -> Optional[DatabaseSessionLock]:
+    """Cross-worker lock selected by SESSION_LOCK_BACKEND ("local" or "database")."""
+    if os.getenv("SESSION_LOCK_BACKEND", "local").lower() == "database":
+        return DatabaseSessionLock()
+    return None
+
+
+# Global per-session work queue
+session_work_queue = SessionWorkQueue(_configured_lock())
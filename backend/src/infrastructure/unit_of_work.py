@@ -0,0 +1,42 @@
+"""SQLAlchemy unit of work implementation."""
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.repositories import UnitOfWork
+
+from .database import database
+from .repositories import SQLSessionRepository, SQLMessageRepository, SQLAIJobRepository
+
+
+class SQLUnitOfWork(UnitOfWork):
+    """Unit of work backed by its own short-lived AsyncSession.
+
+    Unlike the request-scoped ``get_database_session`` dependency, the
+    connection is only checked out for the duration of the ``async with``
+    block, so long awaits between units (e.g. the AI call) hold no
+    connection from the pool.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], AsyncSession]] = None):
+        self._session_factory = session_factory or database.async_session
+        self._db_session: Optional[AsyncSession] = None
+
+    async def __aenter__(self) -> "SQLUnitOfWork":
+        """Open a new database session and its repositories."""
+        self._db_session = self._session_factory()
+        self.sessions = SQLSessionRepository(self._db_session)
+        self.messages = SQLMessageRepository(self._db_session)
+        self.jobs = SQLAIJobRepository(self._db_session)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Commit on success, roll back on error, and release the connection."""
+        try:
+            if exc_type is None:
+                await self._db_session.commit()
+            else:
+                await self._db_session.rollback()
+        finally:
+            await self._db_session.close()
+            self._db_session = None
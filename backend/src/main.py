@@ -7,7 +7,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from src.infrastructure.database import database
+from src.infrastructure.ai.client_registry import ai_client_registry
+from src.infrastructure.ai.call_ledger import ai_call_ledger
+from src.infrastructure.security import async_password_service
+from src.infrastructure.job_queue import ai_job_queue
+from src.infrastructure.reference_data_cache import reference_data_cache
+from src.infrastructure.email import email_outbox_dispatcher
+from src.infrastructure.inflight import ai_inflight
 from src.presentation import router
+from src.presentation.router import (
+    claimable_ai_job_ids,
+    load_consultation_reasons,
+    load_dog_breeds,
+    run_ai_job,
+)
 from src.presentation.auth_router import router as auth_router
 
 # Load environment variables
@@ -19,8 +32,22 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     await database.create_tables()
+    reference_data_cache.register("dog_breeds", load_dog_breeds)
+    reference_data_cache.register("consultation_reasons", load_consultation_reasons)
+    await reference_data_cache.load()
+    ai_client_registry.start()
+    ai_call_ledger.start()
+    async_password_service.start()
+    await ai_job_queue.start(run_ai_job, recover=claimable_ai_job_ids)
+    email_outbox_dispatcher.start()
     yield
     # Shutdown
+    await email_outbox_dispatcher.close()
+    await ai_job_queue.close()
+    await ai_inflight.close()
+    async_password_service.close()
+    await ai_client_registry.close()
+    await ai_call_ledger.close()
     await database.close()
 
 
@@ -1,5 +1,5 @@
 """FastAPI router for authentication endpoints."""
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +18,7 @@ from src.application.auth import (
     GetUserQuery,
     GetUserHandler,
     GetUserSessionsQuery,
+    GetUserSessionSummariesQuery,
     GetUserSessionsHandler,
     ResendVerificationCommand,
     ResendVerificationHandler,
@@ -27,12 +28,14 @@ from src.infrastructure import (
     SQLUserRepository,
     SQLRefreshTokenRepository,
     SQLSessionRepository,
-    PasswordService,
+    SQLEmailOutboxRepository,
+    AsyncPasswordService,
     JWTService,
-    EmailService,
 )
+from src.infrastructure.email import email_outbox_dispatcher
+from src.infrastructure.security import PasswordHashingOverloadedError, UserCache, async_password_service
 from src.infrastructure.database import get_database_session
-from .dependencies import get_current_user, get_jwt_service
+from .dependencies import get_current_user, get_jwt_service, get_user_cache
 from .schemas import (
     RegisterRequest,
     LoginRequest,
@@ -44,6 +47,8 @@ from .schemas import (
     ResendVerificationRequest,
     ResendVerificationResponse,
     SessionResponse,
+    SessionSummaryResponse,
+    SessionSummaryPageResponse,
     VeterinaryAssessmentResponse,
     PatientDataResponse,
 )
@@ -54,66 +59,59 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 # Dependency functions
 
-def get_password_service() -> PasswordService:
-    """Get password service instance."""
-    return PasswordService()
-
-
-def get_email_service() -> EmailService:
-    """Get email service instance."""
-    try:
-        return EmailService()
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Email service not configured: {str(e)}",
-        )
+def get_password_service() -> AsyncPasswordService:
+    """Get the shared async password service."""
+    return async_password_service
 
 
 def get_register_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
-    password_service: Annotated[PasswordService, Depends(get_password_service)],
-    email_service: Annotated[EmailService, Depends(get_email_service)],
+    password_service: Annotated[AsyncPasswordService, Depends(get_password_service)],
 ) -> RegisterUserHandler:
     """Get register user handler."""
     user_repo = SQLUserRepository(db_session)
-    return RegisterUserHandler(user_repo, password_service, email_service)
+    outbox_repo = SQLEmailOutboxRepository(db_session, email_outbox_dispatcher.notify)
+    return RegisterUserHandler(user_repo, password_service, outbox_repo)
 
 
 def get_login_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
-    password_service: Annotated[PasswordService, Depends(get_password_service)],
+    password_service: Annotated[AsyncPasswordService, Depends(get_password_service)],
     jwt_service: Annotated[JWTService, Depends(get_jwt_service)],
+    user_cache: Annotated[UserCache, Depends(get_user_cache)],
 ) -> LoginUserHandler:
     """Get login user handler."""
     user_repo = SQLUserRepository(db_session)
-    refresh_token_repo = SQLRefreshTokenRepository(db_session)
+    refresh_token_repo = SQLRefreshTokenRepository(db_session, user_cache)
     return LoginUserHandler(user_repo, refresh_token_repo, password_service, jwt_service)
 
 
 def get_verify_email_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
+    user_cache: Annotated[UserCache, Depends(get_user_cache)],
 ) -> VerifyEmailHandler:
     """Get verify email handler."""
-    user_repo = SQLUserRepository(db_session)
+    user_repo = SQLUserRepository(db_session, user_cache)
     return VerifyEmailHandler(user_repo)
 
 
 def get_refresh_token_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
     jwt_service: Annotated[JWTService, Depends(get_jwt_service)],
+    user_cache: Annotated[UserCache, Depends(get_user_cache)],
 ) -> RefreshTokenHandler:
     """Get refresh token handler."""
     user_repo = SQLUserRepository(db_session)
-    refresh_token_repo = SQLRefreshTokenRepository(db_session)
+    refresh_token_repo = SQLRefreshTokenRepository(db_session, user_cache)
     return RefreshTokenHandler(user_repo, refresh_token_repo, jwt_service)
 
 
 def get_update_profile_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
+    user_cache: Annotated[UserCache, Depends(get_user_cache)],
 ) -> UpdateProfileHandler:
     """Get update profile handler."""
-    user_repo = SQLUserRepository(db_session)
+    user_repo = SQLUserRepository(db_session, user_cache)
     return UpdateProfileHandler(user_repo)
 
 
@@ -135,11 +133,20 @@ def get_user_sessions_handler(
 
 def get_resend_verification_handler(
     db_session: Annotated[AsyncSession, Depends(get_database_session)],
-    email_service: Annotated[EmailService, Depends(get_email_service)],
 ) -> ResendVerificationHandler:
     """Get resend verification handler."""
     user_repo = SQLUserRepository(db_session)
-    return ResendVerificationHandler(user_repo, email_service)
+    outbox_repo = SQLEmailOutboxRepository(db_session, email_outbox_dispatcher.notify)
+    return ResendVerificationHandler(user_repo, outbox_repo)
+
+
+def _overloaded(error: PasswordHashingOverloadedError) -> HTTPException:
+    """Build the 503 returned when the password hashing queue is full."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"},
+    )
 
 
 # API Endpoints
@@ -182,6 +189,8 @@ async def register(
             created_at=user.created_at,
             updated_at=user.updated_at,
         )
+    except PasswordHashingOverloadedError as e:
+        raise _overloaded(e)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -220,6 +229,8 @@ async def login(
             refresh_token=response.refresh_token,
             user=user_response,
         )
+    except PasswordHashingOverloadedError as e:
+        raise _overloaded(e)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
@@ -393,6 +404,40 @@ async def update_profile(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
+@router.get("/sessions/summaries", response_model=SessionSummaryPageResponse)
+async def get_user_session_summaries(
+    current_user: Annotated[User, Depends(get_current_user)],
+    handler: Annotated[GetUserSessionsHandler, Depends(get_user_sessions_handler)],
+    before: Annotated[Optional[str], Query(description="Cursor from a previous page's next_cursor")] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> SessionSummaryPageResponse:
+    """
+    Get a page of session summaries for current user, most recent first.
+
+    Only the fields needed by the session list are loaded. Requires authentication.
+    """
+    query = GetUserSessionSummariesQuery(user_id=current_user.id, limit=limit, before=before)
+    try:
+        summaries, next_cursor = await handler.handle_summaries(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return SessionSummaryPageResponse(
+        sessions=[
+            SessionSummaryResponse(
+                id=summary.id,
+                slug=summary.slug,
+                updated_at=summary.updated_at,
+                localization=summary.localization,
+                message_count=summary.message_count,
+                last_message_at=summary.last_message_at,
+            )
+            for summary in summaries
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/sessions", response_model=List[SessionResponse])
 async def get_user_sessions(
     current_user: Annotated[User, Depends(get_current_user)],
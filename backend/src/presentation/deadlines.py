@@ -0,0 +1,101 @@
+"""Request deadlines and client-disconnect cancellation for FastAPI routes."""
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Request, status
+
+from src.infrastructure.deadline import Deadline
+from src.infrastructure.metrics import metrics
+
+T = TypeVar("T")
+
+# Header a client can use to ask for a shorter (or longer, up to the cap) deadline
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Stay under the reverse proxy's own timeout (nginx allows 300 s)
+MAX_REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "290"))
+
+# Status logged for requests abandoned by the client (nginx convention)
+CLIENT_CLOSED_REQUEST = 499
+
+
+def request_deadline(default_seconds: float) -> Callable[[Request], Deadline]:
+    """
+    Build a dependency giving each request its deadline.
+
+    Args:
+        default_seconds: Route default, used without an X-Request-Timeout header
+
+    Returns:
+        FastAPI dependency returning a Deadline
+    """
+    def dependency(request: Request) -> Deadline:
+        header = request.headers.get(DEADLINE_HEADER)
+        timeout = default_seconds
+        if header is not None:
+            try:
+                timeout = float(header)
+            except ValueError:
+                timeout = 0
+            if not 0 < timeout < float("inf"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{DEADLINE_HEADER} must be a positive number of seconds",
+                )
+        return Deadline(min(timeout, MAX_REQUEST_TIMEOUT))
+
+    return dependency
+
+
+async def cancel_on_disconnect(
+    request: Request, work: Awaitable[T], poll_interval: Optional[float] = None
+) -> T:
+    """
+    Run ``work``, cancelling it if the client goes away first.
+
+    Without this a request abandoned by its client keeps its worker, its
+    AI slot and its tokens until it completes.
+
+    Raises:
+        HTTPException: 499 if the client disconnected
+    """
+    poll_interval = poll_interval or float(os.getenv("DISCONNECT_POLL_SECONDS", "1"))
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                metrics.incr("requests_cancelled_on_disconnect_total")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def iterate_until_disconnect(
+    request: Request, events: AsyncIterator[T], poll_interval: Optional[float] = None
+) -> AsyncIterator[T]:
+    """
+    Yield from ``events``, cancelling the pending step if the client goes away.
+
+    Starlette only notices a closed stream on the next write, which can be
+    minutes away while the model has not produced its first token.
+
+    Raises:
+        HTTPException: 499 if the client disconnected
+    """
+    iterator = events.__aiter__()
+    while True:
+        try:
+            item = await cancel_on_disconnect(request, iterator.__anext__(), poll_interval)
+        except StopAsyncIteration:
+            return
+        yield item
@@ -1,20 +1,29 @@
 """FastAPI dependencies for authentication."""
 import os
+import secrets
 from typing import Optional, Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.entities import User
 from src.domain.repositories import UserRepository
 from src.infrastructure import SQLUserRepository, JWTService
-from src.infrastructure.database import get_database_session
+from src.infrastructure.database import database
+from src.infrastructure.security import UserCache, user_cache
 
 
 # HTTP Bearer security scheme
 security = HTTPBearer()
 
+# Same scheme without the automatic 403 when the header is missing
+optional_security = HTTPBearer(auto_error=False)
+
+
+def get_user_cache() -> UserCache:
+    """Get the shared authenticated-user cache."""
+    return user_cache
+
 
 def get_jwt_service() -> JWTService:
     """Get JWT service instance."""
@@ -38,15 +47,18 @@ def get_jwt_service() -> JWTService:
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     jwt_service: Annotated[JWTService, Depends(get_jwt_service)],
-    db_session: Annotated[AsyncSession, Depends(get_database_session)],
+    cache: Annotated[UserCache, Depends(get_user_cache)],
 ) -> User:
     """
     Get current authenticated user from JWT token.
 
+    The user is served from the user cache when possible; a database
+    session is only opened on a cache miss.
+
     Args:
         credentials: HTTP Bearer credentials
         jwt_service: JWT service
-        db_session: Database session
+        cache: Authenticated-user cache
 
     Returns:
         Authenticated user
@@ -75,9 +87,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    user_repository = SQLUserRepository(db_session)
-    user = await user_repository.get_by_id(user_id)
+    user = cache.get(user_id)
+    if user is None:
+        # Get user from database
+        async with database.async_session() as db_session:
+            user = await SQLUserRepository(db_session).get_by_id(user_id)
+        if user and user.is_verified:
+            cache.put(user)
 
     if not user:
         raise HTTPException(
@@ -97,19 +113,18 @@ async def get_current_user(
 
 
 async def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    jwt_service: JWTService = Depends(get_jwt_service),
-    db_session: AsyncSession = Depends(get_database_session),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    cache: UserCache = Depends(get_user_cache),
 ) -> Optional[User]:
     """
     Get current authenticated user from JWT token (optional).
 
-    Returns None if no credentials provided or invalid.
+    Returns None if no credentials provided or invalid. The JWT service is
+    only needed, and only resolved, when credentials are present.
 
     Args:
         credentials: HTTP Bearer credentials (optional)
-        jwt_service: JWT service
-        db_session: Database session
+        cache: Authenticated-user cache
 
     Returns:
         Authenticated user or None
@@ -118,6 +133,35 @@ async def get_current_user_optional(
         return None
 
     try:
-        return await get_current_user(credentials, jwt_service, db_session)
+        return await get_current_user(credentials, get_jwt_service(), cache)
     except HTTPException:
         return None
+
+
+def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> None:
+    """
+    Only let the metrics scraper read the internal counters.
+
+    The scraper sends the METRICS_TOKEN as a Bearer token. Without a
+    configured token the metrics endpoint does not exist.
+
+    Args:
+        credentials: HTTP Bearer credentials (optional)
+
+    Raises:
+        HTTPException: If no token is configured or the token does not match
+    """
+    expected = os.getenv("METRICS_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not credentials or not secrets.compare_digest(
+        credentials.credentials.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
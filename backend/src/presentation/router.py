@@ -1,8 +1,13 @@
 """FastAPI router for the NeuroVet API."""
+import json
 import os
-from typing import Annotated, List
+import asyncio
+import uuid
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.application import (
@@ -10,24 +15,48 @@ from src.application import (
     SendMessageCommand,
     GetSessionQuery,
     GetSessionMessagesQuery,
+    GetSessionMessagesPageQuery,
     CreateSessionHandler,
     SendMessageHandler,
     GetSessionHandler,
     GetSessionMessagesHandler,
+    GetAIJobQuery,
+    GetAIJobHandler,
 )
-from src.domain.entities import VeterinaryAssessment, CollectionResponse as DomainCollectionResponse
+from src.domain.entities import AIJob, User, VeterinaryAssessment, CollectionResponse as DomainCollectionResponse
 from src.infrastructure.database import get_database_session
-from src.infrastructure import SQLSessionRepository, SQLMessageRepository, SQLDogBreedRepository, SQLConsultationReasonRepository, AIService
+from src.infrastructure.ai.client_registry import ai_client_registry
+from src.infrastructure.ai.ai_service import AIServiceUnavailableError
+from src.infrastructure.ai.token_budget import ai_token_budget
+from src.infrastructure.metrics import metrics
+from src.infrastructure.job_queue import ai_job_queue
+from src.infrastructure.admission import AdmissionRejectedError, ai_admission
+from src.infrastructure.deadline import Deadline, DeadlineExceededError
+from src.infrastructure.idempotency import (
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    idempotency_fingerprint,
+    idempotency_store,
+)
+from src.infrastructure.inflight import TurnCancelledError, ai_inflight
+from src.infrastructure.session_queue import session_work_queue
+from src.infrastructure.reference_data_cache import reference_data_cache
+from src.infrastructure import SQLSessionRepository, SQLMessageRepository, SQLDogBreedRepository, SQLConsultationReasonRepository, SQLUnitOfWork, AIService
 
+from .dependencies import get_current_user_optional, require_metrics_token
+from .deadlines import cancel_on_disconnect, iterate_until_disconnect, request_deadline
 from .schemas import (
     SendMessageRequest,
     VeterinaryAssessmentResponse,
+    AIJobResponse,
+    CancelRequestResponse,
     CollectionResponse,
     PatientDataResponse,
     PatientDataRequest,
     SessionResponse,
     SessionWithMessagesResponse,
     ChatMessageResponse,
+    ChatMessagePageResponse,
     HealthResponse,
     DogBreedResponse,
     ConsultationReasonResponse,
@@ -36,36 +65,24 @@ from .schemas import (
 
 router = APIRouter()
 
+# Per-route deadlines, overridable per request with X-Request-Timeout
+send_message_deadline = request_deadline(float(os.getenv("SEND_MESSAGE_TIMEOUT_SECONDS", "120")))
+stream_message_deadline = request_deadline(float(os.getenv("STREAM_MESSAGE_TIMEOUT_SECONDS", "290")))
 
-# Dependencies
-def get_ai_service() -> AIService:
-    """Get AI service instance."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or api_key == "demo_key":
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
-        )
+# Time a background job gets once a worker picks it up (below its lease)
+AI_JOB_TIMEOUT_SECONDS = float(os.getenv("AI_JOB_TIMEOUT_SECONDS", "300"))
 
-    prompt_id = os.getenv("OPENAI_PROMPT_ID")
-    if not prompt_id or prompt_id == "pmpt_demo":
-        raise HTTPException(
-            status_code=500,
-            detail="OpenAI Prompt ID not configured. Please set OPENAI_PROMPT_ID environment variable."
-        )
+# Browsers and proxies may reuse reference data briefly, then revalidate with the ETag
+REFERENCE_DATA_CACHE_CONTROL = f"public, max-age={os.getenv('REFERENCE_DATA_MAX_AGE', '300')}"
 
-    prompt_version = os.getenv("OPENAI_PROMPT_VERSION", "6")
-    model = os.getenv("OPENAI_MODEL", "gpt-5.2")
-    temperature = float(os.getenv("TEMPERATURE", "0.3"))
-    max_tokens = int(os.getenv("MAX_TOKENS", "2000"))
 
+# Dependencies
+def get_ai_service() -> AIService:
+    """Get the shared AI service instance."""
     try:
-        return AIService(api_key, prompt_id, prompt_version, model, temperature, max_tokens)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to initialize AI service: {str(e)}"
-        )
+        return ai_client_registry.get_service()
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 def get_create_session_handler(
@@ -77,13 +94,36 @@ def get_create_session_handler(
 
 
 def get_send_message_handler(
-    db_session: Annotated[AsyncSession, Depends(get_database_session)],
     ai_service: Annotated[AIService, Depends(get_ai_service)],
 ) -> SendMessageHandler:
-    """Get send message handler."""
-    session_repo = SQLSessionRepository(db_session)
-    message_repo = SQLMessageRepository(db_session)
-    return SendMessageHandler(session_repo, message_repo, ai_service)
+    """Get send message handler.
+
+    The handler opens its own short transactions so no connection is held
+    while the AI call is in flight, runs the turns of a session one at a
+    time, waits for an AI slot first and enforces the monthly token budgets.
+    """
+    return SendMessageHandler(
+        SQLUnitOfWork, ai_service, ai_admission, ai_inflight, session_work_queue, ai_token_budget
+    )
+
+
+def get_ai_job_handler() -> GetAIJobHandler:
+    """Get AI job handler."""
+    return GetAIJobHandler(SQLUnitOfWork)
+
+
+async def run_ai_job(job_id: str) -> None:
+    """Run a queued AI job (used by the in-process job workers)."""
+    handler = SendMessageHandler(
+        SQLUnitOfWork, ai_client_registry.get_service(), ai_admission, session_queue=session_work_queue
+    )
+    await handler.run_job(job_id, ai_job_queue.stale_before, Deadline(AI_JOB_TIMEOUT_SECONDS))
+
+
+async def claimable_ai_job_ids() -> List[str]:
+    """Jobs left pending or abandoned by a previous run."""
+    async with SQLUnitOfWork() as uow:
+        return await uow.jobs.get_claimable_ids(ai_job_queue.stale_before)
 
 
 def get_session_handler(
@@ -103,18 +143,124 @@ def get_session_messages_handler(
     return GetSessionMessagesHandler(message_repo)
 
 
-def get_dog_breed_repository(
-    db_session: Annotated[AsyncSession, Depends(get_database_session)],
-) -> SQLDogBreedRepository:
-    """Get dog breed repository."""
-    return SQLDogBreedRepository(db_session)
+def _assessment_to_response(assessment: VeterinaryAssessment) -> VeterinaryAssessmentResponse:
+    """Convert a domain assessment to its response schema."""
+    # Convert patient_data: if it's a list or empty, set to None
+    # The schema expects a dict (PatientDataAI) or None
+    patient_data_response = None
+    if assessment.patient_data and isinstance(assessment.patient_data, dict):
+        patient_data_response = assessment.patient_data
+
+    return VeterinaryAssessmentResponse(
+        assessment=assessment.assessment,
+        status=assessment.status,
+        localization=assessment.localization,
+        differentials=assessment.differentials,
+        diagnostics=assessment.diagnostics,
+        treatment=assessment.treatment,
+        prognosis=assessment.prognosis,
+        patient_data=patient_data_response,
+        question=assessment.question,
+        confidence_level=assessment.confidence_level,
+    )
 
 
-def get_consultation_reason_repository(
-    db_session: Annotated[AsyncSession, Depends(get_database_session)],
-) -> SQLConsultationReasonRepository:
-    """Get consultation reason repository."""
-    return SQLConsultationReasonRepository(db_session)
+def _job_to_response(job: AIJob) -> AIJobResponse:
+    """Convert an AI job to its response schema."""
+    result = None
+    if job.result is not None:
+        result = _assessment_to_response(VeterinaryAssessment(**job.result))
+
+    return AIJobResponse(
+        id=job.id,
+        session_id=job.session_id,
+        status=job.status,
+        result=result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def _send_message_command(
+    session_id: str,
+    request: SendMessageRequest,
+    user: Optional[User],
+    deadline: Optional[Deadline] = None,
+    request_id: Optional[str] = None,
+) -> SendMessageCommand:
+    """Build the send message command, tagged with the caller for fair queuing."""
+    return SendMessageCommand(
+        session_id=session_id,
+        message=request.message,
+        user_id=user.id if user else None,
+        clinic_name=user.clinic_name if user else None,
+        deadline=deadline,
+        request_id=request_id,
+    )
+
+
+def get_request_id(
+    x_request_id: Annotated[Optional[str], Header(max_length=64)] = None,
+) -> str:
+    """Client-chosen id of a message request (generated if absent), used to cancel it."""
+    return x_request_id or str(uuid.uuid4())
+
+
+def get_idempotency_key(
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+) -> Optional[str]:
+    """Client key making a retried submission replay the first result."""
+    return idempotency_key
+
+
+def _idempotency_scope(route: str, session_id: str, user: Optional[User]) -> str:
+    """What an idempotency key applies to: one route, session and caller."""
+    return f"{route}:{session_id}:{user.id if user else ''}"
+
+
+def _idempotency_error(error: Exception) -> HTTPException:
+    """Map a reused key to a 422 and a key still in progress to a 409."""
+    if isinstance(error, IdempotencyInProgressError):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        )
+    return HTTPException(status_code=422, detail=str(error))
+
+
+def _too_many_requests(error: AdmissionRejectedError) -> HTTPException:
+    """Map an admission rejection to a 429 with Retry-After."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _service_unavailable(error: AIServiceUnavailableError) -> HTTPException:
+    """Map provider overload to a 503 with Retry-After."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _cancelled(error: TurnCancelledError) -> HTTPException:
+    """Map a turn cancelled by its client to a 409."""
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+
+def _gateway_timeout(error: DeadlineExceededError) -> HTTPException:
+    """Map an exhausted request deadline to a 504."""
+    return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(error))
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
 
 
 # API Endpoints
@@ -127,6 +273,12 @@ async def health_check() -> HealthResponse:
     )
 
 
+@router.get("/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def get_metrics() -> dict:
+    """Process-local counters, gauges and timings of this worker (METRICS_TOKEN bearer only)."""
+    return metrics.snapshot()
+
+
 @router.post("/sessions", response_model=SessionResponse)
 async def create_session(
     handler: Annotated[CreateSessionHandler, Depends(get_create_session_handler)],
@@ -154,37 +306,225 @@ async def create_session(
 async def send_message(
     session_id: str,
     request: SendMessageRequest,
+    http_request: Request,
     handler: Annotated[SendMessageHandler, Depends(get_send_message_handler)],
+    current_user: Annotated[Optional[User], Depends(get_current_user_optional)],
+    deadline: Annotated[Deadline, Depends(send_message_deadline)],
+    request_id: Annotated[str, Depends(get_request_id)],
+    idempotency_key: Annotated[Optional[str], Depends(get_idempotency_key)],
+    response: Response,
 ) -> VeterinaryAssessmentResponse:
-    """Send a message and get AI assessment."""
+    """Send a message and get AI assessment.
+
+    The turn is cancelled if the client disconnects, and answered with a
+    504 once its deadline (X-Request-Timeout, capped) has passed. Sending
+    an X-Request-Id lets the client cancel the turn while it runs.
+
+    With an Idempotency-Key, a resend of the same message gets the first
+    answer back (Idempotent-Replayed: true) instead of a second turn, and
+    the turn completes even if the client disconnects, for its resend.
+    """
+    response.headers["X-Request-Id"] = request_id
     try:
-        command = SendMessageCommand(session_id=session_id, message=request.message)
-        assessment = await handler.handle(command)
-
-        # Convert patient_data: if it's a list or empty, set to None
-        # The schema expects a dict (PatientDataAI) or None
-        patient_data_response = None
-        if assessment.patient_data and isinstance(assessment.patient_data, dict):
-            patient_data_response = assessment.patient_data
-
-        return VeterinaryAssessmentResponse(
-            assessment=assessment.assessment,
-            status=assessment.status,
-            localization=assessment.localization,
-            differentials=assessment.differentials,
-            diagnostics=assessment.diagnostics,
-            treatment=assessment.treatment,
-            prognosis=assessment.prognosis,
-            patient_data=patient_data_response,
-            question=assessment.question,
-            confidence_level=assessment.confidence_level,
+        command = _send_message_command(session_id, request, current_user, deadline, request_id)
+        if idempotency_key is None:
+            assessment = await cancel_on_disconnect(http_request, handler.handle(command))
+            return _assessment_to_response(assessment)
+
+        async def work() -> dict:
+            assessment = await handler.handle(command)
+            return _assessment_to_response(assessment).model_dump(mode="json")
+
+        result, replayed = await cancel_on_disconnect(
+            http_request,
+            idempotency_store.run(
+                _idempotency_scope("messages", session_id, current_user),
+                idempotency_key,
+                idempotency_fingerprint(request.model_dump(mode="json")),
+                work,
+                timeout=deadline.timeout(),
+            ),
         )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return VeterinaryAssessmentResponse(**result)
+    except HTTPException:
+        raise
+    except (IdempotencyKeyReusedError, IdempotencyInProgressError) as e:
+        raise _idempotency_error(e)
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+    except AIServiceUnavailableError as e:
+        raise _service_unavailable(e)
+    except DeadlineExceededError as e:
+        raise _gateway_timeout(e)
+    except TurnCancelledError as e:
+        raise _cancelled(e)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/sessions/{session_id}/messages/stream")
+async def send_message_stream(
+    session_id: str,
+    request: SendMessageRequest,
+    http_request: Request,
+    handler: Annotated[SendMessageHandler, Depends(get_send_message_handler)],
+    current_user: Annotated[Optional[User], Depends(get_current_user_optional)],
+    deadline: Annotated[Deadline, Depends(stream_message_deadline)],
+    request_id: Annotated[str, Depends(get_request_id)],
+) -> StreamingResponse:
+    """Send a message and stream the AI assessment as Server-Sent Events.
+
+    Events: ``delta`` (raw text), ``field`` (a completed assessment field),
+    ``assessment`` (the final, persisted assessment) and ``error``. The
+    stream, and the AI call behind it, stop when the client disconnects.
+    """
+    command = _send_message_command(session_id, request, current_user, deadline, request_id)
+
+    # A full queue is known before streaming starts and gets a real 429
+    try:
+        ai_admission.check(command.fairness_key)
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in iterate_until_disconnect(http_request, handler.handle_stream(command)):
+                if event.type == "completed":
+                    response = _assessment_to_response(event.assessment)
+                    yield _sse("assessment", response.model_dump())
+                else:
+                    yield _sse(event.type, event.data)
+        except HTTPException:
+            # Client disconnected: nobody is left to tell
+            return
+        except AdmissionRejectedError as e:
+            yield _sse("error", {"status_code": 429, "detail": str(e), "retry_after": e.retry_after})
+        except AIServiceUnavailableError as e:
+            yield _sse("error", {"status_code": 503, "detail": str(e), "retry_after": e.retry_after})
+        except DeadlineExceededError as e:
+            yield _sse("error", {"status_code": 504, "detail": str(e)})
+        except TurnCancelledError as e:
+            yield _sse("error", {"status_code": 409, "detail": str(e)})
+        except ValueError as e:
+            yield _sse("error", {"status_code": 404, "detail": str(e)})
+        except Exception as e:
+            yield _sse("error", {"status_code": 500, "detail": f"Internal server error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Request-Id": request_id},
+    )
+
+
+@router.post(
+    "/sessions/{session_id}/requests/{request_id}/cancel",
+    response_model=CancelRequestResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def cancel_message_request(
+    session_id: str,
+    request_id: Annotated[str, Path(max_length=64)],
+    current_user: Annotated[Optional[User], Depends(get_current_user_optional)],
+    db_session: Annotated[AsyncSession, Depends(get_database_session)],
+) -> CancelRequestResponse:
+    """Cancel a running message request (sent with this X-Request-Id).
+
+    The AI call is stopped and the turn rolled back: the user message is
+    removed and the session's assessment is left as it was. Cancelling a
+    request that already completed has no effect. Only the session's
+    owner may cancel the requests of a session that has one.
+    """
+    session = await SQLSessionRepository(db_session).get_by_id(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session with id '{session_id}' not found")
+    if session.user_id is not None and (current_user is None or current_user.id != session.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to cancel requests of this session",
+        )
+
+    cancelled_here = await ai_inflight.cancel(session_id, request_id)
+    return CancelRequestResponse(
+        request_id=request_id, status="cancelled" if cancelled_here else "requested"
+    )
+
+
+@router.post(
+    "/sessions/{session_id}/messages/jobs",
+    response_model=AIJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_message_job(
+    session_id: str,
+    request: SendMessageRequest,
+    response: Response,
+    handler: Annotated[SendMessageHandler, Depends(get_send_message_handler)],
+    current_user: Annotated[Optional[User], Depends(get_current_user_optional)],
+    idempotency_key: Annotated[Optional[str], Depends(get_idempotency_key)],
+) -> AIJobResponse:
+    """Persist a message and generate its assessment in the background.
+
+    Returns immediately with a job to poll on ``GET /jobs/{job_id}``; the
+    generation completes even if the client disconnects. A resend with the
+    same Idempotency-Key returns the first job instead of creating another.
+    """
+    async def submit() -> dict:
+        job = await handler.submit_job(_send_message_command(session_id, request, current_user))
+        ai_job_queue.enqueue(job.id)
+        return _job_to_response(job).model_dump(mode="json")
+
+    try:
+        if idempotency_key is None:
+            result = await submit()
+        else:
+            result, replayed = await idempotency_store.run(
+                _idempotency_scope("jobs", session_id, current_user),
+                idempotency_key,
+                idempotency_fingerprint(request.model_dump(mode="json")),
+                submit,
+            )
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+    except (IdempotencyKeyReusedError, IdempotencyInProgressError) as e:
+        raise _idempotency_error(e)
+    except AdmissionRejectedError as e:
+        raise _too_many_requests(e)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    job = AIJobResponse(**result)
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def get_ai_job(
+    job_id: str,
+    handler: Annotated[GetAIJobHandler, Depends(get_ai_job_handler)],
+    wait: Annotated[float, Query(ge=0, le=30, description="Long-poll for up to this many seconds")] = 0,
+) -> AIJobResponse:
+    """Get the status of an AI job, optionally waiting for it to finish."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        try:
+            job = await handler.handle(GetAIJobQuery(job_id=job_id))
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        remaining = deadline - loop.time()
+        if job.is_finished or remaining <= 0:
+            return _job_to_response(job)
+
+        # Woken immediately if this worker runs the job, else re-check every second
+        await ai_job_queue.wait(job_id, min(remaining, 1.0))
+
+
 @router.get("/sessions/{session_id}", response_model=SessionWithMessagesResponse)
 async def get_session(
     session_id: str,
@@ -246,6 +586,37 @@ async def get_session(
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.get("/sessions/{session_id}/messages", response_model=ChatMessagePageResponse)
+async def get_session_messages(
+    session_id: str,
+    handler: Annotated[GetSessionMessagesHandler, Depends(get_session_messages_handler)],
+    before: Annotated[Optional[str], Query(description="Cursor from a previous page's next_cursor")] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+) -> ChatMessagePageResponse:
+    """Get a page of session messages, most recent page first."""
+    try:
+        messages, next_cursor = await handler.handle_page(
+            GetSessionMessagesPageQuery(session_id=session_id, limit=limit, before=before)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ChatMessagePageResponse(
+        messages=[
+            ChatMessageResponse(
+                id=msg.id,
+                role=msg.role,
+                content=msg.content,
+                timestamp=msg.timestamp,
+                status=msg.status,
+                follow_up_question=msg.follow_up_question,
+            )
+            for msg in messages
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/sessions/{session_id}/patient-data", response_model=PatientDataResponse)
 async def get_patient_data(
     session_id: str,
@@ -327,7 +698,7 @@ async def clear_patient_data(
         
         # Clear patient data
         from src.domain.entities import PatientData
-        session.patient_data = PatientData()
+        session.update_patient_data(PatientData())
         
         # Save changes
         session_repo = SQLSessionRepository(get_database_session().__anext__().__await__().__next__())
@@ -338,43 +709,57 @@ async def clear_patient_data(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.get("/dog-breeds", response_model=List[DogBreedResponse])
-async def get_dog_breeds(
-    dog_breed_repo: Annotated[SQLDogBreedRepository, Depends(get_dog_breed_repository)],
-) -> List[DogBreedResponse]:
-    """Get all dog breeds."""
+_dog_breeds_adapter = TypeAdapter(List[DogBreedResponse])
+_consultation_reasons_adapter = TypeAdapter(List[ConsultationReasonResponse])
+
+
+async def load_dog_breeds(db_session: AsyncSession) -> bytes:
+    """Serialize all dog breeds for the reference data cache."""
+    breeds = await SQLDogBreedRepository(db_session).get_all()
+    return _dog_breeds_adapter.dump_json([
+        DogBreedResponse(id=breed.id, name=breed.name, created_at=breed.created_at)
+        for breed in breeds
+    ])
+
+
+async def load_consultation_reasons(db_session: AsyncSession) -> bytes:
+    """Serialize all consultation reasons for the reference data cache."""
+    reasons = await SQLConsultationReasonRepository(db_session).get_all()
+    return _consultation_reasons_adapter.dump_json([
+        ConsultationReasonResponse(
+            id=reason.id,
+            name=reason.name,
+            description=reason.description,
+            created_at=reason.created_at,
+        )
+        for reason in reasons
+    ])
+
+
+async def _reference_data_response(name: str, request: Request) -> Response:
+    """Serve a cached reference dataset, honouring If-None-Match."""
     try:
-        breeds = await dog_breed_repo.get_all()
-        return [
-            DogBreedResponse(
-                id=breed.id,
-                name=breed.name,
-                created_at=breed.created_at,
-            )
-            for breed in breeds
-        ]
+        payload = await reference_data_cache.get(name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    headers = {"ETag": payload.etag, "Cache-Control": REFERENCE_DATA_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if payload.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+@router.get("/dog-breeds", response_model=List[DogBreedResponse])
+async def get_dog_breeds(request: Request) -> Response:
+    """Get all dog breeds (served from the reference data cache)."""
+    return await _reference_data_response("dog_breeds", request)
+
 
 @router.get("/consultation-reasons", response_model=List[ConsultationReasonResponse])
-async def get_consultation_reasons(
-    consultation_reason_repo: Annotated[SQLConsultationReasonRepository, Depends(get_consultation_reason_repository)],
-) -> List[ConsultationReasonResponse]:
-    """Get all consultation reasons."""
-    try:
-        reasons = await consultation_reason_repo.get_all()
-        return [
-            ConsultationReasonResponse(
-                id=reason.id,
-                name=reason.name,
-                description=reason.description,
-                created_at=reason.created_at,
-            )
-            for reason in reasons
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+async def get_consultation_reasons(request: Request) -> Response:
+    """Get all consultation reasons (served from the reference data cache)."""
+    return await _reference_data_response("consultation_reasons", request)
 
 
 @router.get("/sessions/slug/{slug}", response_model=SessionWithMessagesResponse)
@@ -47,6 +47,23 @@ class VeterinaryAssessmentResponse(BaseModel):
     confidence_level: str = "moyenne"
 
 
+class AIJobResponse(BaseModel):
+    """Response schema for an asynchronous AI job."""
+    id: str
+    session_id: str
+    status: str  # "pending", "running", "succeeded" or "failed"
+    result: Optional[VeterinaryAssessmentResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class CancelRequestResponse(BaseModel):
+    """Response schema for a cancellation request."""
+    request_id: str
+    status: str  # "cancelled" (stopped by this worker) or "requested" (left for the worker running it)
+
+
 class PatientDataRequest(BaseModel):
     """Request schema for patient data from pre-consultation form."""
     race: str
@@ -88,6 +105,12 @@ class ChatMessageResponse(BaseModel):
     follow_up_question: Optional[str] = None  # Question de suivi for assistant messages
 
 
+class ChatMessagePageResponse(BaseModel):
+    """Response schema for a page of chat messages."""
+    messages: List[ChatMessageResponse]
+    next_cursor: Optional[str] = None  # Pass as ``before`` to load older messages
+
+
 class SessionResponse(BaseModel):
     """Response schema for chat sessions."""
     id: str
@@ -99,6 +122,22 @@ class SessionResponse(BaseModel):
     is_collecting_data: bool = True
 
 
+class SessionSummaryResponse(BaseModel):
+    """Response schema for a session in the session list."""
+    id: str
+    slug: Optional[str] = None
+    updated_at: datetime
+    localization: Optional[str] = None
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
+
+
+class SessionSummaryPageResponse(BaseModel):
+    """Response schema for a page of session summaries."""
+    sessions: List[SessionSummaryResponse]
+    next_cursor: Optional[str] = None  # Pass as ``before`` to load older sessions
+
+
 class SessionWithMessagesResponse(BaseModel):
     """Response schema for session with messages."""
     session: SessionResponse
@@ -0,0 +1,133 @@
+"""AIMD concurrency limit driven by provider latency and overload errors."""
+import httpx
+import openai
+import pytest
+
+from src.infrastructure.ai.adaptive_limit import AdaptiveConcurrencyLimit, overload_reason
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/responses")
+
+
+def _status_error(status_code: int) -> openai.APIStatusError:
+    response = httpx.Response(status_code, request=REQUEST)
+    error_class = {400: openai.BadRequestError, 429: openai.RateLimitError}.get(status_code, openai.APIStatusError)
+    return error_class("error", response=response, body=None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.infrastructure.ai.adaptive_limit.time.monotonic", lambda: clock[0])
+    return clock
+
+
+def _limit(**kwargs) -> AdaptiveConcurrencyLimit:
+    kwargs.setdefault("initial_limit", 10)
+    kwargs.setdefault("min_limit", 2)
+    kwargs.setdefault("max_limit", 16)
+    kwargs.setdefault("window", 20)
+    return AdaptiveConcurrencyLimit(backoff=0.7, tolerance=2.0, cooldown_seconds=5, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "error, reason",
+    [
+        (_status_error(429), "rate_limited"),
+        (_status_error(500), "server_error"),
+        (_status_error(503), "server_error"),
+        (openai.APITimeoutError(request=REQUEST), "timeout"),
+        (_status_error(400), None),
+        (ValueError("bad output"), None),
+    ],
+)
+def test_overload_reasons(error, reason):
+    assert overload_reason(error) == reason
+
+
+def test_successes_at_the_limit_raise_it_slowly():
+    pushed = []
+    limit = _limit(initial_limit=4, on_change=pushed.append)
+
+    for _ in range(5):
+        limit.record_latency("response", 0.1, saturated=True)
+
+    # About +1 per round of calls
+    assert limit.limit == 5
+    assert pushed == [4, 5]
+
+
+def test_unused_limit_doesnt_grow():
+    limit = _limit(initial_limit=4)
+
+    for _ in range(20):
+        limit.record_latency("response", 0.1, saturated=False)
+
+    assert limit.limit == 4
+
+
+async def test_overload_cuts_the_limit_once_per_cooldown(clock):
+    limit = _limit()
+
+    for _ in range(3):
+        with pytest.raises(openai.RateLimitError):
+            async with limit.track("response"):
+                raise _status_error(429)
+    assert limit.limit == 7
+    assert limit.in_flight == 0
+
+    clock[0] += 5
+    with pytest.raises(openai.APIStatusError):
+        async with limit.track("response"):
+            raise _status_error(503)
+    assert limit.limit == 4
+
+
+async def test_other_errors_leave_the_limit_alone(clock):
+    limit = _limit()
+
+    with pytest.raises(openai.BadRequestError):
+        async with limit.track("response"):
+            raise _status_error(400)
+
+    assert limit.limit == 10
+
+
+def test_limit_stays_within_its_bounds(clock):
+    limit = _limit(initial_limit=3, max_limit=4)
+
+    for _ in range(3):
+        limit._decrease("rate_limited")
+        clock[0] += 5
+    assert limit.limit == 2
+
+    for _ in range(50):
+        limit.record_latency("response", 0.1)
+    assert limit.limit == 4
+
+
+def test_latency_spike_cuts_the_limit(clock):
+    limit = _limit()
+    for _ in range(10):
+        limit.record_latency("response", 0.1)
+    assert limit.baseline("response") == pytest.approx(0.1)
+    grown = limit.limit
+
+    limit.record_latency("response", 1.0)
+    limit.record_latency("response", 1.0)
+
+    assert limit.limit < grown
+    # The new limit is judged on fresh samples
+    assert limit.latency_p90("response") is None
+
+
+def test_latency_is_compared_per_call_kind(clock):
+    limit = _limit(initial_limit=4)
+
+    # Time to first byte of a stream, and a whole plain call
+    for _ in range(10):
+        limit.record_latency("stream", 0.1)
+        limit.record_latency("response", 2.0)
+
+    assert limit.latency_p90("stream") == pytest.approx(0.1)
+    assert limit.latency_p90("response") == pytest.approx(2.0)
+    assert limit.limit > 4
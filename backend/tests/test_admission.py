@@ -0,0 +1,131 @@
+"""Fair queuing, queue bounds and load shedding in front of AI calls."""
+import asyncio
+
+import pytest
+
+from src.infrastructure.admission import AdmissionRejectedError, FairAdmissionController
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _controller(**kwargs) -> FairAdmissionController:
+    kwargs.setdefault("max_concurrency", 1)
+    kwargs.setdefault("max_queue", 10)
+    kwargs.setdefault("max_queue_per_key", 10)
+    kwargs.setdefault("queue_timeout", 30)
+    return FairAdmissionController(**kwargs)
+
+
+async def test_free_slots_are_granted_at_once():
+    controller = _controller(max_concurrency=2)
+
+    await controller.acquire("clinic-a")
+    await controller.acquire("clinic-a")
+
+    assert controller.in_flight == 2
+    assert controller.queued == 0
+
+
+async def test_freed_slots_go_to_each_key_in_turn():
+    controller = _controller()
+    await controller.acquire("clinic-a")
+    order = []
+
+    async def wait(key, name):
+        await controller.acquire(key)
+        order.append(name)
+
+    waiters = [
+        asyncio.create_task(wait(key, name))
+        for key, name in [("clinic-a", "a1"), ("clinic-a", "a2"), ("clinic-a", "a3"), ("clinic-b", "b1")]
+    ]
+    await _settle()
+    assert controller.queued == 4
+
+    for _ in waiters:
+        controller.release()
+        await _settle()
+
+    # The clinic that queued a batch doesn't hold up the other one
+    assert order == ["a1", "b1", "a2", "a3"]
+    await asyncio.gather(*waiters)
+    assert controller.in_flight == 1
+
+
+async def test_full_queues_are_rejected_with_retry_after():
+    controller = _controller(max_concurrency=2, max_queue=3, max_queue_per_key=2)
+    controller._avg_hold = 20.0
+    await controller.acquire("clinic-a")
+    await controller.acquire("clinic-a")
+    waiters = [asyncio.create_task(controller.acquire("clinic-a")) for _ in range(2)]
+    await _settle()
+
+    # Per key: clinic-a is full, clinic-b may still queue
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await controller.acquire("clinic-a")
+    controller.check("clinic-b")
+    # Two slots of about 20 s each, two waiters ahead and the new caller
+    assert rejected.value.retry_after == 30
+
+    # Globally
+    waiters.append(asyncio.create_task(controller.acquire("clinic-b")))
+    await _settle()
+    with pytest.raises(AdmissionRejectedError):
+        controller.check("clinic-c")
+    assert controller.queued == 3
+
+    for _ in waiters:
+        controller.release()
+        await _settle()
+    await asyncio.gather(*waiters)
+
+
+async def test_retry_after_is_bounded():
+    controller = _controller()
+
+    controller._avg_hold = 0.01
+    assert controller._retry_after() == 1
+    controller._avg_hold = 600.0
+    assert controller._retry_after() == 60
+
+
+async def test_wait_gives_up_after_the_queue_timeout():
+    controller = _controller(queue_timeout=0.05)
+    await controller.acquire("clinic-a")
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire("clinic-b")
+
+    assert controller.queued == 0
+    controller.release()
+    assert controller.in_flight == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    controller = _controller()
+    await controller.acquire("clinic-a")
+    waiter = asyncio.create_task(controller.acquire("clinic-b"))
+    await _settle()
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert controller.queued == 0
+    # The freed slot is not handed to the cancelled caller
+    controller.release()
+    assert controller.in_flight == 0
+
+
+async def test_slot_is_released_when_the_call_fails():
+    controller = _controller()
+
+    with pytest.raises(RuntimeError):
+        async with controller.slot("clinic-a"):
+            assert controller.in_flight == 1
+            raise RuntimeError("provider down")
+
+    assert controller.in_flight == 0
@@ -0,0 +1,80 @@
+"""Background runs of AI jobs."""
+from datetime import datetime, UTC
+
+import pytest
+from sqlalchemy import update
+
+from src.application import SendMessageCommand, SendMessageHandler
+from src.domain.entities import ChatSession, VeterinaryAssessment
+from src.infrastructure import SQLSessionRepository, SQLUnitOfWork
+from src.infrastructure.ai.ai_service import AIServiceUnavailableError
+from src.infrastructure.database import AIJobModel
+
+
+class FakeAIService:
+    """AI service answering with a fixed assessment, or failing."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    async def cached_answer(self, messages, session, deadline=None):
+        return None
+
+    async def process_message(self, messages, session, deadline=None, account=None, check_cache=True):
+        if self.error is not None:
+            raise self.error
+        return VeterinaryAssessment(assessment="Suspicion d'atteinte vestibulaire", status="collecting")
+
+
+async def _submit(session_factory, ai_service):
+    async with session_factory() as db_session:
+        session = await SQLSessionRepository(db_session).create(ChatSession.create())
+        await db_session.commit()
+    handler = SendMessageHandler(lambda: SQLUnitOfWork(session_factory), ai_service)
+    job = await handler.submit_job(SendMessageCommand(session_id=session.id, message="Chien ataxique"))
+    return handler, job
+
+
+async def test_job_stores_its_answer(session_factory):
+    handler, job = await _submit(session_factory, FakeAIService())
+
+    job = await handler.run_job(job.id, datetime.now(UTC))
+
+    assert job.status == "succeeded"
+    assert job.result["assessment"] == "Suspicion d'atteinte vestibulaire"
+    async with SQLUnitOfWork(session_factory) as uow:
+        messages = await uow.messages.get_by_session_id(job.session_id)
+    assert [message.role for message in messages] == ["user", "assistant"]
+
+
+async def test_unanswered_job_removes_its_message(session_factory):
+    handler, job = await _submit(session_factory, FakeAIService(AIServiceUnavailableError("down", retry_after=5)))
+
+    with pytest.raises(AIServiceUnavailableError):
+        await handler.run_job(job.id, datetime.now(UTC))
+
+    async with SQLUnitOfWork(session_factory) as uow:
+        stored = await uow.jobs.get_by_id(job.id)
+        messages = await uow.messages.get_by_session_id(job.session_id)
+    assert stored.status == "failed"
+    assert messages == []
+
+
+async def test_job_of_a_deleted_session_fails(session_factory):
+    handler, job = await _submit(session_factory, FakeAIService())
+    async with session_factory() as db_session:
+        await db_session.execute(update(AIJobModel).values(session_id="deleted"))
+        await db_session.commit()
+
+    job = await handler.run_job(job.id, datetime.now(UTC))
+
+    assert job.status == "failed"
+    assert job.error == "Session introuvable"
+
+
+async def test_job_claimed_elsewhere_is_left_alone(session_factory):
+    handler, job = await _submit(session_factory, FakeAIService())
+    await handler.run_job(job.id, datetime.now(UTC))
+
+    assert await handler.run_job(job.id, datetime.now(UTC)) is None
+    assert await handler.run_job("missing", datetime.now(UTC)) is None
@@ -0,0 +1,109 @@
+"""Keys, expiry and eviction of the first-turn assessment cache."""
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.ai.ai_service import AIService
+from src.infrastructure.ai.assessment_cache import AssessmentCache, assessment_cache_key
+from src.infrastructure.metrics import metrics
+
+PATIENT = {"race": "Beagle", "age": "5 ans", "symptoms": ["ataxie", "tête penchée"]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.infrastructure.ai.assessment_cache.time.monotonic", lambda: clock[0])
+    return clock
+
+
+def _key(patient_data=PATIENT, message="Chien ataxique", **overrides) -> str:
+    inputs = {"prompt_id": "pmpt_1", "prompt_version": "2", "model": "gpt-4o", **overrides}
+    return assessment_cache_key(patient_data, message, **inputs)
+
+
+def test_key_ignores_field_order_and_surrounding_whitespace():
+    reordered = {"symptoms": ["ataxie", "tête penchée"], "age": "5 ans", "race": "Beagle"}
+
+    assert _key(reordered, "  Chien ataxique\n") == _key()
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"patient_data": {**PATIENT, "age": "6 ans"}},
+        {"patient_data": None},
+        {"message": "Chien ataxique depuis hier"},
+        {"prompt_version": "3"},
+        {"prompt_id": "pmpt_2"},
+        {"model": "gpt-4o-mini"},
+    ],
+)
+def test_key_changes_with_every_input(changed):
+    assert _key(**changed) != _key()
+
+
+async def test_entries_expire(clock):
+    cache = AssessmentCache(max_entries=10, ttl_seconds=60, persistent=False)
+    await cache.put("k1", "answer")
+
+    clock[0] += 59
+    assert await cache.get("k1") == "answer"
+    clock[0] += 2
+    assert await cache.get("k1") is None
+    assert cache._entries == {}
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    cache = AssessmentCache(max_entries=2, ttl_seconds=60, persistent=False)
+    await cache.put("k1", "answer 1")
+    await cache.put("k2", "answer 2")
+
+    await cache.get("k1")
+    await cache.put("k3", "answer 3")
+
+    assert await cache.get("k2") is None
+    assert await cache.get("k1") == "answer 1"
+    assert await cache.get("k3") == "answer 3"
+
+
+async def test_zero_size_disables_the_cache():
+    cache = AssessmentCache(max_entries=0, persistent=False)
+    await cache.put("k1", "answer")
+
+    assert not cache.enabled
+    assert await cache.get("k1") is None
+
+
+async def test_database_tier_is_shared_across_workers(session_factory):
+    first = AssessmentCache(max_entries=10, persistent=True, session_factory=session_factory)
+    second = AssessmentCache(max_entries=10, persistent=True, session_factory=session_factory)
+    await first.put("k1", "answer")
+
+    assert await second.get("k1") == "answer"
+    # Both workers answered the same question: the first answer stays
+    await second.put("k1", "other answer")
+    assert await AssessmentCache(max_entries=0, persistent=True, session_factory=session_factory).get("k1") == "answer"
+
+
+async def test_database_errors_are_misses():
+    def broken_factory():
+        raise ConnectionError("database down")
+
+    cache = AssessmentCache(max_entries=0, persistent=True, session_factory=broken_factory)
+
+    await cache.put("k1", "answer")
+    assert await cache.get("k1") is None
+
+
+async def test_failed_conversation_seeding_is_counted():
+    async def create(conversation_id, items):
+        raise ConnectionError("provider down")
+
+    client = SimpleNamespace(conversations=SimpleNamespace(items=SimpleNamespace(create=create)))
+    service = AIService(api_key="test", prompt_id="prompt", client=client)
+    before = metrics.get_counter("ai_conversation_seed_failures_total")
+
+    await service._seed_conversation("conv_1", [{"role": "user", "content": "Chien ataxique"}], "{}")
+
+    assert metrics.get_counter("ai_conversation_seed_failures_total") == before + 1
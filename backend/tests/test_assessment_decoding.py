@@ -0,0 +1,108 @@
+"""Decoding and local repair of the model's assessment output."""
+import json
+
+import pytest
+
+from src.infrastructure.ai.ai_service import AIService
+from src.infrastructure.ai.assessment_decoding import AssessmentDecodeError, AssessmentDecoder, repair_json
+from src.infrastructure.metrics import metrics
+
+ASSESSMENT = {"assessment": "Suspicion de hernie discale", "differentials": [{"condition": "IVDD"}]}
+
+
+@pytest.fixture
+def decoder():
+    return AssessmentDecoder(structured_output=True)
+
+
+def _repairs(kind: str) -> float:
+    return metrics.get_counter("ai_decode_repairs_total", labels={"kind": kind})
+
+
+def test_valid_output_needs_no_repair(decoder):
+    output = decoder.decode(json.dumps(ASSESSMENT))
+
+    assert output.assessment == "Suspicion de hernie discale"
+    assert output.differentials[0].condition == "IVDD"
+    assert output.differentials[0].probability == ""
+
+
+def test_fenced_output_is_unwrapped(decoder):
+    before = _repairs("fence")
+
+    output = decoder.decode(f"```json\n{json.dumps(ASSESSMENT)}\n```")
+
+    assert output.assessment == "Suspicion de hernie discale"
+    assert _repairs("fence") == before + 1
+
+
+def test_prose_around_the_object_is_cut(decoder):
+    text, repairs = repair_json(f"Voici mon analyse : {json.dumps(ASSESSMENT)} Bonne journée.")
+
+    assert json.loads(text) == ASSESSMENT
+    assert repairs == ["extract"]
+    assert decoder.decode(f"Voici : {json.dumps(ASSESSMENT)}").assessment == "Suspicion de hernie discale"
+
+
+def test_trailing_commas_are_removed_outside_strings(decoder):
+    text, repairs = repair_json('{"assessment": "a, b,}", "diagnostics": ["IRM",],}')
+
+    assert json.loads(text) == {"assessment": "a, b,}", "diagnostics": ["IRM"]}
+    assert repairs == ["trailing_comma"]
+
+
+def test_unknown_keys_are_dropped(decoder):
+    before = _repairs("extra_keys")
+
+    output = decoder.decode(json.dumps({**ASSESSMENT, "notes": "x", "patient_data": {"age": "5 ans", "poids": 30}}))
+
+    assert "notes" not in output.model_dump()
+    assert output.model_dump()["patient_data"] == {
+        "race": None, "age": "5 ans", "sexe": None, "symptomes": [], "examens": [],
+        "historique": None, "traitement_actuel": None,
+    }
+    assert _repairs("extra_keys") == before + 1
+
+
+def test_list_patient_data_means_none(decoder):
+    output = decoder.decode('{"assessment": "a", "patient_data": []}')
+
+    assert output.patient_data is None
+    assert decoder.decode('{"assessment": "a", "patient_data": ["Labrador"]}').patient_data is None
+
+
+def test_nulls_take_the_defaults(decoder):
+    output = decoder.decode('{"assessment": null, "treatment": null, "differentials": null}')
+
+    assert output.assessment == ""
+    assert output.treatment == ""
+    assert output.differentials == []
+
+
+def test_failures_report_their_reason(decoder):
+    with pytest.raises(AssessmentDecodeError) as not_json:
+        decoder.decode("Le chien présente une ataxie.")
+    with pytest.raises(AssessmentDecodeError) as wrong_shape:
+        decoder.decode('{"diagnostic": "IVDD"}')
+
+    assert not_json.value.reason == "json"
+    assert wrong_shape.value.reason == "schema"
+
+
+def test_strict_schema_lists_every_property(decoder):
+    schema = decoder.response_format["format"]["schema"]
+
+    assert schema["required"] == list(schema["properties"])
+    assert schema["additionalProperties"] is False
+    assert "default" not in json.dumps(schema)
+    assert AssessmentDecoder(structured_output=False).response_format is None
+
+
+async def test_service_falls_back_instead_of_showing_json():
+    service = AIService(api_key="test", prompt_id="prompt", client=object())
+
+    with pytest.raises(AssessmentDecodeError):
+        await service._parse_content('{"diagnostic": "IVDD"}', session=None)
+    prose = await service._parse_content("Le chien présente une ataxie.", session=None)
+
+    assert prose.assessment == "Le chien présente une ataxie."
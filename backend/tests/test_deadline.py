@@ -0,0 +1,142 @@
+"""Request deadlines, their stages, and cancellation on client disconnect."""
+import asyncio
+import math
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.infrastructure.deadline import Deadline, DeadlineExceededError
+from src.presentation.deadlines import (
+    CLIENT_CLOSED_REQUEST,
+    MAX_REQUEST_TIMEOUT,
+    cancel_on_disconnect,
+    iterate_until_disconnect,
+    request_deadline,
+)
+
+
+class Client:
+    """Stands in for a request whose client may go away."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def _request(timeout_header=None) -> Request:
+    headers = [] if timeout_header is None else [(b"x-request-timeout", timeout_header.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+def test_deadline_without_timeout_never_expires():
+    deadline = Deadline()
+
+    assert not deadline.bounded
+    assert deadline.remaining == math.inf
+    assert deadline.timeout() is None
+    deadline.reserve(2).check("ai")
+
+
+def test_reserve_leaves_time_for_later_stages():
+    deadline = Deadline(10)
+
+    reserved = deadline.reserve(4)
+
+    assert 5.9 < reserved.remaining <= 6
+    assert 9.9 < deadline.remaining <= 10
+
+
+async def test_expired_deadline_fails_before_the_stage():
+    deadline = Deadline(10).reserve(10)
+    started = False
+
+    with pytest.raises(DeadlineExceededError):
+        async with deadline.stage("ai"):
+            started = True
+
+    assert not started
+
+
+async def test_stage_is_cancelled_at_the_end_of_its_share():
+    deadline = Deadline(2)
+
+    with pytest.raises(DeadlineExceededError):
+        async with deadline.stage("begin", share=0.05):
+            await asyncio.sleep(1)
+
+    # The rest of the time is left to the later stages
+    assert deadline.remaining > 1
+
+
+async def test_other_timeouts_inside_a_stage_are_not_the_deadline():
+    with pytest.raises(TimeoutError) as raised:
+        async with Deadline(10).stage("ai"):
+            raise TimeoutError("provider timeout")
+
+    assert type(raised.value) is TimeoutError
+
+
+def test_client_may_shorten_the_deadline_up_to_the_cap():
+    dependency = request_deadline(120)
+
+    assert 119 < dependency(_request()).remaining <= 120
+    assert 4 < dependency(_request("5")).remaining <= 5
+    assert dependency(_request("100000")).remaining <= MAX_REQUEST_TIMEOUT
+
+
+@pytest.mark.parametrize("header", ["0", "-1", "soon", "inf", "nan"])
+def test_invalid_deadline_header_is_refused(header):
+    with pytest.raises(HTTPException) as refused:
+        request_deadline(120)(_request(header))
+
+    assert refused.value.status_code == 400
+
+
+async def test_work_is_cancelled_when_the_client_disconnects():
+    client = Client()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    running = asyncio.create_task(cancel_on_disconnect(client, work(), poll_interval=0.01))
+    await asyncio.sleep(0.03)
+    client.disconnected = True
+
+    with pytest.raises(HTTPException) as closed:
+        await running
+    assert closed.value.status_code == CLIENT_CLOSED_REQUEST
+    assert cancelled.is_set()
+
+
+async def test_work_that_completes_returns_its_result():
+    async def work():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    assert await cancel_on_disconnect(Client(), work(), poll_interval=0.01) == "answer"
+
+
+async def test_stream_stops_waiting_when_the_client_disconnects():
+    client = Client()
+
+    async def events():
+        yield "delta"
+        # No first token for a long time
+        await asyncio.sleep(10)
+        yield "never"
+
+    received = []
+    with pytest.raises(HTTPException):
+        async for event in iterate_until_disconnect(client, events(), poll_interval=0.01):
+            received.append(event)
+            client.disconnected = True
+
+    assert received == ["delta"]
@@ -0,0 +1,113 @@
+"""Idempotency keys: single flight, replay, conflicts and failures."""
+import asyncio
+
+import pytest
+
+from src.infrastructure.idempotency import (
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotencyStore,
+    idempotency_fingerprint,
+)
+
+
+class Work:
+    """Counts its runs; each run waits for ``release`` when one is set."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result or {"id": "job-1"}
+        self.error = error
+        self.runs = 0
+        self.release = None
+
+    async def __call__(self):
+        self.runs += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_fingerprint_ignores_key_order():
+    assert idempotency_fingerprint({"a": 1, "b": "é"}) == idempotency_fingerprint({"b": "é", "a": 1})
+    assert idempotency_fingerprint({"a": 1}) != idempotency_fingerprint({"a": 2})
+
+
+async def test_concurrent_retries_join_the_running_request(session_factory):
+    store = IdempotencyStore(session_factory=session_factory)
+    work = Work()
+    work.release = asyncio.Event()
+
+    first = asyncio.create_task(store.run("send", "k1", "f1", work))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(store.run("send", "k1", "f1", work))
+    await asyncio.sleep(0)
+    work.release.set()
+
+    assert await first == ({"id": "job-1"}, False)
+    assert await second == ({"id": "job-1"}, True)
+    assert work.runs == 1
+
+
+async def test_completed_result_is_replayed_by_another_worker(session_factory):
+    work = Work()
+    await IdempotencyStore(session_factory=session_factory).run("send", "k1", "f1", work)
+
+    result = await IdempotencyStore(session_factory=session_factory).run("send", "k1", "f1", work)
+
+    assert result == ({"id": "job-1"}, True)
+    assert work.runs == 1
+
+
+async def test_same_key_for_another_request_is_refused(session_factory):
+    store = IdempotencyStore(session_factory=session_factory)
+    work = Work()
+    work.release = asyncio.Event()
+    running = asyncio.create_task(store.run("send", "k1", "f1", work))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        await store.run("send", "k1", "f2", work)
+    work.release.set()
+    await running
+    with pytest.raises(IdempotencyKeyReusedError):
+        await IdempotencyStore(session_factory=session_factory).run("send", "k1", "f2", work)
+    assert work.runs == 1
+
+
+async def test_keys_are_scoped(session_factory):
+    store = IdempotencyStore(session_factory=session_factory)
+    work = Work()
+
+    await store.run("session-a", "k1", "f1", work)
+    _, replayed = await store.run("session-b", "k1", "f2", work)
+
+    assert not replayed
+    assert work.runs == 2
+
+
+async def test_failed_request_releases_its_key(session_factory):
+    store = IdempotencyStore(session_factory=session_factory)
+    failing = Work(error=RuntimeError("provider down"))
+
+    with pytest.raises(RuntimeError):
+        await store.run("send", "k1", "f1", failing)
+    result = await store.run("send", "k1", "f1", Work())
+
+    assert result == ({"id": "job-1"}, False)
+
+
+async def test_request_running_elsewhere_times_out(session_factory):
+    work = Work()
+    work.release = asyncio.Event()
+    running = asyncio.create_task(IdempotencyStore(session_factory=session_factory).run("send", "k1", "f1", work))
+    await asyncio.sleep(0.05)
+
+    other_worker = IdempotencyStore(session_factory=session_factory, poll_interval=0.01)
+    with pytest.raises(IdempotencyInProgressError):
+        await other_worker.run("send", "k1", "f1", work, timeout=0.05)
+
+    work.release.set()
+    await running
+    assert await other_worker.run("send", "k1", "f1", work) == ({"id": "job-1"}, True)
@@ -0,0 +1,157 @@
+"""Cancellation of in-flight turns, in this worker and across workers."""
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from main import app
+from src.domain.entities import ChatSession, User
+from src.infrastructure import SQLSessionRepository
+from src.infrastructure.database import AICancellationModel, get_database_session
+from src.infrastructure.inflight import InFlightRegistry, InFlightTurn, TurnCancelledError, ai_inflight
+from src.presentation.dependencies import get_current_user_optional
+
+
+@pytest.fixture
+async def registries(session_factory):
+    workers = [InFlightRegistry(session_factory=session_factory, poll_interval=0.01) for _ in range(2)]
+    yield workers
+    for registry in workers:
+        await registry.close()
+
+
+async def _pending_cancellations(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(AICancellationModel.request_id))
+        return list(result.scalars().all())
+
+
+async def test_cancel_interrupts_the_running_step(registries):
+    registry = registries[0]
+
+    async with registry.track("s1", "r1") as turn:
+        step = asyncio.create_task(turn.run(asyncio.sleep(10)))
+        await asyncio.sleep(0)
+
+        assert await registry.cancel("s1", "r1")
+        with pytest.raises(TurnCancelledError):
+            await step
+
+    assert registry._turns == {}
+
+
+async def test_steps_after_a_cancel_are_refused():
+    turn = InFlightTurn("s1", "r1")
+    turn.cancel()
+    step = asyncio.sleep(0)
+
+    with pytest.raises(TurnCancelledError):
+        await turn.run(step)
+    # Closed, not left un-awaited
+    assert step.cr_frame is None
+
+
+async def test_caller_cancellation_is_not_a_client_cancel():
+    turn = InFlightTurn("s1", "r1")
+    step = asyncio.create_task(turn.run(asyncio.sleep(10)))
+    await asyncio.sleep(0)
+
+    step.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await step
+    assert not turn.cancelled
+
+
+async def test_turns_without_a_request_id_are_not_tracked(registries):
+    registry = registries[0]
+
+    async with registry.track("s1", None) as turn:
+        assert registry._turns == {}
+        turn.cancel()
+        assert turn.cancelled
+
+
+async def test_cancel_reaches_the_worker_running_the_turn(registries, session_factory):
+    running_here, other_worker = registries
+
+    async with running_here.track("s1", "r1") as turn:
+        step = asyncio.create_task(turn.run(asyncio.sleep(10)))
+
+        assert not await other_worker.cancel("s1", "r1")
+        # Asked twice: recorded once
+        assert not await other_worker.cancel("s1", "r1")
+
+        with pytest.raises(TurnCancelledError):
+            await asyncio.wait_for(step, timeout=1)
+
+    assert await _pending_cancellations(session_factory) == []
+
+
+async def test_cancel_of_another_session_is_left_alone(registries, session_factory):
+    running_here, other_worker = registries
+
+    async with running_here.track("s1", "r1") as turn:
+        await other_worker.cancel("s2", "r1")
+        await asyncio.sleep(0.05)
+        assert not turn.cancelled
+
+    assert await _pending_cancellations(session_factory) == ["r1"]
+
+
+@pytest.fixture
+async def cancel(session_factory, monkeypatch):
+    """POST a cancel as the given user (None: anonymous)."""
+    monkeypatch.setattr(ai_inflight, "_session_factory", session_factory)
+
+    async def database_session():
+        async with session_factory() as db_session:
+            yield db_session
+            await db_session.commit()
+
+    async def post(session_id, user):
+        app.dependency_overrides[get_database_session] = database_session
+        app.dependency_overrides[get_current_user_optional] = lambda: user
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                return await client.post(f"/api/v1/sessions/{session_id}/requests/r1/cancel")
+        finally:
+            app.dependency_overrides.pop(get_database_session, None)
+            app.dependency_overrides.pop(get_current_user_optional, None)
+
+    yield post
+    await ai_inflight.close()
+
+
+async def _create_session(session_factory, user_id=None) -> ChatSession:
+    async with session_factory() as db_session:
+        session = ChatSession.create()
+        session.user_id = user_id
+        session = await SQLSessionRepository(db_session).create(session)
+        await db_session.commit()
+    return session
+
+
+def _user(name: str) -> User:
+    return User.create(email=f"{name}@example.com", hashed_password="x", first_name="A", last_name="B", clinic_name=None)
+
+
+async def test_only_the_owner_may_cancel(session_factory, cancel):
+    owner = _user("owner")
+    session = await _create_session(session_factory, user_id=owner.id)
+
+    assert (await cancel(session.id, _user("other"))).status_code == 403
+    assert (await cancel(session.id, None)).status_code == 403
+    assert await _pending_cancellations(session_factory) == []
+
+    response = await cancel(session.id, owner)
+    assert response.status_code == 202
+    assert response.json()["status"] == "requested"
+
+
+async def test_anonymous_sessions_may_be_cancelled_by_anyone(session_factory, cancel):
+    session = await _create_session(session_factory)
+
+    assert (await cancel(session.id, None)).status_code == 202
+    assert (await cancel("missing", None)).status_code == 404
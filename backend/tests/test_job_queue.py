@@ -0,0 +1,59 @@
+"""In-process AI job workers and waiting for their jobs."""
+import asyncio
+
+import pytest
+
+from src.infrastructure.job_queue import AIJobQueue
+
+
+@pytest.fixture
+async def queue():
+    queue = AIJobQueue(workers=2, lease_seconds=60)
+    yield queue
+    await queue.close()
+
+
+async def test_waiter_is_woken_when_the_job_finishes(queue):
+    release = asyncio.Event()
+
+    async def runner(job_id):
+        await release.wait()
+
+    await queue.start(runner)
+    queue.enqueue("job-1")
+    await asyncio.sleep(0)
+
+    waiter = asyncio.create_task(queue.wait("job-1", timeout=5))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    release.set()
+
+    await asyncio.wait_for(waiter, timeout=1)
+    assert queue._running == {}
+
+
+async def test_failed_job_wakes_its_waiters_too(queue):
+    async def runner(job_id):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    await queue.start(runner)
+    queue.enqueue("job-1")
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(queue.wait("job-1", timeout=5), timeout=1)
+    assert queue._running == {}
+
+
+async def test_waiting_for_a_job_run_elsewhere_leaves_nothing_behind(queue):
+    async def runner(job_id):
+        pass
+
+    await queue.start(runner)
+
+    await queue.wait("job-elsewhere", timeout=0.01)
+    waiter = asyncio.create_task(queue.wait("job-elsewhere", timeout=5))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert queue._running == {}
@@ -33,4 +33,17 @@ def test_create_session():
     assert response.status_code == 200
     data = response.json()
     assert "session_id" in data
-    assert len(data["session_id"]) > 0
\ No newline at end of file
+    assert len(data["session_id"]) > 0
+def test_metrics_require_the_metrics_token(monkeypatch):
+    """Test metrics are only served to the metrics scraper"""
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    assert client.get("/api/v1/metrics").status_code == 404
+
+    monkeypatch.setenv("METRICS_TOKEN", "scraper-token")
+    assert client.get("/api/v1/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer other-token"}
+    assert client.get("/api/v1/metrics", headers=wrong).status_code == 401
+
+    response = client.get("/api/v1/metrics", headers={"Authorization": "Bearer scraper-token"})
+    assert response.status_code == 200
+    assert "counters" in response.json()
@@ -0,0 +1,83 @@
+"""Incremental parsing of the streamed assessment object."""
+import json
+
+from src.infrastructure.ai.partial_json import IncrementalJSONObjectParser
+
+ASSESSMENT = {
+    "assessment": "Ataxie \"vestibulaire\" \\ centrale",
+    "localization": "Tronc cérébral\nà confirmer",
+    "differentials": [{"condition": "Otite", "probability": "haute"}],
+    "age": 12,
+    "urgent": True,
+    "notes": None,
+}
+
+
+def _feed_by(parser: IncrementalJSONObjectParser, text: str, size: int):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+def test_members_are_returned_once_complete():
+    parser = IncrementalJSONObjectParser()
+
+    assert parser.feed('{"assessment": "Atax') == []
+    assert parser.feed('ie", "loc') == [("assessment", "Ataxie")]
+    assert parser.feed('alization": "C1-C5"}') == [("localization", "C1-C5")]
+    assert parser.text == '{"assessment": "Ataxie", "localization": "C1-C5"}'
+
+
+def test_every_chunk_boundary_gives_the_same_members():
+    text = json.dumps(ASSESSMENT, ensure_ascii=False)
+
+    for size in range(1, len(text) + 1):
+        parser = IncrementalJSONObjectParser()
+        assert _feed_by(parser, text, size) == list(ASSESSMENT.items()), size
+
+
+def test_escapes_split_across_chunks():
+    text = json.dumps({"assessment": "a\"b\\cé🐕"})
+
+    for split in range(len(text)):
+        parser = IncrementalJSONObjectParser()
+        completed = parser.feed(text[:split]) + parser.feed(text[split:])
+        assert completed == [("assessment", "a\"b\\cé🐕")], split
+
+
+def test_number_waits_for_a_delimiter():
+    parser = IncrementalJSONObjectParser()
+
+    assert parser.feed('{"age": 1') == []
+    assert parser.feed('2') == []
+    assert parser.feed('}') == [("age", 12)]
+
+
+def test_only_requested_fields_are_returned():
+    parser = IncrementalJSONObjectParser(fields=["localization"])
+
+    completed = parser.feed(json.dumps(ASSESSMENT))
+
+    assert completed == [("localization", ASSESSMENT["localization"])]
+
+
+def test_text_before_the_object_is_skipped():
+    parser = IncrementalJSONObjectParser()
+
+    assert parser.feed("```json\n") == []
+    assert parser.feed('{"assessment": "ok"}\n```') == [("assessment", "ok")]
+
+
+def test_nothing_is_returned_after_the_object_ends():
+    parser = IncrementalJSONObjectParser()
+
+    assert parser.feed('{"a": 1} {"b": 2}') == [("a", 1)]
+    assert parser.feed(', "c": 3}') == []
+
+
+def test_malformed_input_stops_parsing():
+    parser = IncrementalJSONObjectParser()
+
+    assert parser.feed("{assessment: 'x'}") == []
+    assert parser.feed('"b": 2}') == []
@@ -0,0 +1,84 @@
+"""Round-trip budgets for the main write paths."""
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from main import app
+from src.application import SendMessageCommand, SendMessageHandler
+from src.domain.entities import ChatSession, VeterinaryAssessment
+from src.infrastructure import SQLSessionRepository, SQLUnitOfWork
+from src.infrastructure.database import get_database_session
+
+
+class FakeAIService:
+    """AI service returning a fixed assessment without any network call."""
+
+    async def cached_answer(self, messages, session, deadline=None):
+        return None
+
+    async def process_message(self, messages, session, deadline=None, account=None, check_cache=True):
+        return VeterinaryAssessment(assessment="Suspicion d'atteinte vestibulaire", status="collecting")
+
+
+@pytest.fixture
+def statements(session_factory):
+    """First keyword of every statement sent to the database."""
+    statements = []
+
+    @event.listens_for(session_factory.kw["bind"].sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    return statements
+
+
+async def _create_session(factory) -> ChatSession:
+    async with factory() as db_session:
+        session = await SQLSessionRepository(db_session).create(ChatSession.create())
+        await db_session.commit()
+    return session
+
+
+async def test_send_message_round_trips(session_factory, statements):
+    session = await _create_session(session_factory)
+    statements.clear()
+    handler = SendMessageHandler(lambda: SQLUnitOfWork(session_factory), FakeAIService())
+
+    await handler.handle(SendMessageCommand(session_id=session.id, message="Chien de 5 ans, ataxie"))
+
+    # Load session, set slug, insert user message, load history,
+    # insert assistant message, save assessment
+    assert statements == ["SELECT", "UPDATE", "INSERT", "SELECT", "INSERT", "UPDATE"]
+
+
+async def test_save_patient_data_round_trips(session_factory, statements):
+    session = await _create_session(session_factory)
+    statements.clear()
+
+    async def override():
+        async with session_factory() as db_session:
+            yield db_session
+            await db_session.commit()
+
+    app.dependency_overrides[get_database_session] = override
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                f"/api/v1/sessions/{session.id}/patient-data",
+                json={
+                    "race": "Labrador",
+                    "age": "5 ans",
+                    "sexe": "Mâle",
+                    "castre": True,
+                    "motif_consultation": "Ataxie",
+                    "premiers_symptomes": "Depuis 3 jours",
+                    "etat_conscience": "Normal",
+                    "comportement": "Normal",
+                    "convulsions": "Non",
+                },
+            )
+    finally:
+        app.dependency_overrides.pop(get_database_session, None)
+
+    assert response.status_code == 200
+    assert statements == ["SELECT", "UPDATE"]
@@ -0,0 +1,86 @@
+"""Reference data served from the in-process cache, with ETag revalidation."""
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+from src.infrastructure.database import DogBreedModel
+from src.infrastructure.reference_data_cache import ReferenceDataCache, reference_data_cache
+from src.presentation.router import load_dog_breeds
+
+
+async def _add_breed(session_factory, name: str) -> None:
+    async with session_factory() as session:
+        session.add(DogBreedModel(name=name))
+        await session.commit()
+
+
+@pytest.fixture
+async def client(session_factory, monkeypatch):
+    monkeypatch.setattr(reference_data_cache, "_session_factory", session_factory)
+    monkeypatch.setattr(reference_data_cache, "_payloads", {})
+    monkeypatch.setattr(reference_data_cache, "_loaders", {})
+    monkeypatch.setattr(reference_data_cache, "_locks", {})
+    reference_data_cache.register("dog_breeds", load_dog_breeds)
+    await _add_breed(session_factory, "Beagle")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_unchanged_data_is_revalidated_with_304(client):
+    response = await client.get("/api/v1/dog-breeds")
+    etag = response.headers["etag"]
+
+    assert response.status_code == 200
+    assert [breed["name"] for breed in response.json()] == ["Beagle"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    revalidated = await client.get("/api/v1/dog-breeds", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    # Weak and listed validators match too
+    listed = await client.get("/api/v1/dog-breeds", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert listed.status_code == 304
+
+
+async def test_other_etag_gets_the_data(client):
+    response = await client.get("/api/v1/dog-breeds", headers={"If-None-Match": '"other"'})
+
+    assert response.status_code == 200
+    assert [breed["name"] for breed in response.json()] == ["Beagle"]
+
+
+async def test_hot_path_doesnt_read_the_database(session_factory):
+    opened = []
+
+    def counting_factory():
+        opened.append(None)
+        return session_factory()
+
+    await _add_breed(session_factory, "Beagle")
+    cache = ReferenceDataCache(ttl_seconds=60, session_factory=counting_factory)
+    cache.register("dog_breeds", load_dog_breeds)
+
+    first = await cache.get("dog_breeds")
+    assert await cache.get("dog_breeds") is first
+    assert len(opened) == 1
+
+
+async def test_stale_data_is_served_while_it_reloads(session_factory):
+    await _add_breed(session_factory, "Beagle")
+    cache = ReferenceDataCache(ttl_seconds=60, session_factory=session_factory)
+    cache.register("dog_breeds", load_dog_breeds)
+    first = await cache.get("dog_breeds")
+
+    await _add_breed(session_factory, "Boxer")
+    first.loaded_at -= 61
+    assert await cache.get("dog_breeds") is first
+    await asyncio.gather(*cache._refreshing.values())
+
+    reloaded = await cache.get("dog_breeds")
+    assert reloaded.etag != first.etag
+    assert reloaded.version == 2
+    assert b"Boxer" in reloaded.body
@@ -0,0 +1,166 @@
+"""Retry classes, circuit breaker and hedging of AI provider calls."""
+import asyncio
+from collections import deque
+
+import httpx
+import openai
+import pytest
+
+from src.infrastructure.ai.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    is_retryable,
+    is_transient,
+)
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/responses")
+
+
+def _status_error(status_code: int, headers=None) -> openai.APIStatusError:
+    response = httpx.Response(status_code, request=REQUEST, headers=headers)
+    error_class = {400: openai.BadRequestError, 429: openai.RateLimitError}.get(status_code, openai.APIStatusError)
+    return error_class("error", response=response, body=None)
+
+
+def _caller(**kwargs) -> ResilientCaller:
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=5, reset_timeout=30))
+    return ResilientCaller(max_attempts=3, backoff_base=0.001, backoff_max=0.01, **kwargs)
+
+
+class Calls:
+    """Raises the given errors in turn, then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.count = 0
+
+    async def __call__(self):
+        self.count += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "answer"
+
+
+@pytest.mark.parametrize(
+    "error, retryable, transient",
+    [
+        (openai.APIConnectionError(request=REQUEST), True, True),
+        (_status_error(429), True, True),
+        (_status_error(502), True, True),
+        (_status_error(503), True, True),
+        # The answer may have been generated: not sent again
+        (_status_error(500), False, True),
+        (_status_error(504), False, True),
+        (openai.APITimeoutError(request=REQUEST), False, True),
+        (_status_error(400), False, False),
+        (ValueError("bad output"), False, False),
+        (CircuitOpenError(retry_after=5), False, True),
+    ],
+)
+def test_error_classes(error, retryable, transient):
+    assert is_retryable(error) is retryable
+    assert is_transient(error) is transient
+
+
+async def test_retryable_errors_are_retried():
+    fn = Calls(openai.APIConnectionError(request=REQUEST), _status_error(503))
+
+    assert await _caller().call("response", fn) == "answer"
+    assert fn.count == 3
+
+
+async def test_ambiguous_errors_are_not_retried():
+    fn = Calls(openai.APITimeoutError(request=REQUEST))
+
+    with pytest.raises(openai.APITimeoutError):
+        await _caller().call("response", fn)
+    assert fn.count == 1
+
+
+async def test_attempts_are_bounded():
+    fn = Calls(*[_status_error(503)] * 5)
+
+    with pytest.raises(openai.APIStatusError):
+        await _caller().call("response", fn)
+    assert fn.count == 3
+
+
+async def test_long_retry_after_fails_at_once():
+    fn = Calls(_status_error(429, headers={"retry-after": "60"}))
+
+    with pytest.raises(openai.RateLimitError):
+        await _caller().call("response", fn)
+    assert fn.count == 1
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.infrastructure.ai.resilience.time.monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == 30
+
+    # After the reset timeout a single probe goes through
+    clock[0] += 30
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe opens the circuit again, a successful one closes it
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+async def test_rate_limits_and_client_errors_dont_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    caller = ResilientCaller(breaker=breaker, max_attempts=1)
+
+    with pytest.raises(openai.RateLimitError):
+        await caller.call("response", Calls(_status_error(429)))
+    with pytest.raises(openai.BadRequestError):
+        await caller.call("response", Calls(_status_error(400)))
+    assert breaker.state == "closed"
+
+    with pytest.raises(openai.APIStatusError):
+        await caller.call("response", Calls(_status_error(500)))
+    assert breaker.state == "open"
+    fn = Calls()
+    with pytest.raises(CircuitOpenError):
+        await caller.call("response", fn)
+    assert fn.count == 0
+
+
+async def _slow_then_fast(calls):
+    calls.append(None)
+    await asyncio.sleep(1 if len(calls) == 1 else 0)
+    return len(calls)
+
+
+async def test_only_hedgeable_calls_are_hedged():
+    caller = _caller(hedge=True, hedge_ratio=1.0, hedge_min_delay=0.01)
+    for kind in ("conversation", "response"):
+        caller._latencies[kind] = deque([0.01] * caller.min_samples)
+
+    calls = []
+    assert await caller.call("conversation", lambda: _slow_then_fast(calls), hedgeable=True) == 2
+    assert len(calls) == 2
+
+    calls = []
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(caller.call("response", lambda: _slow_then_fast(calls)), timeout=0.1)
+    assert len(calls) == 1
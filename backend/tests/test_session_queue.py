@@ -0,0 +1,184 @@
+"""Per-session ordering and coalescing of chat turns."""
+import asyncio
+from datetime import datetime, UTC
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, update
+
+from src.infrastructure.admission import AdmissionRejectedError
+from src.infrastructure.database import SessionLockModel
+from src.infrastructure.session_queue import DatabaseSessionLock, SessionWorkQueue
+
+
+def _message(message_id: str) -> SimpleNamespace:
+    return SimpleNamespace(id=message_id)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _enter(queue: SessionWorkQueue, session_id: str, message_id: str):
+    place = queue.join(session_id)
+    await queue.enter(place, _message(message_id))
+    return place
+
+
+async def test_first_turn_runs_at_once():
+    queue = SessionWorkQueue()
+
+    place = await _enter(queue, "s1", "m1")
+
+    assert place.leader and not place.answered and not place.stale
+    assert place.merged == []
+    await queue.leave(place)
+    assert queue._lanes == {}
+
+
+async def test_turns_of_a_session_run_in_order():
+    queue = SessionWorkQueue()
+    first = await _enter(queue, "s1", "m1")
+    second = asyncio.create_task(_enter(queue, "s1", "m2"))
+    other = await _enter(queue, "s2", "m3")
+    await _settle()
+
+    # Another session is not held up
+    assert other.leader
+    assert not second.done()
+
+    first.complete("answer 1")
+    await queue.leave(first)
+    place = await second
+
+    # Not merged (it was waiting before the first turn started), and told to reload
+    assert place.leader and place.stale
+    await queue.leave(place)
+    await queue.leave(other)
+
+
+async def test_messages_queued_together_share_one_turn():
+    queue = SessionWorkQueue()
+    running = await _enter(queue, "s1", "m1")
+    second = asyncio.create_task(_enter(queue, "s1", "m2"))
+    third = asyncio.create_task(_enter(queue, "s1", "m3"))
+    await _settle()
+
+    await queue.leave(running)
+    leader = await second
+    assert [message.id for message in leader.merged] == ["m3"]
+
+    leader.complete("answer 2+3")
+    await queue.leave(leader)
+    follower = await third
+
+    assert follower.answered and not follower.leader
+    assert follower.result == "answer 2+3"
+    await queue.leave(follower)
+    assert queue._lanes == {}
+
+
+async def test_failed_leader_leaves_merged_messages_to_run():
+    queue = SessionWorkQueue()
+    running = await _enter(queue, "s1", "m1")
+    second = asyncio.create_task(_enter(queue, "s1", "m2"))
+    third = asyncio.create_task(_enter(queue, "s1", "m3"))
+    await _settle()
+    await queue.leave(running)
+    leader = await second
+
+    # No complete(): the turn got no answer
+    await queue.leave(leader)
+    place = await third
+
+    assert place.leader and not place.answered
+    await queue.leave(place)
+
+
+async def test_follower_cancelled_while_merged():
+    queue = SessionWorkQueue()
+    running = await _enter(queue, "s1", "m1")
+    second = asyncio.create_task(_enter(queue, "s1", "m2"))
+    third_place = queue.join("s1")
+    third = asyncio.create_task(queue.enter(third_place, _message("m3")))
+    await _settle()
+    await queue.leave(running)
+    leader = await second
+    assert [message.id for message in leader.merged] == ["m3"]
+
+    third.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await third
+    await queue.leave(third_place)
+    leader.complete("answer 2+3")
+    await queue.leave(leader)
+
+    assert not third_place.answered
+    assert queue._lanes == {}
+    # The lane's lock was handed back: a new turn runs at once
+    place = await asyncio.wait_for(_enter(queue, "s1", "m4"), timeout=1)
+    assert place.leader
+    await queue.leave(place)
+
+
+async def _lock_rows(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(SessionLockModel))
+        return result.scalars().all()
+
+
+async def test_lease_makes_other_workers_wait(session_factory):
+    # Polls slowly: the in-memory database has one connection, shared by the two workers
+    lock = DatabaseSessionLock(session_factory, timeout=5, lease_seconds=30, poll_interval=0.2)
+    # Two workers: the lock is only shared through the table
+    first = SessionWorkQueue(lock)
+    second = SessionWorkQueue(lock)
+    running = await _enter(first, "s1", "m1")
+    waiting = asyncio.create_task(_enter(second, "s1", "m2"))
+    await asyncio.sleep(0.05)
+
+    assert not waiting.done()
+    assert [row.session_id for row in await _lock_rows(session_factory)] == ["s1"]
+
+    await first.leave(running)
+    place = await asyncio.wait_for(waiting, timeout=1)
+    assert place.leader and place.stale
+    await second.leave(place)
+    assert await _lock_rows(session_factory) == []
+
+
+async def test_busy_session_is_rejected_after_the_timeout(session_factory):
+    lock = DatabaseSessionLock(session_factory, timeout=0.05, lease_seconds=30, poll_interval=0.01)
+    held = await lock.acquire("s1")
+
+    with pytest.raises(AdmissionRejectedError):
+        await lock.acquire("s1")
+    await lock.release("s1", held)
+
+
+async def test_expired_lease_is_taken_over(session_factory):
+    lock = DatabaseSessionLock(session_factory, timeout=1, lease_seconds=30, poll_interval=0.01)
+    dead = await lock.acquire("s1")
+    # The worker holding it died: no more renewals
+    dead.renewal.cancel()
+    async with session_factory() as session:
+        await session.execute(update(SessionLockModel).values(expires_at=datetime(2000, 1, 1)))
+        await session.commit()
+
+    lease = await lock.acquire("s1")
+    # The old holder's release leaves the new lease alone
+    await lock.release("s1", dead)
+    assert [row.owner for row in await _lock_rows(session_factory)] == [lease.owner]
+    await lock.release("s1", lease)
+
+
+async def test_lease_is_renewed_while_held(session_factory):
+    lock = DatabaseSessionLock(session_factory, lease_seconds=0.15)
+    lease = await lock.acquire("s1")
+    await asyncio.sleep(0.3)
+
+    [row] = await _lock_rows(session_factory)
+    assert row.owner == lease.owner
+    assert row.expires_at > datetime.now(UTC).replace(tzinfo=None)
+    await lock.release("s1", lease)
@@ -0,0 +1,98 @@
+"""Monthly token budgets read from the AI call ledger."""
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from src.infrastructure.ai.call_ledger import AICallLedger, AICallRecord, UsageAccount
+from src.infrastructure.ai.model_routing import ModelRoute
+from src.infrastructure.ai.token_budget import TokenBudget, TokenBudgetExceededError, month_start, next_month_start
+
+ROUTE = ModelRoute("diagnosis", "gpt-4o", "2")
+
+
+@pytest.fixture
+def ledger(session_factory):
+    return AICallLedger(session_factory)
+
+
+def _call(tokens: int, user_id="u1", clinic_name=None, created_at=None) -> AICallRecord:
+    call = AICallRecord.start("s1", ROUTE, UsageAccount(user_id=user_id, clinic_name=clinic_name))
+    call.input_tokens = tokens
+    if created_at is not None:
+        call.created_at = created_at
+    return call
+
+
+def test_month_boundaries():
+    now = datetime(2026, 3, 17, 14, 5, tzinfo=UTC)
+
+    assert month_start(now) == datetime(2026, 3, 1, tzinfo=UTC)
+    assert next_month_start(now) == datetime(2026, 4, 1, tzinfo=UTC)
+    assert next_month_start(datetime(2026, 12, 31, 23, 59, tzinfo=UTC)) == datetime(2027, 1, 1, tzinfo=UTC)
+
+
+async def test_user_past_budget_is_refused_until_next_month(ledger):
+    ledger.record(_call(1500))
+    await ledger.flush()
+    budget = TokenBudget(ledger, user_limit=1000, clinic_limit=0)
+
+    with pytest.raises(TokenBudgetExceededError) as refused:
+        await budget.check(UsageAccount(user_id="u1"))
+
+    now = datetime.now(UTC)
+    assert 0 < refused.value.retry_after <= (next_month_start(now) - now).total_seconds() + 1
+    await budget.check(UsageAccount(user_id="u2"))
+
+
+async def test_last_month_usage_doesnt_count(ledger):
+    last_month = month_start(datetime.now(UTC)) - timedelta(seconds=1)
+    ledger.record(_call(5000, created_at=last_month))
+    await ledger.flush()
+
+    await TokenBudget(ledger, user_limit=1000).check(UsageAccount(user_id="u1"))
+
+
+async def test_calls_since_the_last_read_count_through_the_local_counter(ledger):
+    budget = TokenBudget(ledger, user_limit=1000, refresh_seconds=3600)
+    ledger.record(_call(600))
+    await ledger.flush()
+    await budget.check(UsageAccount(user_id="u1"))
+
+    # Not written yet, and the usage read above is reused: only the counter knows
+    ledger.record(_call(600))
+    assert ledger.recent_tokens("user", "u1") == 1200
+
+    with pytest.raises(TokenBudgetExceededError):
+        await budget.check(UsageAccount(user_id="u1"))
+
+
+async def test_cached_usage_is_read_again_in_a_new_month(ledger):
+    budget = TokenBudget(ledger, user_limit=1000, refresh_seconds=3600)
+    ledger.record(_call(1500))
+    await ledger.flush()
+    last_month = month_start(datetime.now(UTC)) - timedelta(days=1)
+    budget._cache[("user", "u1")] = (month_start(last_month), 0.0, 0, 0)
+
+    with pytest.raises(TokenBudgetExceededError):
+        await budget.check(UsageAccount(user_id="u1"))
+
+
+async def test_clinic_budget_is_shared_by_its_users(ledger):
+    ledger.record(_call(700, user_id="u1", clinic_name="Clinique A"))
+    ledger.record(_call(700, user_id="u2", clinic_name=" clinique a "))
+    await ledger.flush()
+    budget = TokenBudget(ledger, user_limit=0, clinic_limit=1000)
+
+    with pytest.raises(TokenBudgetExceededError):
+        await budget.check(UsageAccount(user_id="u3", clinic_name="CLINIQUE A"))
+    await budget.check(UsageAccount(user_id="u3", clinic_name="Clinique B"))
+
+
+async def test_unreadable_ledger_lets_turns_through():
+    def broken_factory():
+        raise ConnectionError("database down")
+
+    ledger = AICallLedger(broken_factory)
+    ledger.record(_call(5000))
+
+    await TokenBudget(ledger, user_limit=1000).check(UsageAccount(user_id="u1"))